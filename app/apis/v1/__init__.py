@@ -1,6 +1,8 @@
 from flask import Blueprint
 from flask_restx import Api
 
+from app.utils.json_encoding import output_json
+
 api_v1_bp = Blueprint("v1", __name__, url_prefix="/v1")
 api_v1 = Api(
     api_v1_bp,
@@ -11,6 +13,7 @@ api_v1 = Api(
     },
     security="apikey",
 )
+api_v1.representation("application/json")(output_json)
 
 
 def register_namespaces(api_: Api) -> Api:
@@ -35,6 +38,14 @@ def register_namespaces(api_: Api) -> Api:
 
     api_v1.add_namespace(organization_api)
 
+    from .asset_storage import api as asset_api
+
+    api_v1.add_namespace(asset_api)
+
+    from .instrumentation import api as instrumentation_api
+
+    api_v1.add_namespace(instrumentation_api)
+
     return api_
 
 
@@ -2,7 +2,7 @@ import sys
 import traceback
 from datetime import datetime
 from linecache import getline
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, Dict
 
 from flask.globals import current_app
 from sqlalchemy.orm import relationship
@@ -26,6 +26,16 @@ class ErrorLog(BaseModel):
     message = Column(String, comment="error message")
     stack_trace = Column(String, comment="error stack trace")
 
+    occurrences = Column(
+        Integer,
+        nullable=False,
+        server_default="1",
+        comment="identical errors merged into this row",
+    )
+    last_occurred_at = Column(
+        DateTime(True), nullable=True, comment="timestamp of the last merged error"
+    )
+
     date_added = Column(
         DateTime(True),
         nullable=False,
@@ -36,7 +46,7 @@ class ErrorLog(BaseModel):
     added_by_id = Column(INTEGER, ForeignKey("users.id"))
     added_by: "User" = relationship("User", foreign_keys=[added_by_id])
 
-    session_id = Column(INTEGER, ForeignKey("sessions.id"))
+    session_id = Column(INTEGER, ForeignKey("sessions.id", ondelete="SET NULL"))
     session: "Session" = relationship("Session", foreign_keys=[session_id])
 
     def __init__(self, e: Exception) -> None:
@@ -71,3 +81,14 @@ class ErrorLog(BaseModel):
         self.stack_trace = trace_str
         self.added_by_id = getattr(getattr(g, "identity", None), "id", None)
         self.session_id = getattr(getattr(g, "session", None), "id", None)
+        self.date_added = datetime.now(tz=current_app.config["TZ"])
+        self.occurrences = 1
+        self.last_occurred_at = self.date_added
+
+    def to_row(self) -> Dict[str, Any]:
+        """returns column values to insert, the instance isn't added to any session"""
+        return dict(
+            (column.key, getattr(self, column.key))
+            for column in self.__table__.columns
+            if column.key != "id"
+        )
@@ -1,13 +1,14 @@
 from typing import TYPE_CHECKING
 
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql.schema import Column
-from sqlalchemy.sql.sqltypes import String
+from sqlalchemy.sql.schema import Column, ForeignKey, Index
+from sqlalchemy.sql.sqltypes import INTEGER, String
 from sqlalchemy.util.langhelpers import hybridproperty
 from werkzeug import datastructures
 
-from app.database import BaseModel, DatedModel
-from app.utils import FileHandler
+from app.database import BaseModel, DatedModel, db
+
+from ._StoredObject import StoredObject
 
 if TYPE_CHECKING:
     from app.apis.v1.users.models import User  # NOQA
@@ -16,29 +17,69 @@ if TYPE_CHECKING:
 
 
 class AssetStorage(BaseModel, DatedModel):
-    """holds references to assets uploaded by users"""
+    """holds references to assets uploaded by users
+
+    Every upload gets its own asset, uploads with identical content point to a
+    single stored object.
+    """
 
     __tablename__ = "asset_storage"
 
-    ref_id = Column(String, nullable=False, unique=True, comment="unique id for file")
     title = Column(String, nullable=False, comment="file title with extension")
-    url = Column(String, nullable=False, comment="file url")
+    object_id = Column(
+        INTEGER,
+        ForeignKey("stored_objects.id"),
+        nullable=False,
+        comment="stored object's table foreign key",
+    )
 
+    stored_object: StoredObject = relationship("StoredObject", lazy="joined")
     user_permissions = relationship("AssetPermission", uselist=True)
 
+    __table_args__ = (
+        Index("ix_asset_storage_added_by_id", "added_by_id"),
+        Index("ix_asset_storage_object_id", "object_id"),
+    )
+
     def __init__(self, file: datastructures.FileStorage, **kwargs) -> None:
-        super(DatedModel, self).__init__(**kwargs)
-        handler = FileHandler(data=file.stream, name=file.filename)
-        handler.save()
-        self.url = handler.url
+        """Stores the file, or references the object holding identical content"""
+        super().__init__(**kwargs)
+        if self.added_by_id is None:
+            DatedModel.__init__(self)
         self.title = file.filename
-        self.ref_id = handler.handler.file_object.key
+        self.stored_object = StoredObject.store(file)
+
+    @classmethod
+    def store(
+        cls, file: datastructures.FileStorage, persist: bool = False, **kwargs
+    ) -> "AssetStorage":
+        """Stores an uploaded file as a new asset
+
+        Args:
+            file (datastructures.FileStorage): uploaded file
+            persist (bool, optional): Commit changes. Defaults to False.
+            kwargs: attributes of the asset
+
+        Returns:
+            AssetStorage: new asset
+        """
+        asset = cls(file, **kwargs)
+        asset.save(persist=persist)
+        return asset
 
     def delete(self, persist=False):
-        handler = FileHandler(url=self.url)
-        handler.delete()
-        super().delete(persist=persist)
+        """Deletes the asset, its stored object loses a reference"""
+        stored_object = self.stored_object
+        db.session.delete(self)
+        db.session.flush()
+        stored_object.release()
+        if persist:
+            db.session.commit()
+
+    @property
+    def url(self) -> str:
+        return self.stored_object.url
 
     @hybridproperty
     def handler(self):
-        return FileHandler(url=self.url)
+        return self.stored_object.handler
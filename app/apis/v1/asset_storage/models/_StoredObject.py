@@ -0,0 +1,120 @@
+from typing import Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.sql.schema import Column, Index
+from sqlalchemy.sql.sqltypes import INTEGER, String
+from sqlalchemy.util.langhelpers import hybridproperty
+from werkzeug import datastructures
+
+from app.database import BaseModel, db
+from app.utils import FileHandler
+from app.utils.file_handler import HashingReader, hash_stream
+from app.utils.unit_of_work import unit_of_work
+
+
+class StoredObject(BaseModel):
+    """holds a stored file shared by the assets uploaded with identical content
+
+    `ref_count` tracks how many assets point to it, the file is only removed
+    with its last reference.
+    """
+
+    __tablename__ = "stored_objects"
+
+    ref_id = Column(String, nullable=False, unique=True, comment="unique id for file")
+    url = Column(String, nullable=False, comment="file url")
+    content_hash = Column(String(64), nullable=True, comment="sha256 of the content")
+    ref_count = Column(
+        INTEGER,
+        nullable=False,
+        server_default="1",
+        comment="assets pointing to the file",
+    )
+
+    __table_args__ = (
+        Index("ix_stored_objects_content_hash", "content_hash", unique=True),
+    )
+
+    def __init__(
+        self, file: datastructures.FileStorage, content_hash: Optional[str] = None
+    ) -> None:
+        """Files with an unknown hash are uploaded right away to compute it,
+        others are uploaded by `store` once the object commits"""
+        data = file.stream if content_hash else HashingReader(file.stream)
+        self.upload_handler = FileHandler(data=data, title=file.filename)
+        if content_hash is None:
+            self.upload_handler.save()
+            content_hash = data.hexdigest()
+        self.url = self.upload_handler.url
+        self.ref_id = self.upload_handler.handler.key
+        self.content_hash = content_hash
+        self.ref_count = 1
+
+    @classmethod
+    def _reference(cls, content_hash: str) -> Optional["StoredObject"]:
+        """adds a reference to the object holding this content, if there's one"""
+        updated = (
+            db.session.query(cls)
+            .filter(cls.content_hash == content_hash)
+            .update({cls.ref_count: cls.ref_count + 1}, synchronize_session=False)
+        )
+        if not updated:
+            return None
+        stored_object = cls.query.filter(cls.content_hash == content_hash).one()
+        db.session.refresh(stored_object, ["ref_count"])
+        return stored_object
+
+    @classmethod
+    def store(cls, file: datastructures.FileStorage) -> "StoredObject":
+        """Stores an uploaded file, reusing the object holding identical content
+
+        Args:
+            file (datastructures.FileStorage): uploaded file
+
+        Returns:
+            StoredObject: new or existing object, referenced once more
+        """
+        content_hash = hash_stream(file.stream) if file.stream.seekable() else None
+        stored_object = cls._reference(content_hash) if content_hash else None
+        if stored_object is not None:
+            return stored_object
+
+        stored_object = cls(file, content_hash=content_hash)
+        uploaded = content_hash is None
+        try:
+            with db.session.begin_nested():
+                db.session.add(stored_object)
+        except IntegrityError:
+            # stored by a concurrent upload, or the hash was only known now
+            existing = cls._reference(stored_object.content_hash)
+            if existing is None:
+                raise
+            if uploaded:
+                stored_object.upload_handler.delete()
+            return existing
+        if uploaded:
+            unit_of_work.on_rollback(stored_object.upload_handler.delete)
+        else:
+            unit_of_work.save(stored_object.upload_handler)
+        return stored_object
+
+    def release(self) -> None:
+        """Removes a reference, the row goes with the last one and the file
+        once its deletion commits"""
+        released = (
+            db.session.query(StoredObject)
+            .filter(StoredObject.id == self.id, StoredObject.ref_count > 1)
+            .update(
+                {StoredObject.ref_count: StoredObject.ref_count - 1},
+                synchronize_session=False,
+            )
+        )
+        if released:
+            db.session.refresh(self, ["ref_count"])
+            return
+        unit_of_work.delete(self.url)
+        db.session.delete(self)
+
+    @hybridproperty
+    def handler(self):
+        return FileHandler(url=self.url)
@@ -1,2 +1,3 @@
 from ._AssetPermission import AssetPermission
 from ._AssetStorage import AssetStorage
+from ._StoredObject import StoredObject
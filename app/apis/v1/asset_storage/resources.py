@@ -0,0 +1,47 @@
+from typing import TYPE_CHECKING
+
+from flask_jwt_extended import current_user
+from flask_jwt_extended.view_decorators import jwt_required
+from flask_principal import Permission, RoleNeed
+from flask_restx import Resource
+
+from app.exceptions import InvalidUsage
+from app.utils import g
+from app.utils.extended_objects import ExtendedNameSpace
+from app.utils.streaming import stream_file
+
+from .models import AssetPermission, AssetStorage
+
+if TYPE_CHECKING:
+    from app.apis.v1.users.models import User
+
+current_user: "User"
+
+api = ExtendedNameSpace("assets", description="Stored assets operations")
+
+
+@api.param("asset_id", "asset's id", type=int)
+class AssetDownloadResource(Resource):
+    @jwt_required()
+    @api.response(200, "Asset's content")
+    @api.response(206, "Requested range of asset's content")
+    def get(self, asset_id: int):
+        """Downloads an asset, supports single byte range requests"""
+        asset = AssetStorage.get(id=asset_id)
+        if asset is None:
+            raise InvalidUsage.custom_error("Asset not found", 404)
+
+        if (
+            asset.added_by_id != current_user.id
+            and AssetPermission.query.filter_by(
+                asset_id=asset.id, user_id=current_user.id
+            ).first()
+            is None
+            and not Permission(RoleNeed("admin")).allows(g.identity)
+        ):
+            raise InvalidUsage.user_not_authorized()
+
+        return stream_file(asset.handler, asset.title)
+
+
+api.add_resource(AssetDownloadResource, "/<int:asset_id>/download")
@@ -32,15 +32,7 @@ class EntitiesResource(Resource):
     @api.serialize_multi(entity_model, Entity, description="List of Entities")
     def get(self):
         """Gets a list of user's active sessions"""
-        args = offset_parser.parse_args()
-
-        entities = (
-            Entity.query.order_by(Entity.id.asc())
-            .offset(args.get("offset", 0))
-            .limit(args.get("limit", 10))
-            .all()
-        )
-        return entities
+        return Entity.query
 
     @jwt_required()
     @api.expect(entity_parser)
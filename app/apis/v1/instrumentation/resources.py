@@ -0,0 +1,94 @@
+from flask_jwt_extended.view_decorators import jwt_required
+from flask_restx import Resource, fields
+
+from app.database import db, pool_metrics
+from app.utils.decorators import has_roles
+from app.utils.error_log_writer import error_log_writer
+from app.utils.extended_objects import ExtendedNameSpace
+from app.utils.tasks import tasks
+
+api = ExtendedNameSpace("instrumentation", description="Worker's runtime metrics")
+
+pool_model = api.model(
+    "PoolMetrics",
+    {
+        "pool": fields.String(description="Pool class"),
+        "size": fields.Integer(description="Connections kept open"),
+        "checked_in": fields.Integer(description="Idle connections in the pool"),
+        "checked_out": fields.Integer(description="Connections in use"),
+        "overflow": fields.Integer(description="Connections opened beyond size"),
+        "checkouts": fields.Integer(description="Connections checked out so far"),
+        "timeouts": fields.Integer(description="Checkouts that timed out"),
+        "wait_time": fields.Float(description="Total seconds spent on checkouts"),
+        "max_wait_time": fields.Float(description="Longest checkout in seconds"),
+    },
+)
+
+error_log_model = api.model(
+    "ErrorLogMetrics",
+    {
+        "logged": fields.Integer(description="Errors logged"),
+        "merged": fields.Integer(description="Errors merged into a pending one"),
+        "dropped": fields.Integer(description="Errors dropped on a full queue"),
+        "written": fields.Integer(description="Rows written"),
+        "batches": fields.Integer(description="Batches written"),
+        "failed_batches": fields.Integer(description="Batches failed to write"),
+        "pending": fields.Integer(description="Distinct errors waiting"),
+    },
+)
+
+tasks_model = api.model(
+    "TaskMetrics",
+    {
+        "submitted": fields.Integer(description="Tasks submitted"),
+        "inline": fields.Integer(description="Tasks run by the caller on a full queue"),
+        "succeeded": fields.Integer(description="Tasks succeeded"),
+        "failed": fields.Integer(description="Tasks failed after their retries"),
+        "retried": fields.Integer(description="Failed attempts retried"),
+        "queued": fields.Integer(description="Tasks waiting for a worker thread"),
+        "workers": fields.Integer(description="Running worker threads"),
+        "durable": fields.Nested(
+            api.model(
+                "DurableTaskMetrics",
+                {
+                    "queued": fields.Integer(description="Tasks waiting"),
+                    "running": fields.Integer(description="Tasks claimed"),
+                    "failed": fields.Integer(description="Tasks out of attempts"),
+                },
+            ),
+            description="Tasks stored in the database, shared by every worker",
+        ),
+    },
+)
+
+
+class PoolResource(Resource):
+    @jwt_required()
+    @has_roles("admin")
+    @api.marshal_with(pool_model)
+    def get(self):
+        """Gets database connection pool metrics of the serving worker"""
+        return pool_metrics(db.engine)
+
+
+class ErrorLogResource(Resource):
+    @jwt_required()
+    @has_roles("admin")
+    @api.marshal_with(error_log_model)
+    def get(self):
+        """Gets error log writer metrics of the serving worker"""
+        return error_log_writer.pipeline.stats()
+
+
+class TasksResource(Resource):
+    @jwt_required()
+    @has_roles("admin")
+    @api.marshal_with(tasks_model)
+    def get(self):
+        """Gets background task metrics of the serving worker"""
+        return dict(tasks.executor.stats(), durable=tasks.durable.stats())
+
+
+api.add_resource(PoolResource, "/pool")
+api.add_resource(ErrorLogResource, "/error-log")
+api.add_resource(TasksResource, "/tasks")
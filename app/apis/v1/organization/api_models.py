@@ -38,3 +38,11 @@ organization_serializer = {
 }
 
 organization_model = api.model("Organization", organization_serializer)
+
+organization_department_model = api.model(
+    "OrganizationDepartment",
+    {
+        "id": fields.Integer(description="department's index"),
+        "name": fields.String(description="department's name"),
+    },
+)
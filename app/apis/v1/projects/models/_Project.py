@@ -1,17 +1,19 @@
 from datetime import date, datetime
-from typing import TYPE_CHECKING, List
+from typing import TYPE_CHECKING, Dict, Iterable, List
 from uuid import uuid4
 
 from flask import current_app
-from sqlalchemy.ext.hybrid import hybrid_property
-from sqlalchemy.orm import relationship
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import contains_eager, relationship
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy.sql.expression import and_, cast
 from sqlalchemy.sql.schema import Column, ForeignKey
 from sqlalchemy.sql.sqltypes import BOOLEAN, DATE, INTEGER, Integer, String
 from werkzeug import datastructures
 
-from app.database import BaseModel, CancelableModel, DatedModel
+from app.database import BaseModel, CancelableModel, DatedModel, db
 from app.utils import FileHandler
+from app.utils.unit_of_work import unit_of_work
 
 if TYPE_CHECKING:
     from app.apis.v1.organization.models import Organization
@@ -31,7 +33,7 @@ class Project(BaseModel, DatedModel, CancelableModel):
 
     slug = Column(String, unique=True, nullable=False, comment="unique project's slug")
 
-    org_id = Column(Integer, ForeignKey("organizations.id"), comment="")
+    org_id = Column(Integer, ForeignKey("organizations.id"), index=True, comment="")
     organization: "Organization" = relationship("Organization")
 
     is_completed = Column(
@@ -84,32 +86,81 @@ class Project(BaseModel, DatedModel, CancelableModel):
         self.slug = uuid4()
 
     def save(self):
+        """Saves the project, its logo is uploaded once the insert commits"""
         if getattr(self, "logo_handler", None) is not None:
-            self.logo_handler.save()
+            unit_of_work.save(self.logo_handler)
         super().save(persist=True)
 
     def delete(self):
+        """Deletes the project, its logo is deleted once the deletion commits"""
+        if self.logo:
+            unit_of_work.delete(self.logo)
         super().delete(persist=True)
-        FileHandler(url=self.logo).delete()
 
-    @hybrid_property
-    def active_users(self):
+    @staticmethod
+    def members(project_ids: Iterable[int]) -> Dict[int, List[Row]]:
+        """users not cancelled from the projects, by project id, in a single query"""
         from app.apis.v1.users.models import User
 
         from ._ProjectUser import ProjectUser
 
-        return (
-            ProjectUser.query.join(User, User.id == ProjectUser.user_id)
-            .with_entities(
+        members: Dict[int, List[Row]] = dict(
+            (project_id, []) for project_id in project_ids
+        )
+        rows = (
+            db.session.query(
+                ProjectUser.project_id,
                 User.id.label("id"),
-                User.name.label("name"),
+                (User.first_name + " " + User.last_name).label("name"),
                 ProjectUser.is_active.label("active"),
             )
+            .join(User, User.id == ProjectUser.user_id)
             .filter(
                 and_(
-                    ProjectUser.project_id == self.id,
-                    ProjectUser.cancelled_at.is_not(None),
+                    ProjectUser.project_id.in_(list(members)),
+                    ProjectUser.cancelled_at.is_(None),
                 )
             )
-            .all()
+            .order_by(ProjectUser.project_id, ProjectUser.id)
+        )
+        for row in rows:
+            members[row.project_id].append(row)
+        return members
+
+    @classmethod
+    def prefetch(cls, projects: List["Project"]) -> List["Project"]:
+        """Loads the members and assets of all the projects with a query each,
+        assets already loaded with the projects aren't queried again"""
+        from ._ProjectAsset import ProjectAsset
+
+        members = cls.members(project.id for project in projects)
+        for project in projects:
+            project._active_users = members[project.id]
+
+        unloaded = dict(
+            (project.id, project)
+            for project in projects
+            if "assets" not in project.__dict__
         )
+        if unloaded:
+            assets: Dict[int, List[ProjectAsset]] = dict(
+                (project_id, []) for project_id in unloaded
+            )
+            for asset in (
+                ProjectAsset.query.join(ProjectAsset.asset)
+                .options(contains_eager(ProjectAsset.asset))
+                .filter(ProjectAsset.project_id.in_(list(unloaded)))
+                .order_by(ProjectAsset.id)
+            ):
+                assets[asset.project_id].append(asset)
+            for project_id, project in unloaded.items():
+                set_committed_value(project, "assets", assets[project_id])
+        return projects
+
+    @property
+    def active_users(self) -> List[Row]:
+        """users not cancelled from the project, prefetched by `prefetch`"""
+        active_users = getattr(self, "_active_users", None)
+        if active_users is None:
+            active_users = self.members([self.id])[self.id]
+        return active_users
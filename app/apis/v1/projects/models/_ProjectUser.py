@@ -3,7 +3,7 @@ from typing import TYPE_CHECKING, List, Literal
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql.expression import cast
-from sqlalchemy.sql.schema import Column, ForeignKey
+from sqlalchemy.sql.schema import Column, ForeignKey, Index
 from sqlalchemy.sql.sqltypes import BOOLEAN, INTEGER, SMALLINT
 from typing_extensions import TypeAlias
 
@@ -42,6 +42,10 @@ class ProjectUser(BaseModel, DatedModel, CancelableModel):
 
     role_id = Column(SMALLINT, nullable=False, comment="user's role in this project")
 
+    __table_args__ = (
+        Index("ix_project_users_project_id_user_id", "project_id", "user_id"),
+    )
+
     def __init__(self, project: "Project", user: "User", role: RoleType) -> None:
         assert role in ProjectUser.PROJECT_ROLES
         self.project_id = project.id
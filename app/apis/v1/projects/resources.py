@@ -29,43 +29,37 @@ class ProjectsResource(Resource):
     @jwt_required()
     @has_endpoint_permission("org_name", OrganizationNeed)
     @api.expect(combine_parsers(query_parser, offset_parser))
-    @api.serialize_multi(project_model, Project)
+    @api.serialize_multi(project_model, Project, prefetch=Project.prefetch)
     def get(self, org_name: str):
         query_args: dict = query_parser.parse_args()
-        offset_args: dict = offset_parser.parse_args()
         public: bool = json.loads(query_args.pop("is_public", "true"))
-        projects_query = (
-            Project.query.filter(
-                and_(
-                    Project.org_id.in_(
-                        select(Organization.id).where(Organization.name == org_name)
-                    ),
-                    *(
-                        [
-                            (getattr(Project, k) == v)
-                            for k, v in query_args.items()
-                            if v is not None
-                        ]
-                        + [
-                            or_(
-                                Project.id.in_(
-                                    select(ProjectUser.project_id).where(
-                                        current_user.id == ProjectUser.user_id
-                                    )
-                                ),
-                                cast(public, BOOLEAN),
-                                current_user.affiliation.position == "CEO",
-                            )
-                        ]
-                    )
+        projects_query = Project.query.filter(
+            and_(
+                Project.org_id.in_(
+                    select(Organization.id).where(Organization.name == org_name)
+                ),
+                *(
+                    [
+                        (getattr(Project, k) == v)
+                        for k, v in query_args.items()
+                        if v is not None
+                    ]
+                    + [
+                        or_(
+                            Project.id.in_(
+                                select(ProjectUser.project_id).where(
+                                    current_user.id == ProjectUser.user_id
+                                )
+                            ),
+                            cast(public, BOOLEAN),
+                            current_user.affiliation.position == "CEO",
+                        )
+                    ]
                 )
             )
-            .offset(offset_args.get("offset", 0))
-            .limit(offset_args.get("limit", 10))
         )
-        projects: List[Project] = projects_query.all()
 
-        return projects
+        return projects_query
 
     @jwt_required()
     @has_permission("project")
@@ -1,5 +1,6 @@
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Dict, Iterable, List
 
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql.schema import Column
 from sqlalchemy.sql.sqltypes import String
@@ -31,11 +32,52 @@ class Role(BaseModel):
         self.name = name
         self.description = description
 
-    def add_entity(self, entity: "Entity", create: bool = False, edit: bool = False):
+    @staticmethod
+    def members(role_ids: Iterable[int]) -> Dict[int, List[Row]]:
+        """ids and usernames of the roles' users, by role id, in a single query"""
+        from ...users.models import User, UserRoles
+
+        members: Dict[int, List[Row]] = dict((role_id, []) for role_id in role_ids)
+        rows = (
+            db.session.query(
+                UserRoles.role_id,
+                User.id.label("id"),
+                User.username.label("username"),
+            )
+            .join(User, UserRoles.user_id == User.id)
+            .filter(UserRoles.role_id.in_(list(members)))
+            .order_by(UserRoles.role_id, User.id)
+        )
+        for row in rows:
+            members[row.role_id].append(row)
+        return members
+
+    @classmethod
+    def prefetch_users(cls, roles: List["Role"]) -> List["Role"]:
+        """Loads the users of all the roles at once for `users` to return"""
+        members = cls.members(role.id for role in roles)
+        for role in roles:
+            role._users = members[role.id]
+        return roles
+
+    @property
+    def users(self) -> List[Row]:
+        """ids and usernames of the role's users, prefetched by `prefetch_users`"""
+        users = getattr(self, "_users", None)
+        if users is None:
+            users = self.members([self.id])[self.id]
+        return users
+
+    def add_entity(
+        self, entity: "Entity", can_create: bool = False, can_edit: bool = False
+    ):
+        from ...users.models import EffectiveEntityPermission
         from ._RoleEntityPermission import RoleEntityPermission  # NOQA
 
         permission = RoleEntityPermission(
-            entity=entity, role=self, create=create, edit=edit
+            entity=entity, role=self, can_create=can_create, can_edit=can_edit
         )
         db.session.add(permission)
+        db.session.flush()
+        EffectiveEntityPermission.refresh(role_ids=[self.id])
         db.session.commit()
@@ -27,6 +27,7 @@ class RoleEntityPermission(BaseModel):
         INTEGER,
         ForeignKey("roles.id"),
         nullable=False,
+        index=True,
         comment="role's table foreign key",
     )
     can_create = Column(
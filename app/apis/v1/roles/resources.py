@@ -4,6 +4,7 @@ from flask_jwt_extended import jwt_required
 from flask_restx import Resource, fields
 from flask_restx.errors import abort
 from flask_restx.reqparse import RequestParser
+from sqlalchemy.orm import selectinload
 
 from app.database import db
 from app.exceptions import InvalidUsage
@@ -12,9 +13,9 @@ from app.utils.extended_objects import ExtendedNameSpace
 from app.utils.helpers import argument_list_type
 
 from ..entities.models import Entity
-from ..users.models import User, UserRoles
+from ..users.models import EffectiveEntityPermission, User, UserRoles
 from ..users.resources import user_model
-from .models import Role
+from .models import Role, RoleEntityPermission
 
 api = ExtendedNameSpace("roles", description="Roles operations")
 
@@ -35,12 +36,7 @@ roles_model = api.model(
         "description": fields.String(),
         "users": fields.List(
             fields.Nested(user_model, skip_none=True),
-            attribute=lambda role: User.query.join(
-                UserRoles, UserRoles.user_id == User.id
-            )
-            .with_entities(User.id.label("id"), User.username.label("username"))
-            .filter(UserRoles.role_id == role.id)
-            .all(),
+            attribute="users",
         ),
         "entities": fields.List(
             fields.Nested(role_entity_permission_model, skip_none=True),
@@ -66,8 +62,14 @@ class RolesResource(Resource):
     @has_roles("admin")
     @api.marshal_list_with(roles_model, envelope="data")
     def get(self):
+        """Lists roles, loading their users and entities in three queries"""
+        roles = Role.query.options(
+            selectinload(Role.entity_permissions).joinedload(
+                RoleEntityPermission.entity
+            )
+        ).all()
 
-        return Role.query.all()
+        return Role.prefetch_users(roles)
 
     @jwt_required()
     @has_roles("admin")
@@ -121,6 +123,8 @@ class RoleResource(Resource):
         db.session.add_all(
             [UserRoles(user_id=user_id, role=role_) for user_id in args["users"]]
         )
+        db.session.flush()
+        EffectiveEntityPermission.refresh(user_ids=args["users"])
 
         db.session.commit()
 
@@ -184,6 +188,9 @@ class RoleEntityPermissionsResource(Resource):
         if len(entity) != 1:
             raise InvalidUsage.custom_error("invalid entity", 401)
         entity[0].update(ignore_none=True, **args)
+        db.session.flush()
+        EffectiveEntityPermission.refresh(role_ids=[role.id])
+        db.session.commit()
         return role
 
 
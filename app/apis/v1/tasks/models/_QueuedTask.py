@@ -0,0 +1,49 @@
+from datetime import datetime
+from typing import Any, Dict, Tuple
+
+from flask.globals import current_app
+from sqlalchemy.sql.schema import Column, Index
+from sqlalchemy.sql.sqltypes import JSON, DateTime, Integer, String
+
+from app.database import BaseModel
+
+
+class QueuedTask(BaseModel):
+    """tasks waiting to be run by `tasks-worker` processes"""
+
+    __tablename__ = "queued_tasks"
+
+    name = Column(String, nullable=False, comment="registered task name")
+    arguments = Column(JSON, nullable=False, comment="task's args and kwargs")
+    status = Column(
+        String,
+        nullable=False,
+        server_default="queued",
+        comment="queued, running or failed",
+    )
+    attempts = Column(Integer, nullable=False, server_default="0", comment="runs")
+    max_attempts = Column(Integer, nullable=False, comment="runs before failing")
+    run_at = Column(DateTime(True), nullable=False, comment="not run before")
+    locked_at = Column(
+        DateTime(True), nullable=True, comment="timestamp the task was claimed at"
+    )
+    last_error = Column(String, nullable=True, comment="last failure's error")
+    date_added = Column(DateTime(True), nullable=False, comment="row timestamp")
+
+    __table_args__ = (Index("ix_queued_tasks_status_run_at", "status", "run_at"),)
+
+    def __init__(
+        self,
+        name: str,
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+        max_attempts: int,
+        run_at: datetime = None,
+    ) -> None:
+        self.name = name
+        self.arguments = {"args": list(args), "kwargs": kwargs}
+        self.status = "queued"
+        self.attempts = 0
+        self.max_attempts = max_attempts
+        self.date_added = datetime.now(tz=current_app.config["TZ"])
+        self.run_at = run_at or self.date_added
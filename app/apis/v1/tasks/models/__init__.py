@@ -0,0 +1 @@
+from ._QueuedTask import QueuedTask
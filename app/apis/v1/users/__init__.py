@@ -8,6 +8,7 @@ from .resources import (
     UserSignupResource,
     UsersResource,
 )
+from .tasks import prune_sessions  # NOQA
 
 api.add_resource(UsersResource, "/")
 api.add_resource(UserSignupResource, "/signup")
@@ -1,12 +1,12 @@
 from flask_jwt_extended.utils import get_jwt
 from flask_restx import fields
 
-from app.utils import UrlWArgs
+from app.utils import StorageUrl, UrlWArgs
 
 from .namespace import api
 
 affiliation_serializer = {
-    "name": fields.String(attribute=".department.name"),
+    "name": fields.String(attribute="department.name"),
     "position": fields.String(),
 }
 
@@ -19,7 +19,7 @@ user_serializer = {
     "name": fields.String(description="User's fullname"),
     "active": fields.Boolean,
     "email": fields.String(description="User's email"),
-    "photo": fields.String(description="Url for user's avatar", attribute="photo.url"),
+    "photo": StorageUrl(description="Url for user's avatar", attribute="photo"),
     "phone": fields.String,
     "roles": fields.List(
         fields.String(attribute="name"), description="A list of user roles"
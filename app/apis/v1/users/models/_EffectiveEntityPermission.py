@@ -0,0 +1,85 @@
+from typing import List
+
+from sqlalchemy.sql.expression import cast, delete, insert, select, union_all
+from sqlalchemy.sql.functions import func
+from sqlalchemy.sql.schema import Column, ForeignKey, UniqueConstraint
+from sqlalchemy.sql.sqltypes import BOOLEAN, INTEGER
+
+from app.database import BaseModel, db
+
+
+class EffectiveEntityPermission(BaseModel):
+    """permissions on entities granted to users directly or through their roles"""
+
+    __tablename__ = "effective_entity_permissions"
+
+    user_id = Column(
+        INTEGER,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+        comment="user's table foreign key",
+    )
+    entity_id = Column(
+        INTEGER,
+        ForeignKey("entities.id", ondelete="CASCADE"),
+        nullable=False,
+        comment="entity's table foreign key",
+    )
+    can_create = Column(BOOLEAN, nullable=False, comment="can create flag")
+    can_edit = Column(BOOLEAN, nullable=False, comment="can edit flag")
+
+    __table_args__ = (UniqueConstraint("user_id", "entity_id"),)
+
+    @classmethod
+    def refresh(cls, user_ids: List[int] = None, role_ids: List[int] = None):
+        """Recomputes effective permissions, without committing
+
+        Args:
+            user_ids (List[int], optional): users whose grants changed.
+            role_ids (List[int], optional): roles whose grants changed.
+            Rebuilds the whole table if neither is provided.
+        """
+        from app.apis.v1.roles.models import RoleEntityPermission
+
+        from ._UserEntityPermission import UserEntityPermission
+        from ._UserRoles import UserRoles
+
+        if user_ids is None and role_ids is not None:
+            user_ids = (
+                select(UserRoles.user_id)
+                .where(UserRoles.role_id.in_(role_ids))
+                .scalar_subquery()
+            )
+
+        grants = union_all(
+            select(
+                UserEntityPermission.user_id,
+                UserEntityPermission.entity_id,
+                UserEntityPermission.can_create,
+                UserEntityPermission.can_edit,
+            ),
+            select(
+                UserRoles.user_id,
+                RoleEntityPermission.entity_id,
+                RoleEntityPermission.can_create,
+                RoleEntityPermission.can_edit,
+            ).join(UserRoles, UserRoles.role_id == RoleEntityPermission.role_id),
+        ).subquery()
+        merged_grants = select(
+            grants.c.user_id,
+            grants.c.entity_id,
+            func.max(cast(grants.c.can_create, INTEGER)) == 1,
+            func.max(cast(grants.c.can_edit, INTEGER)) == 1,
+        ).group_by(grants.c.user_id, grants.c.entity_id)
+
+        clear = delete(cls.__table__)
+        if user_ids is not None:
+            clear = clear.where(cls.user_id.in_(user_ids))
+            merged_grants = merged_grants.where(grants.c.user_id.in_(user_ids))
+
+        db.session.execute(clear)
+        db.session.execute(
+            insert(cls.__table__).from_select(
+                ["user_id", "entity_id", "can_create", "can_edit"], merged_grants
+            )
+        )
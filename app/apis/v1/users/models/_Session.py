@@ -1,19 +1,35 @@
 import uuid
 from datetime import datetime
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, List
 
 from flask.globals import current_app
+from sqlalchemy import text
+from sqlalchemy.sql.expression import select
+from sqlalchemy.sql.functions import func
 from sqlalchemy.sql.schema import Column, ForeignKey
 from sqlalchemy.sql.sqltypes import BOOLEAN, INTEGER, TIMESTAMP, String
 
-from app.database import BaseModel
+from app.database import BaseModel, db
+from app.utils.partitions import (
+    add_months,
+    create_monthly_partitions,
+    default_partition,
+    drop_partition,
+    get_monthly_partitions,
+    is_partitioned,
+)
 
 if TYPE_CHECKING:
     from ._User import User
 
 
 class Session(BaseModel):
-    """table for user's active sessions"""
+    """Table for user's active sessions
+
+    Sessions are kept until their token expires, `prune` removes them
+    afterwards. The table can be partitioned by month of creation with
+    `partition_by_month`, expired months are then dropped at once.
+    """
 
     __tablename__ = "sessions"
 
@@ -21,9 +37,10 @@ class Session(BaseModel):
         INTEGER,
         ForeignKey("users.id"),
         nullable=False,
+        index=True,
         comment="user's table foreign key",
     )
-    token = Column(String, nullable=False, comment="session's token")
+    token = Column(String, nullable=False, index=True, comment="session's token")
     ip_address = Column(String, nullable=True, comment="machine's ip address")
     platform = Column(String, nullable=True, comment="machine's os platform")
     browser = Column(String, nullable=True, comment="registered browser")
@@ -34,6 +51,12 @@ class Session(BaseModel):
     created_at = Column(
         TIMESTAMP(True), nullable=False, comment="session's creation date"
     )
+    expires_at = Column(
+        TIMESTAMP(True),
+        nullable=True,
+        index=True,
+        comment="session's token expiration date",
+    )
 
     def __init__(
         self, user: "User", token: str, ip_address: str, platform: str, browser: str
@@ -45,3 +68,119 @@ class Session(BaseModel):
         self.browser = browser
         self.slug = str(uuid.uuid4())
         self.created_at = datetime.now(tz=current_app.config["TZ"])
+        expires = current_app.config["JWT_ACCESS_TOKEN_EXPIRES"]
+        self.expires_at = self.created_at + expires if expires else None
+
+    @classmethod
+    def prune(cls, batch_size: int = None, now: datetime = None) -> int:
+        """Deletes expired sessions, committing each batch so locks are short
+
+        Args:
+            batch_size (int, optional): sessions deleted at a time.
+                Defaults to `SESSIONS_PRUNE_BATCH_SIZE` configuration.
+            now (datetime, optional): Defaults to the current time.
+
+        Returns:
+            int: number of sessions deleted, dropped partitions aside
+        """
+        batch_size = batch_size or current_app.config["SESSIONS_PRUNE_BATCH_SIZE"]
+        now = now or datetime.now(tz=current_app.config["TZ"])
+        if is_partitioned(cls.__tablename__):
+            cls._drop_expired_partitions(now)
+        deleted = 0
+        while True:
+            expired = select(cls.id).where(cls.expires_at <= now).limit(batch_size)
+            count = (
+                db.session.query(cls)
+                .filter(cls.id.in_(expired))
+                .delete(synchronize_session=False)
+            )
+            db.session.commit()
+            deleted += count
+            if count < batch_size:
+                return deleted
+
+    @classmethod
+    def _drop_expired_partitions(cls, now: datetime) -> List[str]:
+        dropped = []
+        for partition in get_monthly_partitions(cls.__tablename__):
+            if partition.end > now.date():
+                break
+            alive = db.session.execute(
+                text(
+                    f"SELECT EXISTS (SELECT 1 FROM {partition.name} "
+                    "WHERE expires_at IS NULL OR expires_at > :now)"
+                ),
+                dict(now=now),
+            ).scalar()
+            if alive:
+                break
+            drop_partition(partition)
+            dropped.append(partition.name)
+        db.session.commit()
+        return dropped
+
+    @classmethod
+    def partition_by_month(cls, ahead: int = None) -> List[str]:
+        """Partitions the table by month of creation, PostgreSQL only
+
+        The table is converted on the first run, later runs create the
+        partitions of upcoming months. Sessions of months without a partition
+        land in the default one, and move to their month's once it's created.
+        Partitioned tables can only be referenced along with their partition
+        key, so `error_log` loses its foreign key to sessions.
+
+        Args:
+            ahead (int, optional): months to create partitions for.
+                Defaults to `SESSIONS_PARTITIONS_AHEAD` configuration.
+
+        Returns:
+            List[str]: names of the partitions ensured
+        """
+        if db.engine.dialect.name != "postgresql":
+            raise NotImplementedError("Only PostgreSQL tables can be partitioned")
+        if ahead is None:
+            ahead = current_app.config["SESSIONS_PARTITIONS_AHEAD"]
+        today = datetime.now(tz=current_app.config["TZ"]).date()
+        end = add_months(today, ahead)
+        if is_partitioned(cls.__tablename__):
+            partitions = create_monthly_partitions(cls.__tablename__, today, end)
+        else:
+            partitions = cls._convert_to_partitions(today, end)
+        db.session.commit()
+        return partitions
+
+    @classmethod
+    def _convert_to_partitions(cls, today, end) -> List[str]:
+        oldest = db.session.query(func.min(cls.created_at)).scalar()
+        for statement in (
+            "ALTER TABLE error_log DROP CONSTRAINT IF EXISTS "
+            "fk_error_log_session_id_sessions",
+            "ALTER TABLE sessions RENAME TO sessions_unpartitioned",
+            "ALTER SEQUENCE sessions_id_seq OWNED BY NONE",
+            "CREATE TABLE sessions (LIKE sessions_unpartitioned "
+            "INCLUDING DEFAULTS INCLUDING COMMENTS) PARTITION BY RANGE (created_at)",
+            f"CREATE TABLE {default_partition(cls.__tablename__)} "
+            "PARTITION OF sessions DEFAULT",
+        ):
+            db.session.execute(text(statement))
+        partitions = create_monthly_partitions(
+            cls.__tablename__, oldest.date() if oldest else today, end
+        )
+        for statement in (
+            "INSERT INTO sessions SELECT * FROM sessions_unpartitioned",
+            "DROP TABLE sessions_unpartitioned",
+            "ALTER SEQUENCE sessions_id_seq OWNED BY sessions.id",
+            # unique constraints must include the partition key
+            "ALTER TABLE sessions ADD CONSTRAINT pk_sessions "
+            "PRIMARY KEY (id, created_at)",
+            "ALTER TABLE sessions ADD CONSTRAINT uq_sessions_slug "
+            "UNIQUE (slug, created_at)",
+            "ALTER TABLE sessions ADD CONSTRAINT fk_sessions_user_id_users "
+            "FOREIGN KEY (user_id) REFERENCES users (id)",
+            "CREATE INDEX ix_sessions_token ON sessions (token)",
+            "CREATE INDEX ix_sessions_user_id ON sessions (user_id)",
+            "CREATE INDEX ix_sessions_expires_at ON sessions (expires_at)",
+        ):
+            db.session.execute(text(statement))
+        return partitions
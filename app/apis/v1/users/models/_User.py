@@ -3,15 +3,17 @@ from typing import TYPE_CHECKING, List, Union
 
 from flask import current_app
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql.expression import cast
-from sqlalchemy.sql.schema import Column, ForeignKey
+from sqlalchemy.sql.expression import cast, literal, select, union_all
+from sqlalchemy.sql.functions import func
+from sqlalchemy.sql.schema import Column, ForeignKey, Index
 from sqlalchemy.sql.sqltypes import BOOLEAN, Integer, String
-from werkzeug.security import check_password_hash, generate_password_hash
 
 from app.apis.v1.asset_storage.models import AssetStorage
 from app.database import BaseModel, DatedModel, db
 from app.exceptions import UserExceptions
-from app.utils.file_handler import FileHandler
+from app.utils.file_handler import FileHandler, StoredFile
+from app.utils.password_hashers import password_hashers
+from app.utils.unit_of_work import unit_of_work
 
 if TYPE_CHECKING:
     from ...entities.models import Entity
@@ -32,7 +34,7 @@ class PasswordHelper:
 
     def __eq__(self, o: object) -> bool:
         assert isinstance(o, str)
-        equality: bool = check_password_hash(self.password, o)
+        equality: bool = password_hashers.verify(self.password, o)
         return equality
 
 
@@ -65,6 +67,12 @@ class User(BaseModel, DatedModel):
     last_name = Column(String, nullable=False, server_default="", comment="Last Name")
 
     manager_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+
+    # case insensitive login lookups
+    __table_args__ = (
+        Index("ix_users_lower_email", func.lower(email)),
+        Index("ix_users_lower_username", func.lower(username)),
+    )
     manager: "User" = relationship(
         "User", foreign_keys=[manager_id], lazy=True, uselist=False
     )
@@ -86,24 +94,51 @@ class User(BaseModel, DatedModel):
         regx = re.compile(current_app.config["PASSWORD_RULE"])
         if not regx.match(val):
             raise UserExceptions.password_check_invalid()
-        self._password = generate_password_hash(val)
+        self._password = password_hashers.hash(val)
 
     def get_password(self):
         return PasswordHelper(self._password)
 
-    password = property(get_password, set_password)
+    @classmethod
+    def find_by_login(cls, identifier: str) -> Union["User", None]:
+        """Finds the user whose email or username matches, ignoring case
 
-    def get_photo(self):
+        Each identifier is looked up on its own expression index and the lookups
+        are combined with a UNION, an email match wins over a username match.
+        """
+        normalized = identifier.lower()
+        matches = union_all(
+            select(cls.id, literal(0).label("priority")).where(
+                func.lower(cls.email) == normalized
+            ),
+            select(cls.id, literal(1).label("priority")).where(
+                func.lower(cls.username) == normalized
+            ),
+        ).subquery()
         return (
-            self.__photo_handler
-            if getattr(self, "__photo_handler", None) is not None
-            else FileHandler(url=self._photo)
-            if self._photo
-            else None
+            cls.query.join(matches, matches.c.id == cls.id)
+            .order_by(matches.c.priority)
+            .first()
         )
 
-    def set_photo(self, val: FileHandler):
-        self.__photo_handler = val
+    def check_password(self, password: str) -> bool:
+        """Verifies the password, rehashing it if it was hashed by another
+        hasher or with other costs, the new hash is saved with the session"""
+        if not password or not password_hashers.verify(self._password, password):
+            return False
+        if password_hashers.needs_rehash(self._password):
+            self._password = password_hashers.hash(password)
+        return True
+
+    password = property(get_password, set_password)
+
+    def get_photo(self) -> Union[StoredFile, None]:
+        if not self._photo:
+            return None
+        return StoredFile(self._photo, getattr(self, "_photo_handler", None))
+
+    def set_photo(self, val: Union[FileHandler, StoredFile, None]):
+        self._photo_handler = val if isinstance(val, FileHandler) else None
         self._photo = getattr(val, "url", None)
 
     photo = property(get_photo, set_photo)
@@ -143,6 +178,7 @@ class User(BaseModel, DatedModel):
         Args:
             roles: A list of or a single role instances
         """
+        from ._EffectiveEntityPermission import EffectiveEntityPermission
         from ._UserRoles import UserRoles
 
         new_roles = [
@@ -151,20 +187,27 @@ class User(BaseModel, DatedModel):
         ]
 
         db.session.add_all(new_roles)
+        db.session.flush()
+        EffectiveEntityPermission.refresh(user_ids=[self.id])
 
     def delete(self, persist=False):
-        """Delete user's record"""
-        if self.photo:
-            self.photo.delete()
+        """Delete user's record, the photo is deleted once the deletion commits"""
+        if self._photo:
+            unit_of_work.delete(self._photo)
         super().delete(persist=persist)
 
-    def add_entity(self, entity: "Entity", create: bool = False, edit: bool = False):
+    def add_entity(
+        self, entity: "Entity", can_create: bool = False, can_edit: bool = False
+    ):
+        from ._EffectiveEntityPermission import EffectiveEntityPermission
         from ._UserEntityPermission import UserEntityPermission
 
         permission = UserEntityPermission(
-            entity=entity, user=self, create=create, edit=edit
+            entity=entity, user=self, can_create=can_create, can_edit=can_edit
         )
         db.session.add(permission)
+        db.session.flush()
+        EffectiveEntityPermission.refresh(user_ids=[self.id])
         db.session.commit()
 
     @hybrid_property
@@ -27,6 +27,7 @@ class UserEntityPermission(BaseModel):
         INTEGER,
         ForeignKey("users.id"),
         nullable=False,
+        index=True,
         comment="user's table foreign key",
     )
     can_create = Column(
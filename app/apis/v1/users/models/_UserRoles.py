@@ -1,6 +1,6 @@
 from typing import TYPE_CHECKING
 
-from sqlalchemy.sql.schema import Column, ForeignKeyConstraint
+from sqlalchemy.sql.schema import Column, ForeignKeyConstraint, Index
 from sqlalchemy.sql.sqltypes import INTEGER
 
 from app.database import BaseModel
@@ -29,6 +29,7 @@ class UserRoles(BaseModel):
             refcolumns=["roles.id"],
             ondelete="CASCADE",
         ),
+        Index("ix_user_roles_user_id_role_id", "user_id", "role_id"),
     )
 
     def __init__(self, role: "Role", user: "User" = None, user_id: int = None) -> None:
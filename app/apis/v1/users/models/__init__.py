@@ -1,3 +1,4 @@
+from ._EffectiveEntityPermission import EffectiveEntityPermission
 from ._Session import Session
 from ._User import User
 from ._UserAffiliation import UserAffiliation
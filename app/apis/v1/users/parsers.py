@@ -38,7 +38,7 @@ user_info_parser.add_argument(
     required=False,
 ).add_argument(
     "email",
-    type=unique_value_converter(User, "email", str),
+    type=unique_value_converter(User, "email", str, normalize=True),
     location="form",
     required=False,
 ).add_argument(
@@ -69,7 +69,7 @@ user_info_parser.add_argument(
 user_parser = user_info_parser.copy().add_argument(
     "username",
     dest="username",
-    type=unique_value_converter(User, "username", str),
+    type=unique_value_converter(User, "username", str, normalize=True),
     required=True,
     location="form",
 )
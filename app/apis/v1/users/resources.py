@@ -18,7 +18,6 @@ from flask_jwt_extended.view_decorators import verify_jwt_in_request
 from flask_principal import Permission, RoleNeed
 from flask_restx import Resource, marshal
 from flask_restx.reqparse import RequestParser
-from sqlalchemy.sql.expression import or_
 from sqlalchemy.sql.functions import func
 
 from app.apis.v1.organization.models import Organization, OrganizationDepartment
@@ -31,6 +30,7 @@ from app.utils.decorators import has_roles
 from app.utils.file_handler import FileHandler
 from app.utils.helpers import combine_parsers
 from app.utils.parsers import offset_parser
+from app.utils.unit_of_work import unit_of_work
 
 from ..roles.models import Role
 from .api_models import session_model, user_model
@@ -52,7 +52,7 @@ class UsersResource(Resource):
     @has_roles("admin")
     @api.doc("get list of users")
     @api.expect(combine_parsers(active_users_parser, offset_parser))
-    @api.serialize_multi(user_model, User, description="List of users")
+    @api.serialize_multi(user_model, User, description="List of users", compiled=True)
     def get(
         self,
     ):
@@ -60,7 +60,7 @@ class UsersResource(Resource):
 
         args = self.active_users_parser.parse_args()
 
-        return User.query.filter(User.active == bool(args.get("active", 1))).all()
+        return User.query.filter(User.active == bool(args.get("active", 1)))
 
 
 class UserSignupResource(Resource):
@@ -116,6 +116,7 @@ class UserSignupResource(Resource):
         if photo:
             photostorage = FileHandler(data=photo.stream, title=photo.filename)
             user_args["photo"] = photostorage
+            unit_of_work.save(photostorage)
         user = User(**user_args)
         user.save()
         user.add_roles(Role.get(name="user"))
@@ -143,7 +144,6 @@ class UserSignupResource(Resource):
         affiliation.save()
         db.session.commit()
 
-        photostorage.save()
         return user
 
 
@@ -180,10 +180,13 @@ class UserResource(Resource):
         photo: werkzeug.datastructures.FileStorage = args.pop("photo")
 
         if photo:
+            old_photo = current_user._photo
             photostorage = FileHandler(
-                data=photo.stream, title=photo.filename, url=current_user._photo
+                data=photo.stream, title=photo.filename, url=old_photo
             )
-            photostorage.save()
+            unit_of_work.save(photostorage)
+            if old_photo and old_photo != photostorage.url:
+                unit_of_work.delete(old_photo)
             current_user.photo = photostorage
 
         for key, val in args.items():
@@ -224,13 +227,13 @@ class UserResource(Resource):
             or not args.get("confirm", False)
         ):
             raise UserExceptions.wrong_login_creds()
-        user.delete()
+        user.delete(persist=True)
         response: Response = jsonify({"message": "User Account deleted succefully!"})
         unset_jwt_cookies(response)
         return response
 
     def admin_delete_user(self, user: User):
-        user.delete()
+        user.delete(persist=True)
 
         return {}
 
@@ -262,14 +265,9 @@ class LoginResource(Resource):
     def post(self):
         """User's login view"""
         args = user_login_parser.parse_args()
-        user: User = User.query.filter(
-            or_(
-                func.lower(User.email) == args.get("username", "").lower(),
-                func.lower(User.username) == args.get("username", "").lower(),
-            )
-        ).first()
+        user = User.find_by_login(args.get("username", ""))
 
-        if not user or user.password != args.get("password", None):
+        if not user or not user.check_password(args.get("password", None)):
             raise UserExceptions.wrong_login_creds()
         token = create_access_token(user)
         user.token = get_csrf_token(token)
@@ -313,25 +311,23 @@ class UserSession(Resource):
 class UserSessions(Resource):
     @jwt_required()
     @api.expect(offset_parser)
-    @api.serialize_multi(session_model, Session, description="User's Active Sessions")
+    @api.serialize_multi(
+        session_model,
+        Session,
+        description="User's Active Sessions",
+        count_mode="window",
+        compiled=True,
+    )
     def get(self, user_id: int = None):
         """Gets a list of user's active sessions"""
-        args = offset_parser.parse_args()
-
-        user_sessions = (
-            Session.query.filter(
-                Session.user_id == user_id,
-            )
-            .order_by(Session.id.asc())
-            .offset(args.get("offset", 0))
-            .limit(args.get("limit", 10))
-            .all()
+        return Session.query.filter(
+            Session.user_id == user_id,
         )
 
-        return user_sessions
-
     @jwt_required()
-    @api.serialize_multi(session_model, Session, description="User's Active Sessions")
+    @api.serialize_multi(
+        session_model, Session, description="User's Active Sessions", compiled=True
+    )
     def delete(self, user_id: int = None, slug: str = None):
         """Invalidates all users sessions except the current sessions"""
         user = User.get(id=user_id)
@@ -0,0 +1,15 @@
+from app.utils.partitions import is_partitioned
+from app.utils.tasks import tasks
+
+from .models import Session
+
+
+@tasks.task(name="sessions.prune")
+def prune_sessions(batch_size: int = None) -> int:
+    """Deletes expired sessions, meant to run periodically
+
+    Upcoming partitions are created along if the table is partitioned.
+    """
+    if is_partitioned(Session.__tablename__):
+        Session.partition_by_month()
+    return Session.prune(batch_size)
@@ -15,7 +15,12 @@ from flask_migrate import migrate as alembic_migrate
 from sqlalchemy.exc import DatabaseError
 from werkzeug.exceptions import MethodNotAllowed, NotFound
 
-from app.utils.helpers import generate_op, get_tables_data
+from app.utils.helpers import (
+    generate_op,
+    get_seq_scan_stats,
+    get_tables_data,
+    get_unindexed_foreign_keys,
+)
 
 if TYPE_CHECKING:
     from app.apis.v1.users.models import User
@@ -262,6 +267,106 @@ def add_user():
         print("Error adding user")
 
 
+@click.command()
+@with_appcontext
+def rebuild_permissions():
+    """Rebuild users' effective entity permissions from scratch."""
+    from app.apis.v1.users.models import EffectiveEntityPermission
+    from app.database import db
+    from app.utils.identity_cache import identity_cache
+
+    try:
+        EffectiveEntityPermission.refresh()
+        db.session.commit()
+        # cached identities hold the permissions the rebuild may have changed
+        identity_cache.clear()
+        print("Effective permissions rebuilt successfully.")
+    except DatabaseError:
+        print("Error rebuilding effective permissions")
+
+
+@click.command()
+@click.option(
+    "--min-rows",
+    default=1000,
+    help="Ignore sequential scans on tables with fewer rows",
+)
+@with_appcontext
+def index_advisor(min_rows):
+    """Propose indexes for unindexed foreign keys and seq-scanned tables."""
+    try:
+        suggestions = get_unindexed_foreign_keys()
+        scanned_tables = get_seq_scan_stats(min_rows)
+    except DatabaseError:
+        print("Error inspecting database")
+        return
+
+    scanned = dict((stats.table, stats) for stats in scanned_tables)
+    # tables read sequentially the most come first
+    suggestions.sort(
+        key=lambda suggestion: -getattr(
+            scanned.get(suggestion.table), "seq_tup_read", 0
+        )
+    )
+    for suggestion in suggestions:
+        print(f"-- {suggestion.table}: {suggestion.reason}")
+        print(suggestion.ddl)
+    if not suggestions:
+        print("All foreign keys are indexed.")
+
+    if scanned_tables:
+        print("\nTables scanned sequentially more often than by index:")
+        print("table | seq_scan | seq_tup_read | idx_scan | live_rows")
+        for stats in scanned_tables:
+            print(" | ".join(str(value) for value in stats))
+
+
+@click.command()
+@click.option("--once", is_flag=True, help="Exit once no task is due")
+@click.option("--batch-size", default=None, type=int, help="Tasks claimed at a time")
+@with_appcontext
+def tasks_worker(once, batch_size):
+    """Run tasks stored in the durable queue."""
+    from app.utils.tasks import tasks
+
+    try:
+        processed = tasks.durable.work(once=once, batch_size=batch_size)
+    except DatabaseError:
+        print("Error running queued tasks")
+        return
+    print(f"{processed} tasks run")
+
+
+@click.command()
+@click.option("--batch-size", default=None, type=int, help="Sessions per batch")
+@with_appcontext
+def prune_sessions(batch_size):
+    """Delete expired sessions."""
+    from app.apis.v1.users.tasks import prune_sessions
+
+    try:
+        deleted = prune_sessions(batch_size)
+    except DatabaseError:
+        print("Error pruning sessions")
+        return
+    print(f"{deleted} expired sessions deleted")
+
+
+@click.command()
+@click.option("--ahead", default=None, type=int, help="Months to create ahead")
+@with_appcontext
+def partition_sessions(ahead):
+    """Partition sessions by month of creation, PostgreSQL only."""
+    from app.apis.v1.users.models import Session
+
+    try:
+        partitions = Session.partition_by_month(ahead)
+    except (DatabaseError, NotImplementedError) as e:
+        print(f"Error partitioning sessions: {e}")
+        return
+    print("\n".join(partitions))
+
+
 @click.command()
 @with_appcontext
 def migrate():
@@ -355,6 +460,11 @@ def register_commands(app: Flask) -> Flask:
     app.cli.add_command(add_roles, "add-roles")
     app.cli.add_command(add_superuser, "add-superuser")
     app.cli.add_command(add_user, "add-user")
+    app.cli.add_command(rebuild_permissions, "rebuild-permissions")
+    app.cli.add_command(index_advisor, "index-advisor")
+    app.cli.add_command(tasks_worker, "tasks-worker")
+    app.cli.add_command(prune_sessions, "prune-sessions")
+    app.cli.add_command(partition_sessions, "partition-sessions")
     app.cli.add_command(clean)
     app.cli.add_command(lint)
     app.cli.add_command(test)
@@ -1,5 +1,7 @@
+import threading
+import time
 from datetime import datetime
-from typing import TYPE_CHECKING, Type, TypeVar, Union
+from typing import TYPE_CHECKING, Dict, Type, TypeVar, Union
 
 from flask.globals import current_app
 from flask_jwt_extended import current_user
@@ -7,9 +9,13 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_sqlalchemy.model import Model
 from sqlalchemy import Column, and_
 from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.url import URL
+from sqlalchemy.exc import TimeoutError
 from sqlalchemy.ext.declarative import declared_attr
 from sqlalchemy.ext.mutable import Mutable
 from sqlalchemy.orm import Query, relationship
+from sqlalchemy.pool import NullPool, QueuePool
 from sqlalchemy.sql.expression import or_
 from sqlalchemy.sql.schema import ForeignKey, MetaData, Table
 from sqlalchemy.sql.sqltypes import INTEGER, DateTime
@@ -103,7 +109,108 @@ class ExtendedModel(Model):
             db.session.commit()
 
 
-db = SQLAlchemy(model_class=ExtendedModel, metadata=metadata)
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool keeping track of the time spent checking out connections"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._metrics_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except TimeoutError:
+            with self._metrics_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._metrics_lock:
+                self.checkouts += 1
+                self.wait_time += elapsed
+                self.max_wait_time = max(self.max_wait_time, elapsed)
+
+
+# connect arguments disabling server side prepared statements, which can't be
+# used through PgBouncer's transaction pooling. psycopg2 never prepares them.
+NO_PREPARED_STATEMENTS_ARGS = {"psycopg": {"prepare_threshold": None}}
+
+
+def pool_options(config: Dict, sa_url: URL) -> Dict:
+    """Builds engine's pool options from the app's configuration
+
+    Args:
+        config (Dict): app's configuration
+        sa_url (URL): database url
+
+    Returns:
+        Dict: create_engine keyword arguments
+    """
+    mode = config["DB_POOL_MODE"]
+    if mode == "null":
+        return {"poolclass": NullPool}
+    if mode not in ("queue", "pgbouncer"):
+        raise ValueError(f"Unknown pool mode {mode}")
+
+    options = {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": config["DB_POOL_SIZE"],
+        "max_overflow": config["DB_MAX_OVERFLOW"],
+        "pool_timeout": config["DB_POOL_TIMEOUT"],
+        "pool_recycle": config["DB_POOL_RECYCLE"],
+        "pool_pre_ping": config["DB_POOL_PRE_PING"],
+    }
+    connect_args = NO_PREPARED_STATEMENTS_ARGS.get(sa_url.get_driver_name())
+    if mode == "pgbouncer" and connect_args:
+        options["connect_args"] = connect_args
+    return options
+
+
+def pool_metrics(engine: Engine) -> Dict:
+    """returns current pool usage, queue pool counters are None for other pools"""
+    pool = engine.pool
+    metrics = {
+        "pool": type(pool).__name__,
+        "size": None,
+        "checked_in": None,
+        "checked_out": None,
+        "overflow": None,
+        "checkouts": None,
+        "timeouts": None,
+        "wait_time": None,
+        "max_wait_time": None,
+    }
+    if isinstance(pool, QueuePool):
+        metrics.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+        )
+    if isinstance(pool, InstrumentedQueuePool):
+        metrics.update(
+            checkouts=pool.checkouts,
+            timeouts=pool.timeouts,
+            wait_time=pool.wait_time,
+            max_wait_time=pool.max_wait_time,
+        )
+    return metrics
+
+
+class ExtendedSQLAlchemy(SQLAlchemy):
+    def apply_driver_hacks(self, app, sa_url, options):
+        """Adds pool options, explicit `SQLALCHEMY_ENGINE_OPTIONS` take precedence"""
+        for key, value in pool_options(app.config, sa_url).items():
+            options.setdefault(key, value)
+        return super().apply_driver_hacks(app, sa_url, options)
+
+
+db = ExtendedSQLAlchemy(model_class=ExtendedModel, metadata=metadata)
 
 
 class ViewModel(object):
@@ -15,24 +15,27 @@ INVALID_SESSION = template(["Invalid login session, please re-login"], code=401)
 EMPTY_MISSING_FILE = template(["File is empty or not uploaded correctly"], code=400)
 SIZE_LIMIT_EXCEEDED = template(["File size is larger than 1MB"], code=400)
 UNSUPPORTED_FORMAT = template(["Unsupported file format"], code=415)
+INVALID_CURSOR = template(["Invalid pagination cursor"], code=400)
 INVALID_SEARCH_PARAMS = template("No data available to fit your search", code=404)
+RANGE_NOT_SATISFIABLE = template(["Requested range not satisfiable"], code=416)
 
 
 class BasicException(Exception):
     status_code = 500
 
-    def __init__(self, errors, status_code=None, payload=None):
+    def __init__(self, errors, status_code=None, payload=None, headers=None):
         Exception.__init__(self)
         self.errors = errors
         if status_code is not None:
             self.status_code = status_code
         self.payload = payload
+        self.headers = headers or {}
 
     def to_json(self):
         rv = {
             "errors": self.errors,
         }
-        return jsonify(rv), self.status_code
+        return jsonify(rv), self.status_code, self.headers
 
 
 class InvalidUsage(BasicException):
@@ -56,6 +59,10 @@ class InvalidUsage(BasicException):
     def unknown_error(cls):
         return cls(**UNKNOWN_ERROR)
 
+    @classmethod
+    def invalid_cursor(cls):
+        return cls(**INVALID_CURSOR)
+
     @classmethod
     def empty_missing_file(cls):
         return cls(**EMPTY_MISSING_FILE)
@@ -72,6 +79,12 @@ class InvalidUsage(BasicException):
     def invalid_search_params(cls):
         return cls(**INVALID_SEARCH_PARAMS)
 
+    @classmethod
+    def range_not_satisfiable(cls, length: int):
+        return cls(
+            **RANGE_NOT_SATISFIABLE, headers={"Content-Range": f"bytes */{length}"}
+        )
+
 
 class CommonExcelExc(Exception):
     def __init__(self, *args: object) -> None:
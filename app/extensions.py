@@ -5,6 +5,13 @@ from flask_principal import Principal
 
 from app.database import db
 from app.handlers import jwt_handlers
+from app.utils.error_log_writer import error_log_writer
+from app.utils.identity_cache import identity_cache
+from app.utils.json_encoding import json_provider
+from app.utils.password_hashers import password_hashers
+from app.utils.revocation_list import revocation_list
+from app.utils.tasks import tasks
+from app.utils.unit_of_work import unit_of_work
 
 jwt = JWTManager()
 migrate = Migrate()
@@ -37,4 +44,18 @@ def register_extensions(app: Flask) -> Flask:
 
     jwt_handlers(jwt, app)
 
+    identity_cache.init_app(app)
+
+    revocation_list.init_app(app)
+
+    password_hashers.init_app(app)
+
+    error_log_writer.init_app(app)
+
+    tasks.init_app(app)
+
+    unit_of_work.init_app(app)
+
+    json_provider.init_app(app)
+
     return app
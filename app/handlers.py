@@ -5,7 +5,6 @@ from flask_jwt_extended.exceptions import CSRFError, NoAuthorizationError
 from flask_jwt_extended.jwt_manager import JWTManager
 from flask_principal import (
     Identity,
-    Need,
     PermissionDenied,
     RoleNeed,
     UserNeed,
@@ -13,14 +12,18 @@ from flask_principal import (
     identity_loaded,
 )
 
-from app.apis.v1.app_logging.models import ErrorLog
 from app.exceptions import InvalidUsage
 from app.utils import g
 from app.utils.custom_principal_needs import OrganizationNeed
-from app.utils.helpers import get_user_entity_permissions
+from app.utils.error_log_writer import error_log_writer
+from app.utils.identity_cache import identity_cache
+from app.utils.identity_loader import load_identity
+from app.utils.permission_bits import PermissionBits
+from app.utils.revocation_list import revocation_list
 
 if TYPE_CHECKING:
     from app.apis.v1.users.models import User
+    from app.utils.identity_loader import IdentityRecord
 
 
 def on_identity_loaded(sender, identity: int):
@@ -28,29 +31,22 @@ def on_identity_loaded(sender, identity: int):
     pass
 
 
-def generate_principal_identity(user: "User"):
+def generate_principal_identity(record: "IdentityRecord"):
 
-    user_id = user.id
+    user_id = record.user_id
     identity = Identity(user_id)
     identity.provides.add(UserNeed(user_id))
 
-    # Assuming the User model has a list of roles, update the
-    # identity with the roles that the user provides
-    for role in user.roles:
-        identity.provides.add(RoleNeed(role.name))
+    for role in record.roles:
+        identity.provides.add(RoleNeed(role))
 
-    # gets entity permissions granted to user or user's roles and add valid permissions
-    entity_permissions = get_user_entity_permissions(user_id)
+    # roles and entity permissions granted to user or user's roles as bitsets
+    identity.permission_bits = PermissionBits(
+        roles=record.role_bits, create=record.create_bits, edit=record.edit_bits
+    )
 
-    for entity in entity_permissions:
-        for permission in [
-            Need(entity.entity_name, perm)
-            for perm in ["create", "edit"]
-            if getattr(entity, perm)
-        ]:
-            identity.provides.add(permission)
-
-    identity.provides.add(OrganizationNeed(user.affiliation.organization.name))
+    if record.organization is not None:
+        identity.provides.add(OrganizationNeed(record.organization))
 
     return identity
 
@@ -61,21 +57,29 @@ def jwt_handlers(jwt: JWTManager, app: Flask):
 
     def user_lookup_callback(_jwt_header, jwt_data):
 
-        from app.apis.v1.users.models import Session, User
-
-        session = Session.get(token=jwt_data["jti"], user_id=jwt_data["user"])
-        g.session = session
-        if not session:
+        if revocation_list.is_revoked(jwt_data["jti"]):
             raise InvalidUsage.invalid_session()
-        user_id = jwt_data["user"]
-        user = User.get(id=user_id)
-        if not user or not user.active:
+        cached = identity_cache.get(jwt_data["jti"], jwt_data["user"])
+        if cached is not None:
+            g.session = cached.session
+            identity_changed.send(app, identity=cached.identity)
+            return cached.user
+
+        loaded_at = identity_cache.clock()
+        loaded = load_identity(jti=jwt_data["jti"], user_id=jwt_data["user"])
+        if not loaded:
+            raise InvalidUsage.invalid_session()
+        g.session = loaded.session
+        if not loaded.record.active:
             raise InvalidUsage.user_not_authorized()
 
-        identity = generate_principal_identity(user)
+        identity = generate_principal_identity(loaded.record)
+        identity_cache.set(
+            jwt_data["jti"], identity, loaded.user, loaded.session, loaded_at
+        )
         identity_changed.send(app, identity=identity)
 
-        return user
+        return loaded.user
 
     def invalid_token_loader_callback(*args):
 
@@ -101,13 +105,13 @@ def permission_denied(e: PermissionDenied):
 
 
 def normalize_errors(e: Exception):
-    error_log = ErrorLog(e)
-
     from app.database import db
 
+    # read before the rollback expires the session and user the row refers to
+    error_row = error_log_writer.capture(e)
     db.session.rollback()
 
-    error_log.save(True)
+    error_log_writer.submit(error_row)
 
     return InvalidUsage.custom_error(
         getattr(
@@ -4,7 +4,6 @@ import string
 from datetime import timedelta
 
 import pytz
-from sqlalchemy.pool import NullPool
 
 from app.utils.extended_objects import SubscriptableEnum
 
@@ -29,8 +28,45 @@ class Config(object):
 
     # Regex rule to check against user's password
     PASSWORD_RULE = os.getenv("PASSWORD_RULE", ".*")
+    # Password hashing: "argon2", "bcrypt" or "werkzeug", other hashers' hashes
+    # and hashes with other costs are upgraded as users log in
+    PASSWORD_HASHER = os.getenv("PASSWORD_HASHER", "argon2")
+    PASSWORD_ARGON2_TIME_COST = int(os.getenv("PASSWORD_ARGON2_TIME_COST", "3"))
+    # KiB
+    PASSWORD_ARGON2_MEMORY_COST = int(os.getenv("PASSWORD_ARGON2_MEMORY_COST", "65536"))
+    PASSWORD_ARGON2_PARALLELISM = int(os.getenv("PASSWORD_ARGON2_PARALLELISM", "4"))
+    PASSWORD_BCRYPT_ROUNDS = int(os.getenv("PASSWORD_BCRYPT_ROUNDS", "12"))
+    PASSWORD_WERKZEUG_METHOD = os.getenv(
+        "PASSWORD_WERKZEUG_METHOD", "pbkdf2:sha256:260000"
+    )
     # Storage target to handle file storage
     STORAGE_TARGET = os.getenv("STORAGE_TARGET", "s3")
+    # Serialize stored files' urls as temporary signed urls
+    STORAGE_SIGNED_URLS = os.getenv("STORAGE_SIGNED_URLS", "false").lower() == "true"
+    STORAGE_SIGNED_URL_EXPIRES = int(os.getenv("STORAGE_SIGNED_URL_EXPIRES", "3600"))
+    # Storage transfers, sizes in bytes
+    STORAGE_MULTIPART_THRESHOLD = int(
+        os.getenv("STORAGE_MULTIPART_THRESHOLD", str(8 * 1024 * 1024))
+    )
+    STORAGE_MULTIPART_CHUNKSIZE = int(
+        os.getenv("STORAGE_MULTIPART_CHUNKSIZE", str(8 * 1024 * 1024))
+    )
+    STORAGE_MAX_CONCURRENCY = int(os.getenv("STORAGE_MAX_CONCURRENCY", "4"))
+    STORAGE_STREAM_CHUNKSIZE = int(os.getenv("STORAGE_STREAM_CHUNKSIZE", "65536"))
+    # Run storage operations of committed transactions as background tasks
+    STORAGE_ASYNC = os.getenv("STORAGE_ASYNC", "false").lower() == "true"
+    # Local storage target
+    LOCAL_STORAGE_PATH = os.getenv(
+        "LOCAL_STORAGE_PATH", os.path.join(os.getcwd(), "storage")
+    )
+    LOCAL_STORAGE_URL = os.getenv("LOCAL_STORAGE_URL", "/storage")
+    # "x-sendfile" (apache, lighttpd), "x-accel-redirect" (nginx) or "none"
+    LOCAL_STORAGE_SENDFILE = os.getenv("LOCAL_STORAGE_SENDFILE", "none")
+    # nginx internal location mapped to LOCAL_STORAGE_PATH
+    LOCAL_STORAGE_ACCEL_PREFIX = os.getenv(
+        "LOCAL_STORAGE_ACCEL_PREFIX", "/protected-storage"
+    )
+    USE_X_SENDFILE = LOCAL_STORAGE_SENDFILE == "x-sendfile"
 
     # Sqlalchemy Configuration
     DATABASE_URL = os.getenv("DATABASE_URL")
@@ -38,7 +74,18 @@ class Config(object):
     SESSION_TYPE = "filesystem"
     SESSION_COOKIE_SECURE = True
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL")
-    SQLALCHEMY_ENGINE_OPTIONS = {"poolclass": NullPool}
+
+    # Connection pool configurations
+    # "queue" keeps connections open, "pgbouncer" does too but without server side
+    # prepared statements, "null" opens a connection per checkout
+    DB_POOL_MODE = os.getenv("DB_POOL_MODE", "queue")
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    # seconds to wait for a connection before giving up
+    DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+    # seconds before a connection is replaced, keep below server's idle timeouts
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
 
     # JWT Configurations
     JWT_SECRET_KEY = os.getenv(
@@ -54,6 +101,68 @@ class Config(object):
     JWT_CSRF_METHODS = ["POST", "PUT", "PATCH", "DELETE", "GET"]
     JWT_CSRF_IN_COOKIES = False
 
+    # Identity cache configurations
+    # "local" in-process LRU, "shared" across workers or "null" to disable
+    IDENTITY_CACHE_BACKEND = os.getenv("IDENTITY_CACHE_BACKEND", "local")
+    IDENTITY_CACHE_MAXSIZE = int(os.getenv("IDENTITY_CACHE_MAXSIZE", "10000"))
+    IDENTITY_CACHE_TTL = int(os.getenv("IDENTITY_CACHE_TTL", "300"))
+    # redis url for the shared backend, a local stand-in is used if not set
+    IDENTITY_CACHE_URL = os.getenv("IDENTITY_CACHE_URL", None)
+    # Revoked sessions, checked before the identity cache
+    # "sqlite" shared by the host's workers, "local" to the process or "null"
+    REVOCATION_LIST_BACKEND = os.getenv("REVOCATION_LIST_BACKEND", "sqlite")
+    # defaults to a file in the temporary directory
+    REVOCATION_LIST_PATH = os.getenv("REVOCATION_LIST_PATH", None)
+    REVOCATION_LIST_CAPACITY = int(os.getenv("REVOCATION_LIST_CAPACITY", "10000"))
+    REVOCATION_LIST_ERROR_RATE = float(os.getenv("REVOCATION_LIST_ERROR_RATE", "0.001"))
+    # seconds between reads of revocations made by other workers
+    REVOCATION_LIST_SYNC_INTERVAL = float(
+        os.getenv("REVOCATION_LIST_SYNC_INTERVAL", "1")
+    )
+    # seconds before entities & roles names are reloaded for permission checks
+    PERMISSION_REGISTRY_TTL = int(os.getenv("PERMISSION_REGISTRY_TTL", "60"))
+
+    # List endpoints configurations
+    # total count computation: "exact", "window", "estimated" or "cached"
+    PAGINATION_COUNT_MODE = os.getenv("PAGINATION_COUNT_MODE", "exact")
+    PAGINATION_COUNT_CACHE_TTL = int(os.getenv("PAGINATION_COUNT_CACHE_TTL", "60"))
+    PAGINATION_COUNT_CACHE_SIZE = int(os.getenv("PAGINATION_COUNT_CACHE_SIZE", "1000"))
+
+    # Error log configurations
+    # errors are written from a background thread unless disabled
+    ERROR_LOG_ASYNC = os.getenv("ERROR_LOG_ASYNC", "true").lower() == "true"
+    # distinct errors waiting to be written before new ones are dropped
+    ERROR_LOG_QUEUE_SIZE = int(os.getenv("ERROR_LOG_QUEUE_SIZE", "1000"))
+    ERROR_LOG_BATCH_SIZE = int(os.getenv("ERROR_LOG_BATCH_SIZE", "100"))
+    ERROR_LOG_FLUSH_INTERVAL = float(os.getenv("ERROR_LOG_FLUSH_INTERVAL", "1"))
+    # "newest" drops incoming errors when the queue is full, "oldest" queued ones
+    ERROR_LOG_DROP_POLICY = os.getenv("ERROR_LOG_DROP_POLICY", "newest")
+
+    # Background tasks
+    TASKS_WORKERS = int(os.getenv("TASKS_WORKERS", "4"))
+    TASKS_QUEUE_SIZE = int(os.getenv("TASKS_QUEUE_SIZE", "1000"))
+    TASKS_RETRIES = int(os.getenv("TASKS_RETRIES", "3"))
+    # seconds, doubled on each retry
+    TASKS_RETRY_BACKOFF = float(os.getenv("TASKS_RETRY_BACKOFF", "0.5"))
+    TASKS_RETRY_MAX_BACKOFF = float(os.getenv("TASKS_RETRY_MAX_BACKOFF", "30"))
+    # Run tasks in the caller instead of worker threads
+    TASKS_EAGER = os.getenv("TASKS_EAGER", "false").lower() == "true"
+    # Store tasks that must survive the process in the database
+    TASKS_DURABLE = os.getenv("TASKS_DURABLE", "false").lower() == "true"
+    TASKS_BATCH_SIZE = int(os.getenv("TASKS_BATCH_SIZE", "10"))
+    TASKS_POLL_INTERVAL = float(os.getenv("TASKS_POLL_INTERVAL", "1"))
+    # seconds before tasks claimed by a dead worker are claimed again
+    TASKS_LOCK_TIMEOUT = float(os.getenv("TASKS_LOCK_TIMEOUT", "300"))
+
+    # Sessions
+    SESSIONS_PRUNE_BATCH_SIZE = int(os.getenv("SESSIONS_PRUNE_BATCH_SIZE", "1000"))
+    # monthly partitions created ahead of time once the table is partitioned
+    SESSIONS_PARTITIONS_AHEAD = int(os.getenv("SESSIONS_PARTITIONS_AHEAD", "3"))
+
+    # JSON responses encoder: "orjson", the standard library's one is used if it
+    # isn't installed, or "json"
+    JSON_PROVIDER = os.getenv("JSON_PROVIDER", "orjson")
+
     # AWS Configurations
     AWS_ACCESS_KEY_ID = os.getenv("BUCKETEER_AWS_ACCESS_KEY_ID", None)
     AWS_REGION = os.getenv("BUCKETEER_AWS_REGION", None)
@@ -82,11 +191,24 @@ class DevConfig(Config):
     SECRET_KEY = "secretkey"
     JWT_COOKIE_SECURE = False
     SESSION_COOKIE_SECURE = False
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "2"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "3"))
 
 
 class TestConfig(DevConfig):
 
     TESTING = True
+    DB_POOL_MODE = "null"
+    ERROR_LOG_ASYNC = False
+    STORAGE_ASYNC = False
+    TASKS_EAGER = True
+    REVOCATION_LIST_BACKEND = "local"
+    # cheapest costs, hashing isn't what tests are about
+    PASSWORD_ARGON2_TIME_COST = 1
+    PASSWORD_ARGON2_MEMORY_COST = 8
+    PASSWORD_ARGON2_PARALLELISM = 1
+    PASSWORD_BCRYPT_ROUNDS = 4
+    PASSWORD_WERKZEUG_METHOD = "pbkdf2:sha256:1"
 
 
 class ProdConfig(Config):
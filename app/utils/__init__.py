@@ -6,8 +6,9 @@ from flask_principal import Identity
 
 from .decorators import has_roles
 from .extended_objects import ExtendedNameSpace, Nested
-from .file_handler import FileHandler
+from .file_handler import FileHandler, StoredFile
 from .helpers import chain, combine_parsers
+from .storage_url import StorageUrl
 from .url_w_args import UrlWArgs
 
 if TYPE_CHECKING:
@@ -6,6 +6,8 @@ from flask_principal import Identity, Need, Permission, RoleNeed
 
 from app.exceptions import InvalidUsage
 
+from .permission_bits import PermissionBits
+
 
 def check_roles(
     identity: Identity,
@@ -33,12 +35,19 @@ def has_roles(*args: Iterable[str]):
         )
         for role in args
     ]
+    required_roles = [role for role in args if not isinstance(role, list)]
+    optional_roles = [role for role in args if isinstance(role, list)]
 
     def wrapper(fn: Callable):
         @wraps(fn)
         def wrapped(*args, **kwargs):
             identity: Identity = g.identity
-            if not check_roles(identity=identity, roles=roles):
+            bits: PermissionBits = getattr(identity, "permission_bits", None)
+            if bits is not None:
+                allowed = bits.has_roles(required_roles, optional_roles)
+            else:
+                allowed = check_roles(identity=identity, roles=roles)
+            if not allowed:
                 raise InvalidUsage.user_not_authorized()
             return fn(*args, **kwargs)
 
@@ -52,13 +61,18 @@ def has_permission(
 ):
     """checks if user has required permissions for this entity"""
 
-    permissions = [Permission(Need(entity, perm)) for perm in permissions]
+    needed_permissions = [Permission(Need(entity, perm)) for perm in permissions]
 
     def wrapper(fn: Callable):
         @wraps(fn)
         def wrapped(*args, **kwargs):
             identity: Identity = g.identity
-            if False in [identity.can(perm) for perm in permissions]:
+            bits: PermissionBits = getattr(identity, "permission_bits", None)
+            if bits is not None:
+                allowed = bits.can(entity, permissions)
+            else:
+                allowed = False not in [identity.can(p) for p in needed_permissions]
+            if not allowed:
                 raise InvalidUsage.user_not_authorized()
             return fn(*args, **kwargs)
 
@@ -0,0 +1,88 @@
+from typing import Any, Dict, List, NamedTuple, Tuple, Union
+
+from flask_restx import Model, OrderedModel, fields
+from sqlalchemy import inspect
+from sqlalchemy.orm import Mapper, joinedload, selectinload
+
+from app.database import BaseModel
+
+
+class Relation(NamedTuple):
+    """A relationship read while marshalling and the ones read through it"""
+
+    key: str
+    uselist: bool
+    children: Tuple["Relation", ...] = ()
+
+
+Tree = Dict[str, Tuple[bool, Dict]]
+
+
+def _field_paths(field: Any, key: str) -> List[Tuple[List[str], Any]]:
+    """attribute paths read by a field, with the field marshalling their values"""
+    if isinstance(field, type):
+        field = field()
+    attribute = getattr(field, "attribute", None)
+    if callable(attribute):
+        return []
+    path = (attribute or key).split(".")
+    if isinstance(field, fields.List):
+        return [(path, field.container)]
+    return [(path, field)]
+
+
+def _walk(tree: Tree, mapper: Mapper, path: List[str], field: Any) -> None:
+    relationships = mapper.relationships
+    for index, segment in enumerate(path):
+        if segment not in relationships:
+            return
+        relationship = relationships[segment]
+        uselist, tree = tree.setdefault(segment, (relationship.uselist, {}))
+        mapper = relationship.mapper
+        relationships = mapper.relationships
+    if isinstance(field, fields.Nested):
+        _walk_model(tree, mapper, field.nested)
+    elif getattr(field, "attribute", None) and not callable(field.attribute):
+        # items of a list, their attribute is relative to the related row
+        _walk(tree, mapper, field.attribute.split("."), None)
+
+
+def _walk_model(tree: Tree, mapper: Mapper, restx_model: Model) -> None:
+    for key, field in restx_model.items():
+        for path, value_field in _field_paths(field, key):
+            _walk(tree, mapper, path, value_field)
+
+
+def _relations(tree: Tree) -> Tuple[Relation, ...]:
+    return tuple(
+        Relation(key, uselist, _relations(children))
+        for key, (uselist, children) in tree.items()
+    )
+
+
+def get_relations(
+    restx_model: Union[Model, OrderedModel], db_model: BaseModel
+) -> Tuple[Relation, ...]:
+    """Relationships of the db model read when marshalling it with the restx
+    model, including nested models and dotted attributes"""
+    tree: Tree = {}
+    _walk_model(tree, inspect(db_model), restx_model)
+    return _relations(tree)
+
+
+def loader_options(relations: Tuple[Relation, ...], entity: Any) -> List:
+    """Loader options for the relations of the entity, or an alias of it
+
+    Collections are loaded with a second SELECT ... IN statement so pages keep
+    their size, single rows are joined to the page's statement.
+    """
+    options = []
+    for relation in relations:
+        attribute = getattr(entity, relation.key)
+        loader = (selectinload if relation.uselist else joinedload)(attribute)
+        if relation.children:
+            loader = loader.options(
+                *loader_options(relation.children, attribute.property.mapper.class_)
+            )
+        options.append(loader)
+    return options
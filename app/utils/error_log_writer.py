@@ -0,0 +1,176 @@
+import atexit
+import os
+import threading
+from contextlib import nullcontext
+from typing import Any, Dict, List, Optional, Tuple
+
+from flask import current_app, has_app_context
+from flask.app import Flask
+from sqlalchemy import insert
+
+ErrorKey = Tuple[Any, Any, Any]
+
+
+class ErrorLogPipeline(object):
+    """Buffers error log rows of an app and writes them in batches
+
+    Identical errors (same code, message and stack trace) waiting to be written
+    are merged into a single row counting their occurrences. Once `maxsize`
+    distinct errors are pending, new ones are dropped, or the oldest ones when
+    `drop_policy` is "oldest".
+    """
+
+    def __init__(
+        self,
+        app: Flask,
+        maxsize: int = 1000,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        drop_policy: str = "newest",
+        asynchronous: bool = True,
+    ) -> None:
+        if drop_policy not in ("newest", "oldest"):
+            raise ValueError(f"Unknown error log drop policy '{drop_policy}'")
+        self.app = app
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.drop_policy = drop_policy
+        self.asynchronous = asynchronous
+        self.metrics = dict(
+            logged=0, merged=0, dropped=0, written=0, batches=0, failed_batches=0
+        )
+        self._reset()
+
+    def _reset(self) -> None:
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._pending: Dict[ErrorKey, Dict[str, Any]] = {}
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, row: Dict[str, Any]) -> None:
+        if not self.asynchronous:
+            self._write([row])
+            return
+
+        if self._pid != os.getpid():
+            # forked after the worker thread was started, it didn't survive
+            self._reset()
+        key = (row["code"], row["message"], row["stack_trace"])
+        with self._lock:
+            self.metrics["logged"] += 1
+            pending = self._pending.get(key)
+            if pending is not None:
+                pending["occurrences"] += row["occurrences"]
+                pending["last_occurred_at"] = row["last_occurred_at"]
+                self.metrics["merged"] += 1
+                return
+            if len(self._pending) >= self.maxsize:
+                self.metrics["dropped"] += 1
+                if self.drop_policy == "newest":
+                    return
+                del self._pending[next(iter(self._pending))]
+            self._pending[key] = row
+            if len(self._pending) >= self.batch_size:
+                self._wakeup.set()
+            if self._thread is None:
+                self._start()
+
+    def _start(self) -> None:
+        self._stopping = False
+        self._thread = threading.Thread(
+            target=self._run, name="error-log-writer", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+            if self._stopping:
+                return
+
+    def _take(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = list(self._pending.values())
+            self._pending = {}
+        return rows
+
+    def flush(self) -> None:
+        """writes every pending row"""
+        rows = self._take()
+        for start in range(0, len(rows), self.batch_size):
+            self._write(rows[start : start + self.batch_size])
+
+    def _write(self, rows: List[Dict[str, Any]]) -> None:
+        from app.apis.v1.app_logging.models import ErrorLog
+        from app.database import db
+
+        in_app_context = (
+            has_app_context() and current_app._get_current_object() is self.app
+        )
+        with nullcontext() if in_app_context else self.app.app_context():
+            try:
+                db.session.execute(insert(ErrorLog.__table__), rows)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                self.metrics["failed_batches"] += 1
+                self.app.logger.exception("Error writing %s error logs", len(rows))
+                return
+        self.metrics["batches"] += 1
+        self.metrics["written"] += len(rows)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """flushes pending rows and stops the worker thread"""
+        thread = self._thread
+        if thread is None or self._pid != os.getpid():
+            self.flush()
+            return
+        self._stopping = True
+        self._wakeup.set()
+        thread.join(timeout)
+        self._thread = None
+        atexit.unregister(self.stop)
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self.metrics, pending=len(self._pending))
+
+
+class ErrorLogWriter(object):
+    """Logs request errors through the current app's pipeline"""
+
+    def init_app(self, app: Flask) -> None:
+        app.extensions["error_log_writer"] = ErrorLogPipeline(
+            app,
+            maxsize=app.config["ERROR_LOG_QUEUE_SIZE"],
+            batch_size=app.config["ERROR_LOG_BATCH_SIZE"],
+            flush_interval=app.config["ERROR_LOG_FLUSH_INTERVAL"],
+            drop_policy=app.config["ERROR_LOG_DROP_POLICY"],
+            asynchronous=app.config["ERROR_LOG_ASYNC"],
+        )
+
+    @property
+    def pipeline(self) -> ErrorLogPipeline:
+        return current_app.extensions["error_log_writer"]
+
+    def capture(self, e: Exception) -> Dict[str, Any]:
+        """Returns the row logging the exception being handled, must be called
+        from its handler before the session is rolled back"""
+        from app.apis.v1.app_logging.models import ErrorLog
+
+        return ErrorLog(e).to_row()
+
+    def submit(self, row: Dict[str, Any]) -> None:
+        self.pipeline.submit(row)
+
+    def log(self, e: Exception) -> None:
+        """Captures the exception being handled and submits its row"""
+        self.submit(self.capture(e))
+
+
+error_log_writer = ErrorLogWriter()
@@ -1,21 +1,76 @@
 from functools import wraps
-from typing import Callable, List, Union
+from http import HTTPStatus
+from typing import Any, Callable, List, Optional, Union
 
 from flask_restx import Model, OrderedModel, fields
 from flask_restx.namespace import Namespace
+from flask_restx.utils import merge
+from sqlalchemy.orm import Query
 
 from app.database import BaseModel
 
+from .eager_loading import get_relations
+from .pagination import Page, paginate
 from .parsers import offset_parser
+from .serializer_compiler import compiled_marshal_with
 
 
 class ExtendedNameSpace(Namespace):
+    def marshal_with(
+        self,
+        fields,
+        as_list=False,
+        code=HTTPStatus.OK,
+        description=None,
+        compiled: bool = False,
+        **kwargs,
+    ):
+        """`Namespace.marshal_with`, marshalling with a compiled serializer if
+        `compiled` is set, see `app.utils.serializer_compiler`"""
+        if not compiled:
+            return super().marshal_with(fields, as_list, code, description, **kwargs)
+
+        def wrapper(func):
+            doc = {
+                "responses": {
+                    str(code): (description, [fields], kwargs)
+                    if as_list
+                    else (description, fields, kwargs)
+                },
+                "__mask__": kwargs.get("mask", True),
+            }
+            func.__apidoc__ = merge(getattr(func, "__apidoc__", {}), doc)
+            return compiled_marshal_with(fields, ordered=self.ordered, **kwargs)(func)
+
+        return wrapper
+
     def serialize_multi(
         self,
         restx_model: Union[Model, OrderedModel],
         db_model: BaseModel,
         description="",
+        count_mode: Optional[str] = None,
+        eager: bool = True,
+        prefetch: Optional[Callable[[List[BaseModel]], Any]] = None,
+        compiled: bool = False,
     ):
+        """Serializes a page of the query returned by the view, ordered by id
+
+        Args:
+            restx_model (Union[Model, OrderedModel]): model of the listed items
+            db_model (BaseModel): queried model
+            description (str, optional): response description
+            count_mode (str, optional): how the total count is computed, see
+                `app.utils.pagination.COUNT_MODES`. Defaults to configuration.
+            eager (bool, optional): load the relationships read by the restx model
+                along with the page instead of once per row. Defaults to True.
+            prefetch (Callable, optional): called with the page's rows before
+                they are marshalled, to batch load what the loader options can't.
+            compiled (bool, optional): marshal pages with a compiled serializer.
+                Defaults to False.
+
+        The view can also return a list, which is then counted and returned as is.
+        """
         extended_model = self.model(
             f"{restx_model.name}s",
             {
@@ -23,22 +78,49 @@ class ExtendedNameSpace(Namespace):
                 "data": fields.Nested(restx_model, as_list=True),
                 "limit": fields.Integer(),
                 "offset": fields.Integer(),
+                "next": fields.String(description="Next page's cursor"),
+                "prev": fields.String(description="Previous page's cursor"),
             },
         )
 
+        relations = []
+
         def wrapper(fn: Callable):
             @wraps(fn)
-            @self.marshal_with(extended_model)
+            @self.marshal_with(extended_model, compiled=compiled)
             @self.response(200, description, model=extended_model)
             def wrapped(*args, **kwargs):
                 args_ = offset_parser.parse_args()
-                result: List[BaseModel] = fn(*args, **kwargs)
+                limit = args_.get("limit", 10) or 10
+                offset = args_.get("offset", 0) or 0
+                result: Union[Query, List[BaseModel]] = fn(*args, **kwargs)
+
+                if isinstance(result, Query):
+                    if eager and not relations:
+                        # mappers are only configured once the app runs
+                        relations.append(get_relations(restx_model, db_model))
+                    page = paginate(
+                        result,
+                        db_model,
+                        offset,
+                        limit,
+                        count_mode,
+                        after=args_.get("after"),
+                        before=args_.get("before"),
+                        eager=relations[0] if relations else (),
+                    )
+                else:
+                    page = Page(data=result, count=len(result), next=None, prev=None)
+                if prefetch is not None:
+                    prefetch(page.data)
 
                 return {
-                    "count": db_model.query.count(),
-                    "limit": args_.get("limit", 10) or 10,
-                    "offset": args_.get("offset", 0) or 0,
-                    "data": result,
+                    "count": page.count,
+                    "limit": limit,
+                    "offset": offset,
+                    "next": page.next,
+                    "prev": page.prev,
+                    "data": page.data,
                 }
 
             return wrapped
@@ -1,10 +1,137 @@
+import hashlib
 import io
+import mimetypes
+import mmap
+import os
+import re
+import tempfile
+import threading
 import uuid
-from typing import Any, Dict
+from typing import Any, Dict, Iterator, Optional, Tuple, Type
 
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.exceptions import ClientError
-from flask import current_app
+from flask import Response, current_app, send_file
+from werkzeug.http import dump_options_header
+
+
+class S3ResourcePool(object):
+    """Process wide boto3 S3 resources keyed by endpoint and credentials
+
+    Building a resource loads botocore's service models, which costs tens of ms.
+    A boto3 session is created once per key and every thread gets its own
+    resource from it, as resources aren't thread safe. Sessions are only used
+    while holding the lock since they aren't thread safe either.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._pid = os.getpid()
+        self._sessions: Dict[Tuple, boto3.session.Session] = {}
+        self._local = threading.local()
+
+    def resource(
+        self,
+        endpoint_url: Optional[str],
+        access_key_id: Optional[str],
+        secret_access_key: Optional[str],
+    ) -> Any:
+        """returns this thread's resource for the endpoint & credentials"""
+        if self._pid != os.getpid():
+            # connections inherited from the parent process can't be shared
+            with self._lock:
+                self._reset()
+        key = (endpoint_url, access_key_id, secret_access_key)
+        resources: Dict[Tuple, Any] = self._local.__dict__.setdefault("resources", {})
+        resource = resources.get(key)
+        if resource is None:
+            with self._lock:
+                session = self._sessions.get(key)
+                if session is None:
+                    session = boto3.session.Session(
+                        aws_access_key_id=access_key_id,
+                        aws_secret_access_key=secret_access_key,
+                    )
+                    self._sessions[key] = session
+                resource = session.resource("s3", endpoint_url=endpoint_url)
+            resources[key] = resource
+        return resource
+
+    def object(self, resource: Any, bucket: str, key: str) -> Any:
+        """builds an s3.Object of a pooled resource
+
+        boto3 generates a new class each time `resource.Object` is called, the
+        class generated for the resource's first object is reused instead.
+        """
+        classes: Dict[int, Any] = self._local.__dict__.setdefault("objects", {})
+        object_class = classes.get(id(resource))
+        if object_class is None:
+            object_class = classes[id(resource)] = type(resource.Object(bucket, key))
+        return object_class(bucket, key, client=resource.meta.client)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._reset()
+
+
+s3_pool = S3ResourcePool()
+
+
+def transfer_config() -> TransferConfig:
+    """multipart settings used to stream uploads to storage"""
+    max_concurrency = current_app.config["STORAGE_MAX_CONCURRENCY"]
+    return TransferConfig(
+        multipart_threshold=current_app.config["STORAGE_MULTIPART_THRESHOLD"],
+        multipart_chunksize=current_app.config["STORAGE_MULTIPART_CHUNKSIZE"],
+        max_concurrency=max_concurrency,
+        use_threads=max_concurrency > 1,
+    )
+
+
+class UnclosableStream(object):
+    """Hands a stream to boto3 without letting it close the stream once uploaded"""
+
+    def __init__(self, stream: io.IOBase) -> None:
+        self._stream = stream
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._stream, name)
+
+    def close(self) -> None:
+        pass
+
+
+class HashingReader(object):
+    """Computes the sha256 of a stream while it's read"""
+
+    def __init__(self, stream: io.IOBase) -> None:
+        self._stream = stream
+        self._digest = hashlib.sha256()
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self._stream.read(size)
+        self._digest.update(chunk)
+        return chunk
+
+    def seekable(self) -> bool:
+        return False
+
+    def hexdigest(self) -> str:
+        return self._digest.hexdigest()
+
+
+def hash_stream(stream: io.IOBase) -> str:
+    """returns the sha256 of a seekable stream, rewinding it afterwards"""
+    reader = HashingReader(stream)
+    chunk_size = current_app.config["STORAGE_STREAM_CHUNKSIZE"]
+    for _ in iter(lambda: reader.read(chunk_size), b""):
+        pass
+    stream.seek(0)
+    return reader.hexdigest()
 
 
 class FileHandlerInterface:
@@ -14,6 +141,7 @@ class FileHandlerInterface:
     file_url: str
     file_args: Dict[str, str]
     file_object: Any
+    key: str
 
     def __init__(
         self, data: io.BytesIO, name: str, public: bool = False, url: str = None
@@ -45,6 +173,32 @@ class FileHandlerInterface:
     def update(self, data: io.BytesIO) -> None:
         pass
 
+    def detach(self) -> None:
+        """copies the data to a temporary file, so it outlives the request's stream"""
+        if getattr(self, "data", None) is None:
+            return
+        spooled = tempfile.TemporaryFile()
+        chunk_size = current_app.config["STORAGE_STREAM_CHUNKSIZE"]
+        for chunk in iter(lambda: self.data.read(chunk_size), b""):
+            spooled.write(chunk)
+        spooled.seek(0)
+        self.data = spooled
+
+    def size(self) -> int:
+        pass
+
+    def stream(self, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        pass
+
+    def send(self, filename: str) -> Optional[Response]:
+        """returns a response serving the file, None if not supported"""
+        return None
+
+    @classmethod
+    def signed_url(cls, url: str, expires_in: int) -> Optional[str]:
+        """returns a temporary url, None if the backend can't sign urls"""
+        return None
+
 
 class FileHandler:
     handler: FileHandlerInterface
@@ -65,8 +219,7 @@ class FileHandler:
             public (bool, optional): Make the url public. Defaults to False.
             url (str, optional): Used to handle uploaded files if data is not provided. Defaults to None.
         """
-        storage_handlers = {"s3": FileHandlerS3}
-        self.handler = storage_handlers[current_app.config["STORAGE_TARGET"]](
+        self.handler = FileHandler.handler_class()(
             data,
             title,
             public,
@@ -76,6 +229,10 @@ class FileHandler:
     def __repr__(self) -> str:
         self.handler.__repr__()
 
+    @staticmethod
+    def handler_class() -> Type[FileHandlerInterface]:
+        return STORAGE_HANDLERS[current_app.config["STORAGE_TARGET"]]
+
     def save(
         self,
     ) -> None:
@@ -101,6 +258,82 @@ class FileHandler:
         """Updates file contents with same url"""
         self.handler.update(data=data)
 
+    def size(self) -> int:
+        """returns the stored file's size in bytes"""
+        return self.handler.size()
+
+    def stream(self, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """Streams the stored file's content in chunks
+
+        Args:
+            start (int, optional): first byte. Defaults to 0.
+            end (int, optional): last byte, included. Defaults to the end of file.
+        """
+        return self.handler.stream(start, end)
+
+    def send(self, filename: str) -> Optional[Response]:
+        """returns a response serving the file, None if the provider can't"""
+        return self.handler.send(filename)
+
+    def detach(self) -> None:
+        """Makes the file independent from the request's stream,
+        for it to be saved after the request ends"""
+        self.handler.detach()
+
+
+class StoredFile(object):
+    """A stored file's url, the storage backend is only reached once the file's
+    data is read, written or deleted, or a signed url is requested
+    """
+
+    __slots__ = ("url", "_handler")
+
+    def __init__(self, url: str, handler: FileHandler = None) -> None:
+        self.url = url
+        self._handler = handler
+
+    def __repr__(self) -> str:
+        return self.url
+
+    @property
+    def handler(self) -> FileHandler:
+        if self._handler is None:
+            self._handler = FileHandler(url=self.url)
+        return self._handler
+
+    def signed_url(self, expires_in: int = None) -> str:
+        """returns a temporary url to download a private file
+
+        Args:
+            expires_in (int, optional): validity in seconds.
+                Defaults to `STORAGE_SIGNED_URL_EXPIRES` configuration.
+        """
+        signed = FileHandler.handler_class().signed_url(
+            self.url, expires_in or current_app.config["STORAGE_SIGNED_URL_EXPIRES"]
+        )
+        return signed or self.url
+
+    def save(self) -> None:
+        self.handler.save()
+
+    def get_data(self) -> io.BytesIO:
+        return self.handler.get_data()
+
+    def delete(self) -> None:
+        self.handler.delete()
+
+    def update(self, data: io.BytesIO) -> None:
+        self.handler.update(data=data)
+
+    def size(self) -> int:
+        return self.handler.size()
+
+    def stream(self, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        return self.handler.stream(start, end)
+
+    def send(self, filename: str) -> Optional[Response]:
+        return self.handler.send(filename)
+
 
 class FileHandlerS3(FileHandlerInterface):
     data: io.BytesIO
@@ -124,34 +357,48 @@ class FileHandlerS3(FileHandlerInterface):
     def __repr__(self) -> str:
         return self.file_url
 
-    def _get_resource(self):
+    @property
+    def key(self) -> str:
+        return self.file_object.key
+
+    @staticmethod
+    def _get_resource():
         protocol = (
             "https" if current_app.config["FLASK_ENV"] == "production" else "http"
         )
-        s3_resource = boto3.resource(
-            "s3",
-            endpoint_url=f"{protocol}://" + current_app.config["AWS_ENDPOINT"],
-            aws_access_key_id=current_app.config["AWS_ACCESS_KEY_ID"],
-            aws_secret_access_key=current_app.config["AWS_SECRET_ACCESS_KEY"],
+        return s3_pool.resource(
+            f"{protocol}://" + current_app.config["AWS_ENDPOINT"],
+            current_app.config["AWS_ACCESS_KEY_ID"],
+            current_app.config["AWS_SECRET_ACCESS_KEY"],
         )
 
-        return s3_resource
+    @classmethod
+    def signed_url(cls, url: str, expires_in: int) -> str:
+        # presigning is computed locally by the pooled resource's client
+        return cls._get_resource().meta.client.generate_presigned_url(
+            "get_object",
+            Params={
+                "Bucket": current_app.config["S3_BUCKET_NAME"],
+                "Key": url.split("/")[-1],
+            },
+            ExpiresIn=expires_in,
+        )
 
     def _get_fileobj_fromurl(
         self,
     ) -> Any:
-        s3_resource = self._get_resource()
-        return s3_resource.Object(
-            current_app.config["S3_BUCKET_NAME"], self.file_url.split("/")[-1]
+        return s3_pool.object(
+            self._get_resource(),
+            current_app.config["S3_BUCKET_NAME"],
+            self.file_url.split("/")[-1],
         )
 
     def _create_fileobj(self) -> Any:
         if self.file_url:
             return self._get_fileobj_fromurl()
-        s3_resource = self._get_resource()
         random_file_name = "".join([str(uuid.uuid4().hex[:6]), self.title])
-        return s3_resource.Object(
-            current_app.config["S3_BUCKET_NAME"], random_file_name
+        return s3_pool.object(
+            self._get_resource(), current_app.config["S3_BUCKET_NAME"], random_file_name
         )
 
     def _create_url(self, file_key: str) -> str:
@@ -165,10 +412,14 @@ class FileHandlerS3(FileHandlerInterface):
         self,
     ) -> str:
 
+        # the stream is read chunk by chunk, large files go through multipart
         self.file_object.upload_fileobj(
-            io.BytesIO(self.data.read()), ExtraArgs=self.file_args
+            UnclosableStream(self.data),
+            ExtraArgs=self.file_args,
+            Config=transfer_config(),
         )
-        self.data.seek(0)
+        if self.data.seekable():
+            self.data.seek(0)
 
     def delete(self):
 
@@ -181,7 +432,25 @@ class FileHandlerS3(FileHandlerInterface):
 
     def update(self, data: io.BytesIO) -> None:
         self.data = None
-        self.file_object.upload_fileobj(data)
+        self.file_object.upload_fileobj(data, Config=transfer_config())
+
+    def size(self) -> int:
+        return self.file_object.content_length
+
+    def stream(self, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        args = {}
+        if start or end is not None:
+            args["Range"] = f"bytes={start}-{'' if end is None else end}"
+        body = self.file_object.get(**args)["Body"]
+        chunk_size = current_app.config["STORAGE_STREAM_CHUNKSIZE"]
+
+        def chunks():
+            try:
+                yield from body.iter_chunks(chunk_size)
+            finally:
+                body.close()
+
+        return chunks()
 
     def get_data(self) -> io.BytesIO:
         if self.data:
@@ -193,3 +462,183 @@ class FileHandlerS3(FileHandlerInterface):
         temp_file.seek(0)
 
         return temp_file
+
+
+class FileHandlerLocal(FileHandlerInterface):
+    """Stores files on disk under their content's sha256
+
+    Content is hashed into a temporary file when the handler is created, saving
+    renames it into place so readers never see partial files.
+
+    Every saved file gets its own key, files with identical content are hard
+    links to a single copy kept under `.objects`. Deleting or updating a file
+    only replaces its own link, the copy goes once no file links to it.
+    """
+
+    KEY_PATTERN = re.compile(r"^[0-9a-f]{2}/[0-9a-f]{64}-[0-9a-f]{8}(\.[\w]+)?$")
+
+    def __init__(
+        self, data: io.BytesIO, title: str, public: bool = False, url: str = None
+    ) -> None:
+        self.data = data
+        self.title = title
+        self.public = public
+        self.file_url = url
+        self.file_args = {}
+        self.root = current_app.config["LOCAL_STORAGE_PATH"]
+        self._temp_path: Optional[str] = None
+
+        if data is not None:
+            self.key = self._hash_to_temp(data, title or "")
+        elif url:
+            self.key = "/".join(url.rstrip("/").split("/")[-2:])
+        else:
+            raise ValueError("Either data or url must be provided")
+        if not self.KEY_PATTERN.match(self.key):
+            raise ValueError(f"Invalid local storage key '{self.key}'")
+
+        self.file_object = self.key
+        self.file_url = self._create_url(self.key)
+        self.path = os.path.join(self.root, *self.key.split("/"))
+        digest = self.key.split("/")[1][:64]
+        self.object_path = os.path.join(self.root, ".objects", digest[:2], digest)
+
+    def __repr__(self) -> str:
+        return self.file_url
+
+    def __del__(self) -> None:
+        if getattr(self, "_temp_path", None) and os.path.exists(self._temp_path):
+            os.unlink(self._temp_path)
+
+    def _write_temp(self, data: io.BytesIO) -> str:
+        """copies data to a temporary file, returns the content's sha256"""
+        temp_dir = os.path.join(self.root, ".tmp")
+        os.makedirs(temp_dir, exist_ok=True)
+        digest = hashlib.sha256()
+        chunk_size = current_app.config["STORAGE_STREAM_CHUNKSIZE"]
+        with tempfile.NamedTemporaryFile(dir=temp_dir, delete=False) as temp_file:
+            self._temp_path = temp_file.name
+            for chunk in iter(lambda: data.read(chunk_size), b""):
+                digest.update(chunk)
+                temp_file.write(chunk)
+        if data.seekable():
+            data.seek(0)
+        return digest.hexdigest()
+
+    def detach(self) -> None:
+        # the content is already held by the temporary file
+        self.data = None
+
+    def _hash_to_temp(self, data: io.BytesIO, title: str) -> str:
+        hex_digest = self._write_temp(data)
+        extension = os.path.splitext(title)[1].lower()
+        if not re.match(r"^\.\w+$", extension):
+            extension = ""
+        return f"{hex_digest[:2]}/{hex_digest}-{uuid.uuid4().hex[:8]}{extension}"
+
+    def _create_url(self, file_key: str) -> str:
+        return f"{current_app.config['LOCAL_STORAGE_URL'].rstrip('/')}/{file_key}"
+
+    @classmethod
+    def signed_url(cls, url: str, expires_in: int) -> str:
+        # local files are served as is, their urls can't expire
+        return url
+
+    def save(self) -> None:
+        if self._temp_path is None:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        os.makedirs(os.path.dirname(self.object_path), exist_ok=True)
+        # temporary files are private, stored ones may be served by the web server
+        os.chmod(self._temp_path, 0o644)
+        try:
+            os.link(self.object_path, self.path)
+            os.unlink(self._temp_path)
+        except FileNotFoundError:
+            # first copy of this content
+            try:
+                os.link(self._temp_path, self.object_path)
+            except FileExistsError:
+                pass
+            os.replace(self._temp_path, self.path)
+        self._temp_path = None
+
+    def _release_object(self) -> None:
+        """removes the content's copy once no stored file links to it"""
+        try:
+            if os.stat(self.object_path).st_nlink == 1:
+                os.unlink(self.object_path)
+        except FileNotFoundError:
+            pass
+
+    def delete(self) -> bool:
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            return False
+        self._release_object()
+        return True
+
+    def update(self, data: io.BytesIO) -> None:
+        # keeps the url, the file no longer matches its content's hash and
+        # stops sharing the content of other files
+        self.data = None
+        self._write_temp(data)
+        os.chmod(self._temp_path, 0o644)
+        os.replace(self._temp_path, self.path)
+        self._temp_path = None
+        self._release_object()
+
+    def get_data(self) -> io.BufferedReader:
+        if self.data:
+            return self.data
+        return open(self.path, "rb")
+
+    def size(self) -> int:
+        return os.path.getsize(self.path)
+
+    def stream(self, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        chunk_size = current_app.config["STORAGE_STREAM_CHUNKSIZE"]
+        file_ = open(self.path, "rb")
+        size = os.fstat(file_.fileno()).st_size
+        stop = size if end is None else min(end + 1, size)
+
+        def chunks():
+            with file_:
+                if start >= stop:
+                    return
+                with mmap.mmap(file_.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    for offset in range(start, stop, chunk_size):
+                        yield mapped[offset : min(offset + chunk_size, stop)]
+
+        return chunks()
+
+    def send(self, filename: str) -> Optional[Response]:
+        """serves the file through the web server if configured, else via sendfile"""
+        mode = current_app.config["LOCAL_STORAGE_SENDFILE"]
+        if mode == "x-accel-redirect":
+            return Response(
+                headers={
+                    "X-Accel-Redirect": current_app.config[
+                        "LOCAL_STORAGE_ACCEL_PREFIX"
+                    ].rstrip("/")
+                    + "/"
+                    + self.key,
+                    "Content-Disposition": dump_options_header(
+                        "attachment", {"filename": filename}
+                    ),
+                },
+                mimetype=mimetypes.guess_type(filename)[0],
+            )
+        return send_file(
+            self.path,
+            as_attachment=True,
+            attachment_filename=filename,
+            conditional=True,
+        )
+
+
+STORAGE_HANDLERS: Dict[str, Type[FileHandlerInterface]] = {
+    "s3": FileHandlerS3,
+    "local": FileHandlerLocal,
+}
@@ -9,6 +9,7 @@ from typing import (
     Literal,
     NamedTuple,
     Sequence,
+    Tuple,
     Type,
     TypedDict,
     TypeVar,
@@ -16,6 +17,8 @@ from typing import (
 
 from flask_migrate import revision
 from flask_restx.reqparse import RequestParser
+from sqlalchemy import exists, inspect
+from sqlalchemy.sql.functions import func as sql_func
 
 from app.database import BaseModel, ExtendedModel, db
 
@@ -57,10 +60,27 @@ def argument_list_type(type_: Type[X]):
     return checker
 
 
-def unique_value_converter(model: Type["ExtendedModel"], key: str, type_: Type[X]):
+def unique_value_converter(
+    model: Type["ExtendedModel"], key: str, type_: Type[X], normalize: bool = False
+):
+    """Parser type rejecting values already taken
+
+    Args:
+        model (Type[ExtendedModel]): model holding the values
+        key (str): column's attribute
+        type_ (Type[X]): value's type
+        normalize (bool, optional): compare lower cased values, as logins do.
+            The column needs a `lower(column)` index. Defaults to False.
+    """
+
     def converter(val: Any, name: str = "") -> X:
         val = type_(val)
-        if model.query.filter(getattr(model, key) == val).count() > 0:
+        column = getattr(model, key)
+        if normalize:
+            condition = sql_func.lower(column) == val.lower()
+        else:
+            condition = column == val
+        if db.session.query(exists().where(condition)).scalar():
             raise TypeError(f"'{val}' is not allowed")
         return val
 
@@ -211,47 +231,26 @@ def get_user_entity_permissions(user_id: int):
     """returns list of user permissions on entities"""
 
     from app.apis.v1.entities.models import Entity
-    from app.apis.v1.roles.models import RoleEntityPermission
-    from app.apis.v1.users.models import UserEntityPermission, UserRoles
-
-    user_permissions_cte = (
-        UserEntityPermission.query.join(
-            Entity, UserEntityPermission.entity_id == Entity.id
-        )
-        .with_entities(
-            Entity.name.label("entity_name"),
-            UserEntityPermission.can_create.label("create"),
-            UserEntityPermission.can_edit.label("edit"),
-        )
-        .filter(UserEntityPermission.user_id == user_id)
-        .cte()
-    )
-
-    role_permissions_cte = (
-        RoleEntityPermission.query.join(
-            Entity, RoleEntityPermission.entity_id == Entity.id
-        )
-        .join(UserRoles, UserRoles.role_id == RoleEntityPermission.role_id)
-        .with_entities(
-            Entity.name.label("entity_name"),
-            RoleEntityPermission.can_create.label("create"),
-            RoleEntityPermission.can_edit.label("edit"),
-        )
-        .filter(UserRoles.user_id == user_id)
-        .cte()
-    )
+    from app.apis.v1.users.models import EffectiveEntityPermission
 
     class ResultTuple(NamedTuple):
         entity_name: str
         create: bool
         edit: bool
 
-    unioned_entity_permissions: List[ResultTuple] = (
-        db.session.query(role_permissions_cte)
-        .union(user_permissions_cte.select())
+    entity_permissions: List[ResultTuple] = (
+        EffectiveEntityPermission.query.join(
+            Entity, EffectiveEntityPermission.entity_id == Entity.id
+        )
+        .with_entities(
+            Entity.name.label("entity_name"),
+            EffectiveEntityPermission.can_create.label("create"),
+            EffectiveEntityPermission.can_edit.label("edit"),
+        )
+        .filter(EffectiveEntityPermission.user_id == user_id)
         .all()
     )
-    return unioned_entity_permissions
+    return entity_permissions
 
 
 def combine_parsers(*parsers: "RequestParser") -> RequestParser:
@@ -263,3 +262,74 @@ def combine_parsers(*parsers: "RequestParser") -> RequestParser:
             new_parser.add_argument(arg)
 
     return new_parser
+
+
+class IndexSuggestion(NamedTuple):
+    table: str
+    columns: Tuple[str, ...]
+    reason: str
+
+    @property
+    def ddl(self) -> str:
+        return "CREATE INDEX CONCURRENTLY ix_{0}_{1} ON {0} ({2});".format(
+            self.table, "_".join(self.columns), ", ".join(self.columns)
+        )
+
+
+def get_unindexed_foreign_keys() -> List[IndexSuggestion]:
+    """returns foreign keys of the database's tables not leading any index
+
+    Foreign keys are what relationships join and filter on, so each one is
+    expected to lead an index, a unique constraint or the primary key.
+    """
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+
+    suggestions: List[IndexSuggestion] = []
+    for table in db.metadata.sorted_tables:
+        if table.info.get("is_view") or table.name not in existing_tables:
+            continue
+        leading_columns = set(
+            index["column_names"][0]
+            for index in inspector.get_indexes(table.name)
+            + inspector.get_unique_constraints(table.name)
+            if index["column_names"]
+        )
+        leading_columns.update(
+            inspector.get_pk_constraint(table.name)["constrained_columns"][:1]
+        )
+        for foreign_key in inspector.get_foreign_keys(table.name):
+            columns = tuple(foreign_key["constrained_columns"])
+            if columns[0] not in leading_columns:
+                suggestions.append(
+                    IndexSuggestion(
+                        table.name,
+                        columns,
+                        f"foreign key to {foreign_key['referred_table']}",
+                    )
+                )
+    return suggestions
+
+
+class SeqScanStats(NamedTuple):
+    table: str
+    seq_scan: int
+    seq_tup_read: int
+    idx_scan: int
+    live_rows: int
+
+
+def get_seq_scan_stats(min_rows: int = 1000) -> List[SeqScanStats]:
+    """returns postgres tables scanned sequentially more often than by index"""
+    if db.engine.dialect.name != "postgresql":
+        return []
+    rows = db.session.execute(
+        """
+        select relname, seq_scan, seq_tup_read, coalesce(idx_scan, 0), n_live_tup
+        from pg_stat_user_tables
+        where seq_scan > coalesce(idx_scan, 0) and n_live_tup >= :min_rows
+        order by seq_tup_read desc
+        """,
+        params={"min_rows": min_rows},
+    ).all()
+    return [SeqScanStats(*row) for row in rows]
@@ -0,0 +1,288 @@
+import copy
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Optional, Set
+
+from flask import current_app, has_app_context
+from flask.app import Flask
+from flask_principal import Identity
+from sqlalchemy import event
+
+if TYPE_CHECKING:
+    from app.apis.v1.users.models import Session, User  # NOQA
+
+
+class CachedIdentity(NamedTuple):
+    identity: Identity
+    user: "User"
+    session: "Session"
+    loaded_at: float
+
+
+class LocalIdentityBackend(object):
+    """In-process LRU store with per key expiry
+
+    Keys stored with `evictable=False` (invalidation markers) are kept out of
+    the LRU so that filling the cache can never drop an invalidation.
+    """
+
+    def __init__(self, maxsize: int = 10000) -> None:
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._pinned: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: List[str]) -> List[Any]:
+        now = time.time()
+        values = []
+        with self._lock:
+            for key in keys:
+                store = self._pinned if key in self._pinned else self._entries
+                expires, value = store.get(key, (None, None))
+                if expires is not None and expires < now:
+                    store.pop(key, None)
+                    value = None
+                elif key in self._entries:
+                    self._entries.move_to_end(key)
+                values.append(value)
+        return values
+
+    def set(self, key: str, value: Any, ttl: int, evictable: bool = True) -> None:
+        expires = time.time() + ttl
+        with self._lock:
+            if not evictable:
+                self._purge_pinned()
+                self._pinned[key] = (expires, value)
+                return
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            self._pinned.pop(key, None)
+
+    def _purge_pinned(self):
+        now = time.time()
+        for key in [key for key, (exp, _) in self._pinned.items() if exp < now]:
+            del self._pinned[key]
+
+
+class LocalSharedStore(object):
+    """Stand-in for a shared key/value server (redis-py compatible subset)
+
+    Values are kept as bytes, exactly like a remote store would, so the
+    shared backend can be exercised without running a server.
+    """
+
+    def __init__(self) -> None:
+        self._data: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        now = time.time()
+        with self._lock:
+            return [
+                value if expires is None or expires > now else None
+                for expires, value in (
+                    self._data.get(key, (None, None)) for key in keys
+                )
+            ]
+
+    def set(self, name: str, value: bytes, ex: int = None) -> None:
+        with self._lock:
+            self._data[name] = (time.time() + ex if ex else None, value)
+
+    def delete(self, *names: str) -> None:
+        with self._lock:
+            for name in names:
+                self._data.pop(name, None)
+
+
+class SharedIdentityBackend(object):
+    """Stores pickled entries in a shared server so all workers see them"""
+
+    def __init__(self, client: Any, prefix: str = "identity-cache:") -> None:
+        self.client = client
+        self.prefix = prefix
+
+    def get_many(self, keys: List[str]) -> List[Any]:
+        return [
+            pickle.loads(value) if value is not None else None
+            for value in self.client.mget([self.prefix + key for key in keys])
+        ]
+
+    def set(self, key: str, value: Any, ttl: int, evictable: bool = True) -> None:
+        self.client.set(self.prefix + key, pickle.dumps(value), ex=ttl)
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self.prefix + key)
+
+
+class IdentityCache(object):
+    """Caches the principal identity, user and session built for a jwt
+
+    Entries are keyed by the session's jti. Invalidating a user (or everything)
+    stores a timestamp marker, any entry loaded before the marker is ignored.
+    Markers live as long as entries do, so an expired marker can only hide
+    entries that already expired.
+    """
+
+    def init_app(self, app: Flask) -> None:
+        backend_name = app.config.get("IDENTITY_CACHE_BACKEND", "local")
+        backend = None
+        if backend_name == "local":
+            backend = LocalIdentityBackend(app.config["IDENTITY_CACHE_MAXSIZE"])
+        elif backend_name == "shared":
+            backend = SharedIdentityBackend(self._shared_client(app))
+        elif backend_name != "null":
+            raise ValueError(f"Unknown identity cache backend '{backend_name}'")
+
+        app.extensions["identity_cache"] = backend
+        register_invalidation_listeners()
+
+    @staticmethod
+    def _shared_client(app: Flask):
+        url = app.config.get("IDENTITY_CACHE_URL")
+        if not url:
+            return LocalSharedStore()
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("IDENTITY_CACHE_URL requires the redis package")
+        return redis.Redis.from_url(url)
+
+    @property
+    def backend(self):
+        if not has_app_context():
+            return None
+        return current_app.extensions.get("identity_cache")
+
+    @property
+    def ttl(self) -> int:
+        return current_app.config["IDENTITY_CACHE_TTL"]
+
+    @staticmethod
+    def clock() -> float:
+        return time.time()
+
+    def get(self, jti: str, user_id: int) -> Optional[CachedIdentity]:
+        """Returns the cached identity with user & session attached to db session"""
+        from app.database import db
+
+        if self.backend is None:
+            return None
+        entry, user_marker, global_marker = self.backend.get_many(
+            [f"jti:{jti}", f"user:{user_id}", "all"]
+        )
+        if (
+            entry is None
+            or entry.user.id != user_id
+            or entry.loaded_at <= max(user_marker or 0, global_marker or 0)
+        ):
+            return None
+
+        identity = copy.copy(entry.identity)
+        identity.provides = set(identity.provides)
+        return CachedIdentity(
+            identity=identity,
+            user=db.session.merge(entry.user, load=False),
+            session=db.session.merge(entry.session, load=False),
+            loaded_at=entry.loaded_at,
+        )
+
+    def set(
+        self,
+        jti: str,
+        identity: Identity,
+        user: "User",
+        session: "Session",
+        loaded_at: float,
+    ) -> None:
+        """Stores detached copies of the identity, user & session built for this jti
+
+        Args:
+            loaded_at (float): clock() value taken before the user was loaded
+        """
+        if self.backend is None:
+            return
+        entry = CachedIdentity(identity, user, session, loaded_at)
+        self.backend.set(f"jti:{jti}", pickle.loads(pickle.dumps(entry)), self.ttl)
+
+    def invalidate_session(self, jti: str) -> None:
+        if self.backend is not None:
+            self.backend.delete(f"jti:{jti}")
+
+    def invalidate_user(self, user_id: int) -> None:
+        if self.backend is not None:
+            self.backend.set(f"user:{user_id}", self.clock(), self.ttl, False)
+
+    def clear(self) -> None:
+        if self.backend is not None:
+            self.backend.set("all", self.clock(), self.ttl, False)
+
+
+identity_cache = IdentityCache()
+
+
+_listeners_registered = False
+
+
+def _collect_invalidations(session, flush_context):
+    from app.apis.v1.entities.models import Entity
+    from app.apis.v1.organization.models import Organization
+    from app.apis.v1.roles.models import Role, RoleEntityPermission
+    from app.apis.v1.users.models import Session as UserSession
+    from app.apis.v1.users.models import (
+        User,
+        UserAffiliation,
+        UserEntityPermission,
+        UserRoles,
+    )
+
+    pending: Dict[str, Set] = session.info.setdefault(
+        "identity_invalidations", {"users": set(), "sessions": set(), "all": set()}
+    )
+    for instance in session.new | session.dirty | session.deleted:
+        if isinstance(instance, User):
+            pending["users"].add(instance.id)
+        elif isinstance(instance, (UserRoles, UserEntityPermission, UserAffiliation)):
+            pending["users"].add(instance.user_id)
+        elif isinstance(instance, UserSession):
+            pending["sessions"].add(instance.token)
+        elif isinstance(instance, (Role, RoleEntityPermission, Entity, Organization)):
+            pending["all"].add(True)
+
+
+def _apply_invalidations(session):
+    pending = session.info.pop("identity_invalidations", None)
+    if not pending:
+        return
+    if pending["all"]:
+        identity_cache.clear()
+    for user_id in pending["users"]:
+        identity_cache.invalidate_user(user_id)
+    for jti in pending["sessions"]:
+        identity_cache.invalidate_session(jti)
+
+
+def _discard_invalidations(session, previous_transaction):
+    session.info.pop("identity_invalidations", None)
+
+
+def register_invalidation_listeners():
+    """Invalidates cached identities when roles, entity permissions,
+    affiliations or sessions change, once the change is committed."""
+    global _listeners_registered
+    if _listeners_registered:
+        return
+    from app.database import db
+
+    event.listen(db.session, "after_flush", _collect_invalidations)
+    event.listen(db.session, "after_commit", _apply_invalidations)
+    event.listen(db.session, "after_soft_rollback", _discard_invalidations)
+    _listeners_registered = True
@@ -0,0 +1,138 @@
+from typing import TYPE_CHECKING, NamedTuple, Optional, Tuple
+
+from sqlalchemy import and_, cast, literal, select
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import GenericFunction
+from sqlalchemy.sql.sqltypes import String
+
+from app.database import db
+from app.utils.permission_bits import ids_to_bits
+
+if TYPE_CHECKING:
+    from app.apis.v1.users.models import Session, User  # NOQA
+
+NAMES_SEPARATOR = "\x1f"
+
+
+class group_names(GenericFunction):
+    """Aggregates names into a single separated string"""
+
+    type = String()
+    inherit_cache = True
+
+
+@compiles(group_names)
+def _group_names(element, compiler, **kw):
+    return "group_concat(%s, %s)" % (
+        compiler.process(element.clauses, **kw),
+        compiler.process(literal(NAMES_SEPARATOR), **kw),
+    )
+
+
+@compiles(group_names, "postgresql")
+def _group_names_postgresql(element, compiler, **kw):
+    return "string_agg(%s, %s)" % (
+        compiler.process(element.clauses, **kw),
+        compiler.process(literal(NAMES_SEPARATOR), **kw),
+    )
+
+
+def _split_names(value: Optional[str]) -> Tuple[str, ...]:
+    return tuple(sorted(value.split(NAMES_SEPARATOR))) if value else ()
+
+
+def _ids_bits(value: Optional[str]) -> int:
+    return ids_to_bits(int(id_) for id_ in _split_names(value))
+
+
+class IdentityRecord(NamedTuple):
+    """Everything needed to build a principal identity for a session"""
+
+    user_id: int
+    session_id: int
+    active: bool
+    roles: Tuple[str, ...]
+    role_bits: int
+    create_bits: int
+    edit_bits: int
+    organization: Optional[str]
+
+
+class LoadedIdentity(NamedTuple):
+    record: IdentityRecord
+    user: "User"
+    session: "Session"
+
+
+def _permitted_entities(user_id: int, flag: str):
+    from app.apis.v1.users.models import EffectiveEntityPermission
+
+    return (
+        select(group_names(cast(EffectiveEntityPermission.entity_id, String)))
+        .where(
+            and_(
+                EffectiveEntityPermission.user_id == user_id,
+                getattr(EffectiveEntityPermission, flag),
+            )
+        )
+        .scalar_subquery()
+    )
+
+
+def load_identity(jti: str, user_id: int) -> Optional[LoadedIdentity]:
+    """Loads session, user, roles, entity permissions and organization
+    using a single statement
+
+    Args:
+        jti (str): session's token
+        user_id (int): user's id claimed by the token
+
+    Returns:
+        LoadedIdentity: None if there's no active session for this token and user
+    """
+    from app.apis.v1.organization.models import Organization
+    from app.apis.v1.roles.models import Role
+    from app.apis.v1.users.models import Session, User, UserAffiliation, UserRoles
+
+    def user_roles(column):
+        return (
+            select(group_names(column))
+            .join(UserRoles, UserRoles.role_id == Role.id)
+            .where(UserRoles.user_id == user_id)
+            .scalar_subquery()
+        )
+
+    row = (
+        db.session.query(
+            User,
+            Session,
+            user_roles(Role.name),
+            user_roles(cast(Role.id, String)),
+            _permitted_entities(user_id, "can_create"),
+            _permitted_entities(user_id, "can_edit"),
+            Organization.name,
+        )
+        .join(
+            Session,
+            and_(Session.user_id == User.id, Session.token == jti, Session.active),
+        )
+        .outerjoin(UserAffiliation, UserAffiliation.user_id == User.id)
+        .outerjoin(Organization, Organization.id == UserAffiliation.org_id)
+        .filter(User.id == user_id)
+        .first()
+    )
+    if row is None:
+        return None
+
+    user, session, role_names, role_ids, create_ids, edit_ids, organization = row
+    record = IdentityRecord(
+        user_id=user.id,
+        session_id=session.id,
+        active=user.active,
+        roles=_split_names(role_names),
+        role_bits=_ids_bits(role_ids),
+        create_bits=_ids_bits(create_ids),
+        edit_bits=_ids_bits(edit_ids),
+        organization=organization,
+    )
+    return LoadedIdentity(record, user, session)
@@ -0,0 +1,139 @@
+import json
+import uuid
+from abc import ABC, abstractmethod
+from datetime import date, datetime
+from typing import Any, Dict, Optional, Type
+
+from flask import current_app, has_app_context, make_response
+from flask.app import Flask
+from flask.json import JSONEncoder as FlaskJSONEncoder
+
+from .extended_objects import IndexedAttribute
+
+# formatting only arguments, orjson output is always compact and in UTF-8
+_FORMATTING_ARGUMENTS = frozenset(("separators", "ensure_ascii"))
+
+
+def default(obj: Any) -> Any:
+    """JSON value of the types responses hold besides JSON ones"""
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if isinstance(obj, IndexedAttribute):
+        return obj.default()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class JSONProvider(ABC):
+    """Dumps responses to JSON, taking `json.dumps` arguments"""
+
+    @abstractmethod
+    def dumps(self, obj: Any, **kwargs) -> bytes:
+        pass
+
+
+class StdlibProvider(JSONProvider):
+    def dumps(self, obj: Any, **kwargs) -> bytes:
+        kwargs.setdefault("default", default)
+        return json.dumps(obj, **kwargs).encode()
+
+
+class OrjsonProvider(JSONProvider):
+    """orjson's encoder, the standard library's one is used for arguments orjson
+    doesn't have and values it can't encode, like integers over 64 bits"""
+
+    def __init__(self) -> None:
+        import orjson
+
+        self._orjson = orjson
+        self._fallback = StdlibProvider()
+
+    def option(self, kwargs: Dict) -> Optional[int]:
+        """orjson's option for the arguments, None if it has no equivalent"""
+        option = self._orjson.OPT_NON_STR_KEYS
+        for key, value in kwargs.items():
+            if key == "sort_keys":
+                option |= self._orjson.OPT_SORT_KEYS if value else 0
+            elif key == "indent":
+                if value not in (None, 2):
+                    return None
+                option |= self._orjson.OPT_INDENT_2 if value else 0
+            elif key not in _FORMATTING_ARGUMENTS and key != "default":
+                return None
+        return option
+
+    def dumps(self, obj: Any, **kwargs) -> bytes:
+        option = self.option(kwargs)
+        if option is None:
+            return self._fallback.dumps(obj, **kwargs)
+        try:
+            return self._orjson.dumps(
+                obj, default=kwargs.get("default", default), option=option
+            )
+        except TypeError:
+            return self._fallback.dumps(obj, **kwargs)
+
+
+PROVIDERS: Dict[str, Type[JSONProvider]] = {
+    "orjson": OrjsonProvider,
+    "json": StdlibProvider,
+}
+
+
+class JSONEncoder(FlaskJSONEncoder):
+    """Encodes `jsonify` responses with the app's JSON provider"""
+
+    def default(self, o: Any) -> Any:
+        try:
+            return default(o)
+        except TypeError:
+            return super().default(o)
+
+    def encode(self, o: Any) -> str:
+        return json_provider.dumps(
+            o,
+            default=self.default,
+            indent=self.indent,
+            sort_keys=self.sort_keys,
+            separators=(self.item_separator, self.key_separator),
+            ensure_ascii=self.ensure_ascii,
+        ).decode()
+
+
+class JSONProviders(object):
+    """Dumps responses with the app's `JSON_PROVIDER`, or the standard library
+    if orjson isn't installed"""
+
+    def init_app(self, app: Flask) -> None:
+        try:
+            provider = PROVIDERS[app.config["JSON_PROVIDER"]]()
+        except ImportError:
+            provider = StdlibProvider()
+        app.extensions["json_provider"] = provider
+        app.json_encoder = JSONEncoder
+
+    @property
+    def provider(self) -> JSONProvider:
+        if not has_app_context():
+            return _stdlib_provider
+        return current_app.extensions.get("json_provider", _stdlib_provider)
+
+    def dumps(self, obj: Any, **kwargs) -> bytes:
+        return self.provider.dumps(obj, **kwargs)
+
+
+_stdlib_provider = StdlibProvider()
+
+json_provider = JSONProviders()
+
+
+def output_json(data, code, headers=None):
+    """flask_restx's json representation, dumped by the app's JSON provider"""
+    settings = dict(current_app.config.get("RESTX_JSON", {}))
+    if current_app.debug:
+        settings.setdefault("indent", 4)
+
+    response = make_response(json_provider.dumps(data, **settings) + b"\n", code)
+    response.headers.extend(headers or {})
+    return response
@@ -0,0 +1,201 @@
+import base64
+import binascii
+import json
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional, Tuple
+
+from flask import current_app
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Query, aliased
+from sqlalchemy.sql.base import Executable
+from sqlalchemy.sql.elements import ClauseElement
+from sqlalchemy.sql.expression import text
+from sqlalchemy.sql.functions import func
+
+from app.database import BaseModel, db
+from app.exceptions import InvalidUsage
+from app.utils.eager_loading import loader_options
+
+if TYPE_CHECKING:
+    from app.utils.eager_loading import Relation
+
+COUNT_MODES = ("exact", "window", "estimated", "cached")
+
+
+class explain(Executable, ClauseElement):
+    """EXPLAIN statement returning the planner's estimates as json"""
+
+    inherit_cache = False
+
+    def __init__(self, statement) -> None:
+        self.statement = statement
+
+
+@compiles(explain, "postgresql")
+def _explain_postgresql(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def exact_count(query: Query) -> int:
+    return query.order_by(None).count()
+
+
+def estimated_count(query: Query, db_model: BaseModel) -> int:
+    """Counts rows from postgres statistics
+
+    Unfiltered queries use the table's statistics and filtered ones the planner's
+    estimate, falls back to an exact count on other databases or missing statistics.
+    """
+    if db.engine.dialect.name != "postgresql":
+        return exact_count(query)
+
+    if query.whereclause is None:
+        estimate = db.session.execute(
+            text("select reltuples from pg_class where oid = to_regclass(:table)"),
+            params={"table": db_model.__table__.fullname},
+        ).scalar()
+    else:
+        plan = db.session.execute(explain(query.order_by(None).statement)).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        estimate = plan[0]["Plan"]["Plan Rows"]
+
+    if estimate is None or estimate < 0:
+        return exact_count(query)
+    return int(estimate)
+
+
+_counts_lock = threading.Lock()
+
+
+def cached_count(query: Query) -> int:
+    """Exact count reused for `PAGINATION_COUNT_CACHE_TTL` seconds"""
+    compiled = query.order_by(None).statement.compile(db.engine)
+    key = (str(compiled), repr(sorted(compiled.params.items())))
+    counts: Dict[
+        Tuple[str, str], Tuple[float, int]
+    ] = current_app.extensions.setdefault("pagination_counts", {})
+    now = time.time()
+
+    cached = counts.get(key)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+
+    count = exact_count(query)
+    with _counts_lock:
+        if len(counts) >= current_app.config["PAGINATION_COUNT_CACHE_SIZE"]:
+            for stale_key in [k for k, (expiry, _) in counts.items() if expiry <= now]:
+                counts.pop(stale_key, None)
+            if len(counts) >= current_app.config["PAGINATION_COUNT_CACHE_SIZE"]:
+                counts.clear()
+        counts[key] = (now + current_app.config["PAGINATION_COUNT_CACHE_TTL"], count)
+    return count
+
+
+def encode_cursor(id_: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"id": id_}).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    """returns the id encoded in the cursor, raises `InvalidUsage` if malformed"""
+    try:
+        id_ = json.loads(base64.urlsafe_b64decode(cursor.encode()))["id"]
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise InvalidUsage.invalid_cursor()
+    if not isinstance(id_, int):
+        raise InvalidUsage.invalid_cursor()
+    return id_
+
+
+class Page(NamedTuple):
+    data: List[BaseModel]
+    count: int
+    next: Optional[str]
+    prev: Optional[str]
+
+
+def paginate(
+    query: Query,
+    db_model: BaseModel,
+    offset: int,
+    limit: int,
+    count_mode: Optional[str] = None,
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+    eager: Tuple["Relation", ...] = (),
+) -> Page:
+    """Gets a page of the query ordered by id and the number of rows matching it
+
+    Args:
+        query (Query): filtered query, without offset or limit
+        db_model (BaseModel): queried model
+        offset (int): rows to skip, ignored when a cursor is provided
+        limit (int): page size
+        count_mode (str, optional): one of `COUNT_MODES`.
+            Defaults to `PAGINATION_COUNT_MODE` configuration.
+        after (str, optional): cursor of the row preceding the page
+        before (str, optional): cursor of the row following the page
+        eager (Tuple[Relation, ...], optional): relationships loaded with the page
+
+    Returns:
+        Page: page rows, total count and cursors of adjacent pages
+    """
+    count_mode = count_mode or current_app.config["PAGINATION_COUNT_MODE"]
+    if count_mode not in COUNT_MODES:
+        raise ValueError(f"Unknown count mode {count_mode}")
+    if after and before:
+        raise InvalidUsage.custom_error("Use either after or before cursor", 400)
+    after_id = decode_cursor(after) if after else None
+    before_id = decode_cursor(before) if before else None
+
+    query = query.order_by(None)
+    if count_mode == "window":
+        # the total is computed before the cursor filters apply
+        counted = query.add_columns(func.count().over().label("total")).subquery()
+        model = aliased(db_model, counted)
+        page_query = db.session.query(model, counted.c.total)
+    else:
+        model = db_model
+        page_query = query
+
+    if before_id is not None:
+        page_query = page_query.filter(model.id < before_id).order_by(model.id.desc())
+    elif after_id is not None:
+        page_query = page_query.filter(model.id > after_id).order_by(model.id.asc())
+    else:
+        page_query = page_query.order_by(model.id.asc()).offset(offset)
+    if eager:
+        page_query = page_query.options(*loader_options(eager, model))
+
+    rows = page_query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if before_id is not None:
+        rows.reverse()
+
+    if count_mode == "window":
+        data = [row[0] for row in rows]
+        if rows:
+            count = rows[0][1]
+        else:
+            count = exact_count(query) if offset or after or before else 0
+    else:
+        data = rows
+        if count_mode == "estimated":
+            count = estimated_count(query, db_model)
+        elif count_mode == "cached":
+            count = cached_count(query)
+        else:
+            count = exact_count(query)
+
+    if before_id is not None:
+        has_next, has_prev = True, has_more
+    else:
+        has_next, has_prev = has_more, after_id is not None or offset > 0
+    return Page(
+        data=data,
+        count=count,
+        next=encode_cursor(data[-1].id) if has_next and data else None,
+        prev=encode_cursor(data[0].id) if has_prev and data else None,
+    )
@@ -7,6 +7,12 @@ from flask_restx.reqparse import RequestParser
 offset_parser = RequestParser()
 offset_parser.add_argument("offset", type=int, location="args", required=False)
 offset_parser.add_argument("limit", type=int, location="args", required=False)
+offset_parser.add_argument(
+    "after", type=str, location="args", required=False, help="next page cursor"
+)
+offset_parser.add_argument(
+    "before", type=str, location="args", required=False, help="previous page cursor"
+)
 
 
 class DateParserType(object):
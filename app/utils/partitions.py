@@ -0,0 +1,149 @@
+import re
+from datetime import date
+from typing import List, NamedTuple, Optional
+
+from sqlalchemy import text
+
+from app.database import db
+
+
+class MonthlyPartition(NamedTuple):
+    """A partition holding a month of a table's rows, named `<table>_yYYYYmMM`"""
+
+    table: str
+    start: date
+
+    @property
+    def name(self) -> str:
+        return f"{self.table}_y{self.start.year}m{self.start.month:02d}"
+
+    @property
+    def end(self) -> date:
+        return add_months(self.start, 1)
+
+    @property
+    def bounds(self) -> str:
+        return (
+            f"FOR VALUES FROM ('{self.start} 00:00:00+00') "
+            f"TO ('{self.end} 00:00:00+00')"
+        )
+
+    @property
+    def ddl(self) -> str:
+        return (
+            f"CREATE TABLE IF NOT EXISTS {self.name} PARTITION OF {self.table} "
+            f"{self.bounds};"
+        )
+
+
+def add_months(value: date, months: int) -> date:
+    """first day of the month `months` after the value's month"""
+    month = value.year * 12 + value.month - 1 + months
+    return date(month // 12, month % 12 + 1, 1)
+
+
+def monthly_partitions(table: str, start: date, end: date) -> List[MonthlyPartition]:
+    """partitions covering every month from the start's to the end's"""
+    partitions: List[MonthlyPartition] = []
+    month = add_months(start, 0)
+    while month <= end:
+        partitions.append(MonthlyPartition(table, month))
+        month = add_months(month, 1)
+    return partitions
+
+
+def default_partition(table: str) -> str:
+    """name of the partition holding the rows no monthly partition covers"""
+    return f"{table}_default"
+
+
+def is_partitioned(table: str) -> bool:
+    """whether the table is partitioned, always False out of PostgreSQL"""
+    if db.engine.dialect.name != "postgresql":
+        return False
+    return db.session.execute(
+        text(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table p "
+            "JOIN pg_class c ON c.oid = p.partrelid WHERE c.relname = :table)"
+        ),
+        dict(table=table),
+    ).scalar()
+
+
+def get_partition_names(table: str) -> List[str]:
+    """names of every partition of the table"""
+    return (
+        db.session.execute(
+            text(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "JOIN pg_class p ON p.oid = i.inhparent WHERE p.relname = :table"
+            ),
+            dict(table=table),
+        )
+        .scalars()
+        .all()
+    )
+
+
+def get_monthly_partitions(table: str) -> List[MonthlyPartition]:
+    """the table's monthly partitions, oldest first"""
+    partitions = [
+        partition
+        for partition in (
+            parse_partition_name(table, name) for name in get_partition_names(table)
+        )
+        if partition is not None
+    ]
+    return sorted(partitions, key=lambda partition: partition.start)
+
+
+def parse_partition_name(table: str, name: str) -> Optional[MonthlyPartition]:
+    match = re.fullmatch(rf"{re.escape(table)}_y(\d{{4}})m(\d{{2}})", name)
+    if match is None:
+        return None
+    return MonthlyPartition(table, date(int(match[1]), int(match[2]), 1))
+
+
+def create_monthly_partitions(
+    table: str, start: date, end: date, column: str = "created_at"
+) -> List[str]:
+    """creates missing partitions from the start's month to the end's,
+    partitioned by the column"""
+    partitions = monthly_partitions(table, start, end)
+    existing = get_partition_names(table)
+    for partition in partitions:
+        if partition.name in existing:
+            continue
+        if default_partition(table) in existing:
+            move_out_of_default(partition, column)
+        else:
+            db.session.execute(text(partition.ddl))
+    return [partition.name for partition in partitions]
+
+
+def move_out_of_default(partition: MonthlyPartition, column: str) -> None:
+    """Creates a partition whose month already has rows in the default one
+
+    The month can't be attached while the default partition holds its rows,
+    so they are moved to the new table before attaching it.
+    """
+    default = default_partition(partition.table)
+    for statement in (
+        f"CREATE TABLE {partition.name} (LIKE {partition.table} "
+        "INCLUDING DEFAULTS INCLUDING CONSTRAINTS)",
+        f"WITH moved AS (DELETE FROM {default} "
+        f"WHERE {column} >= '{partition.start} 00:00:00+00' "
+        f"AND {column} < '{partition.end} 00:00:00+00' RETURNING *) "
+        f"INSERT INTO {partition.name} SELECT * FROM moved",
+        f"ALTER TABLE {partition.table} ATTACH PARTITION {partition.name} "
+        f"{partition.bounds}",
+    ):
+        db.session.execute(text(statement))
+
+
+def drop_partition(partition: MonthlyPartition) -> None:
+    db.session.execute(
+        text(f"ALTER TABLE {partition.table} DETACH PARTITION {partition.name}")
+    )
+    db.session.execute(text(f"DROP TABLE {partition.name}"))
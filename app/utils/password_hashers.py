@@ -0,0 +1,145 @@
+from typing import Dict, Type
+
+from flask import current_app
+from flask.app import Flask
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+class PasswordHasher(object):
+    """Hashes passwords with an algorithm and its cost settings"""
+
+    def __init__(self, config: Dict) -> None:
+        pass
+
+    def identifies(self, hashed: str) -> bool:
+        """whether the hash was computed by this hasher's algorithm"""
+        raise NotImplementedError
+
+    def hash(self, password: str) -> str:
+        raise NotImplementedError
+
+    def verify(self, hashed: str, password: str) -> bool:
+        raise NotImplementedError
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """whether the hash was computed with other cost settings"""
+        raise NotImplementedError
+
+
+class Argon2Hasher(PasswordHasher):
+    def __init__(self, config: Dict) -> None:
+        import argon2
+
+        self._exceptions = (
+            argon2.exceptions.VerificationError,
+            argon2.exceptions.InvalidHash,
+        )
+        self._hasher = argon2.PasswordHasher(
+            time_cost=config["PASSWORD_ARGON2_TIME_COST"],
+            memory_cost=config["PASSWORD_ARGON2_MEMORY_COST"],
+            parallelism=config["PASSWORD_ARGON2_PARALLELISM"],
+        )
+
+    def identifies(self, hashed: str) -> bool:
+        return hashed.startswith("$argon2")
+
+    def hash(self, password: str) -> str:
+        return self._hasher.hash(password)
+
+    def verify(self, hashed: str, password: str) -> bool:
+        try:
+            return self._hasher.verify(hashed, password)
+        except self._exceptions:
+            return False
+
+    def needs_rehash(self, hashed: str) -> bool:
+        return self._hasher.check_needs_rehash(hashed)
+
+
+class BcryptHasher(PasswordHasher):
+    def __init__(self, config: Dict) -> None:
+        import bcrypt
+
+        self._bcrypt = bcrypt
+        self.rounds = config["PASSWORD_BCRYPT_ROUNDS"]
+
+    def identifies(self, hashed: str) -> bool:
+        return hashed.startswith(("$2a$", "$2b$", "$2y$"))
+
+    def hash(self, password: str) -> str:
+        return self._bcrypt.hashpw(
+            password.encode(), self._bcrypt.gensalt(self.rounds)
+        ).decode()
+
+    def verify(self, hashed: str, password: str) -> bool:
+        try:
+            return self._bcrypt.checkpw(password.encode(), hashed.encode())
+        except ValueError:
+            return False
+
+    def needs_rehash(self, hashed: str) -> bool:
+        return int(hashed.split("$")[2]) != self.rounds
+
+
+class WerkzeugHasher(PasswordHasher):
+    """werkzeug's salted hashes, the format of hashes stored before hashers"""
+
+    def __init__(self, config: Dict) -> None:
+        self.method = config["PASSWORD_WERKZEUG_METHOD"]
+
+    def identifies(self, hashed: str) -> bool:
+        return not hashed.startswith("$") and hashed.count("$") == 2
+
+    def hash(self, password: str) -> str:
+        return generate_password_hash(password, method=self.method)
+
+    def verify(self, hashed: str, password: str) -> bool:
+        return check_password_hash(hashed, password)
+
+    def needs_rehash(self, hashed: str) -> bool:
+        return hashed.split("$", 1)[0] != self.method
+
+
+HASHERS: Dict[str, Type[PasswordHasher]] = {
+    "argon2": Argon2Hasher,
+    "bcrypt": BcryptHasher,
+    "werkzeug": WerkzeugHasher,
+}
+
+
+class PasswordHashers(object):
+    """Hashes passwords with the app's `PASSWORD_HASHER` and verifies hashes
+    computed by any hasher, so hashes can be upgraded as users log in"""
+
+    def init_app(self, app: Flask) -> None:
+        hashers: Dict[str, PasswordHasher] = {}
+        for name, hasher_class in HASHERS.items():
+            try:
+                hashers[name] = hasher_class(app.config)
+            except ImportError:
+                if name == app.config["PASSWORD_HASHER"]:
+                    raise
+        app.extensions["password_hashers"] = (
+            hashers[app.config["PASSWORD_HASHER"]],
+            hashers,
+        )
+
+    @property
+    def default(self) -> PasswordHasher:
+        return current_app.extensions["password_hashers"][0]
+
+    def hash(self, password: str) -> str:
+        return self.default.hash(password)
+
+    def verify(self, hashed: str, password: str) -> bool:
+        for hasher in current_app.extensions["password_hashers"][1].values():
+            if hasher.identifies(hashed):
+                return hasher.verify(hashed, password)
+        return False
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """whether the hash wasn't computed by the default hasher's settings"""
+        return not self.default.identifies(hashed) or self.default.needs_rehash(hashed)
+
+
+password_hashers = PasswordHashers()
@@ -0,0 +1,93 @@
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, NamedTuple, Tuple
+
+from flask import current_app
+
+
+class BitRegistry(object):
+    """Maps row names of a table to bit masks
+
+    A row's id is its bit index, so masks computed in different workers or
+    stored in a shared cache agree with each other. Names are reloaded when
+    they get stale or when an unknown name is requested.
+    """
+
+    def __init__(self, name: str, loader: Callable[[], Iterable[Tuple[str, int]]]):
+        self.name = name
+        self.loader = loader
+        self._lock = threading.Lock()
+
+    def _state(self) -> Dict:
+        return current_app.extensions.setdefault(
+            f"bit_registry_{self.name}", {"masks": {}, "loaded_at": None}
+        )
+
+    def _load(self, state: Dict) -> None:
+        masks: Dict[str, int] = {}
+        for name, id_ in self.loader():
+            masks[name] = masks.get(name, 0) | 1 << id_
+        state["masks"] = masks
+        state["loaded_at"] = time.time()
+
+    def mask(self, name: str) -> int:
+        """returns the mask of rows with this name, 0 if there are none"""
+        state = self._state()
+        loaded_at = state["loaded_at"]
+        now = time.time()
+        if (
+            loaded_at is None
+            or now - loaded_at > current_app.config["PERMISSION_REGISTRY_TTL"]
+            or (name not in state["masks"] and now - loaded_at > 1)
+        ):
+            with self._lock:
+                if state["loaded_at"] == loaded_at:
+                    self._load(state)
+        return state["masks"].get(name, 0)
+
+    def reset(self) -> None:
+        self._state()["loaded_at"] = None
+
+
+def _load_entities():
+    from app.apis.v1.entities.models import Entity
+
+    return Entity.query.with_entities(Entity.name, Entity.id).all()
+
+
+def _load_roles():
+    from app.apis.v1.roles.models import Role
+
+    return Role.query.with_entities(Role.name, Role.id).all()
+
+
+entity_registry = BitRegistry("entities", _load_entities)
+role_registry = BitRegistry("roles", _load_roles)
+
+
+def ids_to_bits(ids: Iterable[int]) -> int:
+    bits = 0
+    for id_ in ids:
+        bits |= 1 << id_
+    return bits
+
+
+class PermissionBits(NamedTuple):
+    """Roles and entity permissions of an identity as bitsets"""
+
+    roles: int
+    create: int
+    edit: int
+
+    def has_roles(self, required: List[str], optional: List[List[str]]) -> bool:
+        """checks for all required roles and at least a role of each optional group"""
+        return all(self.roles & role_registry.mask(role) for role in required) and all(
+            any(self.roles & role_registry.mask(role) for role in group)
+            for group in optional
+        )
+
+    def can(self, entity: str, permissions: List[str]) -> bool:
+        mask = entity_registry.mask(entity)
+        return bool(mask) and all(
+            getattr(self, perm) & mask == mask for perm in permissions
+        )
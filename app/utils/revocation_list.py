@@ -0,0 +1,279 @@
+import hashlib
+import math
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+
+from flask import current_app, has_app_context
+from flask.app import Flask
+from sqlalchemy import event
+
+if TYPE_CHECKING:
+    from app.apis.v1.users.models import Session  # NOQA
+
+Revocation = Tuple[str, float]
+
+
+class BloomFilter(object):
+    """Fixed size set answering whether an item may have been added
+
+    Items never added are reported missing except for `error_rate` of them,
+    items can't be removed so the filter is rebuilt once many expired.
+    """
+
+    def __init__(self, capacity: int = 10000, error_rate: float = 0.001) -> None:
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str) -> Iterator[int]:
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+
+class LocalRevocationBackend(object):
+    """Revocations kept by the process, for single process deployments"""
+
+    def __init__(self) -> None:
+        self._revocations: List[Revocation] = []
+        self._lock = threading.Lock()
+
+    def add(self, jti: str, expires_at: float) -> None:
+        with self._lock:
+            self._revocations.append((jti, expires_at))
+
+    def since(self, cursor: int) -> Tuple[int, List[Revocation]]:
+        """revocations added after the cursor and the cursor to use next"""
+        with self._lock:
+            return len(self._revocations), self._revocations[cursor:]
+
+
+class SQLiteRevocationBackend(object):
+    """Revocations shared by the workers of a host through a SQLite file
+
+    Rows get increasing ids so each worker only reads the ones it hasn't seen,
+    expired rows are deleted as new ones are added.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._local = threading.local()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        # connections can't be shared with forked processes nor other threads
+        if getattr(self._local, "pid", None) != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS revocations ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "jti TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return self._local.connection
+
+    def add(self, jti: str, expires_at: float) -> None:
+        with self.connection as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute(
+                "DELETE FROM revocations WHERE expires_at < ?", (time.time(),)
+            )
+            connection.execute(
+                "INSERT INTO revocations (jti, expires_at) VALUES (?, ?)",
+                (jti, expires_at),
+            )
+
+    def since(self, cursor: int) -> Tuple[int, List[Revocation]]:
+        rows = self.connection.execute(
+            "SELECT id, jti, expires_at FROM revocations WHERE id > ? ORDER BY id",
+            (cursor,),
+        ).fetchall()
+        if not rows:
+            return cursor, []
+        return rows[-1][0], [(jti, expires_at) for _, jti, expires_at in rows]
+
+
+class RevocationList(object):
+    """Revoked session tokens of an app, checked without querying the database
+
+    Tokens are looked up in a bloom filter first, so the exact set is only
+    consulted for revoked tokens and rare false positives. Revocations made by
+    other workers are read from the backend every `sync_interval` seconds and
+    forgotten once the token expires.
+    """
+
+    def __init__(
+        self,
+        backend,
+        capacity: int = 10000,
+        error_rate: float = 0.001,
+        sync_interval: float = 1.0,
+    ) -> None:
+        self.backend = backend
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self._lock = threading.Lock()
+        self._revoked: Dict[str, float] = {}
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._cursor = 0
+        self._synced_at = 0.0
+
+    def revoke(self, jti: str, expires_at: float) -> None:
+        """Revokes the token until it expires
+
+        Args:
+            jti (str): session's token
+            expires_at (float): token's expiration timestamp
+        """
+        self.backend.add(jti, expires_at)
+        with self._lock:
+            self._add(jti, expires_at)
+
+    def is_revoked(self, jti: str) -> bool:
+        self.sync()
+        if jti not in self._bloom:
+            return False
+        return self._revoked.get(jti, 0) > time.time()
+
+    def sync(self, force: bool = False) -> None:
+        """reads revocations added by other workers"""
+        now = time.time()
+        if not force and now - self._synced_at < self.sync_interval:
+            return
+        with self._lock:
+            self._synced_at = now
+            self._cursor, revocations = self.backend.since(self._cursor)
+            for jti, expires_at in revocations:
+                self._add(jti, expires_at)
+
+    def _add(self, jti: str, expires_at: float) -> None:
+        if expires_at <= time.time():
+            return
+        if len(self._revoked) >= self.capacity:
+            self._rebuild()
+        self._revoked[jti] = max(expires_at, self._revoked.get(jti, 0))
+        self._bloom.add(jti)
+
+    def _rebuild(self) -> None:
+        now = time.time()
+        self._revoked = dict(
+            (jti, expires_at)
+            for jti, expires_at in self._revoked.items()
+            if expires_at > now
+        )
+        # grows when most revocations are still valid
+        self.capacity = max(self.capacity, len(self._revoked) * 2)
+        self._bloom = BloomFilter(self.capacity, self.error_rate)
+        for jti in self._revoked:
+            self._bloom.add(jti)
+
+    def stats(self) -> Dict[str, int]:
+        return dict(
+            revoked=len(self._revoked),
+            capacity=self.capacity,
+            bloom_bytes=len(self._bloom.bits),
+            cursor=self._cursor,
+        )
+
+
+class RevocationLists(object):
+    """Revokes sessions of the current app once their deletion or logout commits"""
+
+    def init_app(self, app: Flask) -> None:
+        backend_name = app.config["REVOCATION_LIST_BACKEND"]
+        backend = None
+        if backend_name == "sqlite":
+            backend = SQLiteRevocationBackend(
+                app.config["REVOCATION_LIST_PATH"]
+                or os.path.join(tempfile.gettempdir(), "revocations.sqlite")
+            )
+        elif backend_name == "local":
+            backend = LocalRevocationBackend()
+        elif backend_name != "null":
+            raise ValueError(f"Unknown revocation list backend '{backend_name}'")
+
+        app.extensions["revocation_list"] = backend and RevocationList(
+            backend,
+            capacity=app.config["REVOCATION_LIST_CAPACITY"],
+            error_rate=app.config["REVOCATION_LIST_ERROR_RATE"],
+            sync_interval=app.config["REVOCATION_LIST_SYNC_INTERVAL"],
+        )
+        register_revocation_listeners()
+
+    @property
+    def revocations(self) -> Optional[RevocationList]:
+        if not has_app_context():
+            return None
+        return current_app.extensions.get("revocation_list")
+
+    def is_revoked(self, jti: str) -> bool:
+        return self.revocations is not None and self.revocations.is_revoked(jti)
+
+    def revoke(self, jti: str, expires_at: float) -> None:
+        if self.revocations is not None:
+            self.revocations.revoke(jti, expires_at)
+
+
+revocation_list = RevocationLists()
+
+
+_listeners_registered = False
+
+
+def _revocation(user_session: "Session") -> Revocation:
+    if user_session.expires_at is not None:
+        return user_session.token, user_session.expires_at.timestamp()
+    # tokens without expiration are rejected by the database once uncached
+    return user_session.token, time.time() + current_app.config["IDENTITY_CACHE_TTL"]
+
+
+def _collect_revocations(session, flush_context):
+    from app.apis.v1.users.models import Session as UserSession
+
+    pending: List[Revocation] = session.info.setdefault("revocations", [])
+    for instance in session.deleted:
+        if isinstance(instance, UserSession):
+            pending.append(_revocation(instance))
+    for instance in session.dirty:
+        if isinstance(instance, UserSession) and not instance.active:
+            pending.append(_revocation(instance))
+
+
+def _apply_revocations(session):
+    for jti, expires_at in session.info.pop("revocations", []):
+        revocation_list.revoke(jti, expires_at)
+
+
+def _discard_revocations(session, previous_transaction):
+    session.info.pop("revocations", None)
+
+
+def register_revocation_listeners():
+    """Revokes sessions deleted or logged out, once the change is committed."""
+    global _listeners_registered
+    if _listeners_registered:
+        return
+    from app.database import db
+
+    event.listen(db.session, "after_flush", _collect_revocations)
+    event.listen(db.session, "after_commit", _apply_revocations)
+    event.listen(db.session, "after_soft_rollback", _discard_revocations)
+    _listeners_registered = True
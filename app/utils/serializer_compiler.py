@@ -0,0 +1,437 @@
+from collections import OrderedDict
+from datetime import date, datetime
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urlparse, urlunparse
+from weakref import WeakKeyDictionary
+
+from flask import current_app, has_app_context, has_request_context, request, url_for
+from flask_restx import fields, marshal
+from flask_restx.fields import _get_value_for_key, to_marshallable_type
+from flask_restx.inputs import boolean
+from flask_restx.marshalling import make, marshal_with
+from flask_restx.utils import unpack
+from werkzeug.routing import Map
+
+from .url_w_args import UrlWArgs
+
+Serializer = Callable[[Any], Any]
+
+# url_for's own arguments, kept so they're handled as by `fields.Url`
+_URL_FOR_ARGUMENTS = frozenset(("_external", "_anchor", "_method", "_scheme"))
+
+# errors formatting values, `marshal` raises some of them with other types or
+# messages than the inlined formatting does
+_FORMAT_ERRORS = (ValueError, TypeError, fields.MarshallingError)
+
+
+class _PlainTypes(dict):
+    """Whether values of a type are read with `getattr` only
+
+    Marshalling first tries `obj[key]` on iterables and `obj[int(key)]` on
+    lists, which can only fail for types that can't be subscripted.
+    """
+
+    def __missing__(self, cls: type) -> bool:
+        plain = not (
+            hasattr(cls, "__getitem__")
+            or issubclass(cls, (list, tuple))
+            or issubclass(cls, type)
+        )
+        self[cls] = plain
+        return plain
+
+
+class _Sequences(dict):
+    """Whether values of a type are marshalled item by item by `fields.List`"""
+
+    def __missing__(self, cls: type) -> bool:
+        sequence = (
+            issubclass(cls, (list, tuple))
+            and not issubclass(cls, dict)
+            and not hasattr(cls, "strip")
+        )
+        self[cls] = sequence
+        return sequence
+
+
+_EMPTY: Dict = {}
+_EMPTY_ORDERED: OrderedDict = OrderedDict()
+
+
+def _skip_none(items: Iterable[Tuple[str, Any]], ordered: bool) -> Dict:
+    kept = (
+        (key, value)
+        for key, value in items
+        if value is not None and value != _EMPTY_ORDERED and value != _EMPTY
+    )
+    return OrderedDict(kept) if ordered else dict(kept)
+
+
+_endpoint_values: "WeakKeyDictionary[Map, Dict[str, Optional[Set[str]]]]" = (
+    WeakKeyDictionary()
+)
+
+
+def _endpoint_keys(endpoint: str) -> Optional[Set[str]]:
+    """keys of the values the endpoint's urls are built with, None if any value
+    may be read"""
+    url_defaults = current_app.url_default_functions
+    if url_defaults.get(None) or (
+        "." in endpoint and url_defaults.get(endpoint.rsplit(".", 1)[0])
+    ):
+        return None
+    keys = set(_URL_FOR_ARGUMENTS)
+    for rule in current_app.url_map.iter_rules(endpoint):
+        keys.update(rule.arguments, rule.defaults or ())
+    return keys
+
+
+def _path_values(endpoint: str, data: Dict) -> Dict:
+    """the values the endpoint's urls can be built with
+
+    `fields.Url` passes all the object's attributes to `url_for`, which adds
+    the unknown ones to a query string the field then drops.
+    """
+    if endpoint[:1] == "." and has_request_context():
+        blueprint = request.blueprint
+        endpoint = endpoint[1:] if blueprint is None else blueprint + endpoint
+    # urls can't be added once the app handled requests
+    endpoints = _endpoint_values.setdefault(current_app.url_map, {})
+    if endpoint not in endpoints:
+        endpoints[endpoint] = _endpoint_keys(endpoint)
+    keys = endpoints[endpoint]
+    if keys is None:
+        return data
+    return dict((key, value) for key, value in data.items() if key in keys)
+
+
+def _url(field: fields.Url, obj: Any) -> str:
+    """`fields.Url.output`, building the url with the endpoint's values only"""
+    data = to_marshallable_type(obj)
+    endpoint = field.endpoint if field.endpoint is not None else request.endpoint
+    o = urlparse(
+        url_for(endpoint, _external=field.absolute, **_path_values(endpoint, data))
+    )
+    if field.absolute:
+        scheme = field.scheme if field.scheme is not None else o.scheme
+        return urlunparse((scheme, o.netloc, o.path, "", "", ""))
+    return urlunparse(("", "", o.path, "", "", ""))
+
+
+def _constant_default(field: fields.Raw) -> Tuple[bool, Any]:
+    """the value output when the field's value is None, if it doesn't vary"""
+    if callable(field.default):
+        return False, None
+    try:
+        default = field.default
+        return True, field.format(default) if default else default
+    except Exception:
+        return False, None
+
+
+class _Compiler(object):
+    def __init__(self) -> None:
+        self.namespace: Dict[str, Any] = dict(
+            OrderedDict=OrderedDict,
+            _boolean=boolean,
+            _date=date,
+            _datetime=datetime,
+            _lookup=_get_value_for_key,
+            _plain=_PlainTypes(),
+            _sequences=_Sequences(),
+            _skip_none=_skip_none,
+            _url=_url,
+        )
+        self.sources: List[str] = []
+        self.compiled: Dict[Tuple[int, bool, bool], str] = {}
+        # compiled models are kept so their ids aren't reused
+        self.models: List[Any] = []
+
+    def constant(self, value: Any, prefix: str = "_c") -> str:
+        name = f"{prefix}{len(self.namespace)}"
+        self.namespace[name] = value
+        return name
+
+    def model(self, model: Any, skip_none: bool, ordered: bool) -> str:
+        """name of the function marshalling data with the model"""
+        cache_key = (id(model), skip_none, ordered)
+        if cache_key in self.compiled:
+            return self.compiled[cache_key]
+        name = f"_m{len(self.compiled)}"
+        self.compiled[cache_key] = name
+        self.models.append(model)
+
+        resolved = getattr(model, "resolved", model)
+        if getattr(model, "__mask__", None) or any(
+            isinstance(make(field), fields.Wildcard)
+            for field in resolved.values()
+            if not isinstance(field, dict)
+        ):
+            self.namespace[name] = lambda data: marshal(
+                data, model, skip_none=skip_none, ordered=ordered
+            )
+            return name
+
+        lines = [
+            f"def {name}(obj):",
+            "    if isinstance(obj, (list, tuple)):",
+            f"        return [{name}(item) for item in obj]",
+            "    plain = _plain[type(obj)]",
+        ]
+        items = []
+        for index, (key, field) in enumerate(resolved.items()):
+            out = f"o{index}"
+            if isinstance(field, dict):
+                lines.append(
+                    f"    {out} = {self.model(field, skip_none, ordered)}(obj)"
+                )
+            else:
+                lines.extend(
+                    "    " + line for line in self.field(key, make(field), out, ordered)
+                )
+            items.append(f"({key!r}, {out})")
+
+        if skip_none:
+            lines.append(f"    return _skip_none(({', '.join(items)},), {ordered})")
+        elif ordered:
+            lines.append(f"    return OrderedDict(({', '.join(items)},))")
+        else:
+            lines.append(
+                "    return {"
+                + ", ".join(f"{key!r}: o{index}" for index, key in enumerate(resolved))
+                + "}"
+            )
+        self.sources.append("\n".join(lines))
+        return name
+
+    def getter(self, key: Any) -> List[str]:
+        """statements assigning the value `get_value(key, obj)` to `value`"""
+        if isinstance(key, int):
+            return [f"value = _lookup({key!r}, obj, None)"]
+        if callable(key):
+            return [f"value = {self.constant(key)}(obj)"]
+        segments = key.split(".")
+        lines = [
+            f"value = getattr(obj, {segments[0]!r}, None) "
+            f"if plain else _lookup({segments[0]!r}, obj, None)"
+        ]
+        for segment in segments[1:]:
+            lines.append(
+                f"value = getattr(value, {segment!r}, None) "
+                f"if _plain[type(value)] else _lookup({segment!r}, value, None)"
+            )
+        return lines
+
+    def format(self, field: fields.Raw) -> str:
+        """expression formatting `value` as the field does"""
+        field_type = type(field)
+        if field_type is fields.Raw:
+            return "value"
+        if field_type is fields.String:
+            return "str(value)"
+        if field_type is fields.Integer:
+            return "int(value)"
+        if field_type is fields.Boolean:
+            return "value if type(value) is bool else _boolean(value)"
+        formatter = self.constant(field.format, "_f")
+        if field_type is fields.DateTime and field.dt_format == "iso8601":
+            return (
+                f"value.isoformat() if type(value) is _datetime else {formatter}(value)"
+            )
+        if field_type is fields.Date:
+            return f"value.isoformat() if type(value) is _date else {formatter}(value)"
+        return f"{formatter}(value)"
+
+    def nested(self, field: fields.Nested, ordered: bool) -> Tuple[str, str]:
+        """names of the function marshalling the nested model and of the
+        value output instead of None"""
+        nested = self.model(field.nested, field.skip_none, ordered)
+        if field.allow_null:
+            return nested, "None"
+        if field.default is not None:
+            return nested, self.constant(field.default)
+        return nested, f"{nested}(None)"
+
+    def field(self, key: Any, field: fields.Raw, out: str, ordered: bool) -> List[str]:
+        """statements assigning the field's output for `obj` to `out`"""
+        field_type = type(field)
+        attribute = key if field.attribute is None else field.attribute
+
+        if field_type.output is fields.Raw.output and not field.mask:
+            constant, default = _constant_default(field)
+            if constant:
+                return self.getter(attribute) + [
+                    "if value is None:",
+                    f"    {out} = {self.constant(default)}",
+                    "else:",
+                    f"    {out} = {self.format(field)}",
+                ]
+
+        if field_type.output is fields.Nested.output:
+            nested, default = self.nested(field, ordered)
+            return self.getter(attribute) + [
+                "if value is None:",
+                f"    {out} = {default}",
+                "else:",
+                f"    {out} = {nested}(value)",
+            ]
+
+        if (
+            field_type.output is fields.List.output
+            and field_type.format is fields.List.format
+            and not callable(field.default)
+            and not field.mask
+        ):
+            return self.getter(attribute) + [
+                "if value is None:",
+                f"    {out} = {self.constant(field.default)}",
+                "elif _sequences[type(value)]:",
+                f"    {out} = {self.items(field)}",
+                "else:",
+                f"    {out} = {self.constant(field.output, '_o')}"
+                f"({key!r}, obj, ordered={ordered})",
+            ]
+
+        if field_type is fields.Url:
+            return [f"{out} = _url({self.constant(field)}, obj)"]
+        if field_type is UrlWArgs:
+            field_name = self.constant(field)
+            return [f"{out} = {field_name}.add_query(_url({field_name}, obj), obj)"]
+
+        return [
+            f"{out} = {self.constant(field.output, '_o')}({key!r}, obj, ordered={ordered})"
+        ]
+
+    def items(self, field: fields.List) -> str:
+        """expression formatting the items of the list `value` as `field` does"""
+        container = field.container
+        container_type = type(container)
+        if container.attribute is None:
+            if container_type.output is fields.Nested.output:
+                # items are marshalled without preserving order
+                nested, default = self.nested(container, False)
+                return (
+                    f"[{default} if item is None else {nested}(item) for item in value]"
+                )
+            if container_type is fields.Raw and not container.mask:
+                constant, default = _constant_default(container)
+                if constant:
+                    default = self.constant(default)
+                    return f"[{default} if item is None else item for item in value]"
+        elif (
+            container.attribute
+            and isinstance(container.attribute, str)
+            and container_type.output is fields.Raw.output
+            and not isinstance(container, fields.Nested)
+            and container_type is not fields.Raw
+        ):
+            item = self.item(container)
+            attribute = container.attribute
+            return (
+                f"[{item}(item if isinstance(item, dict) or hasattr(item, {attribute!r}) "
+                "else value) for item in value]"
+            )
+        return f"{self.constant(field.format, '_f')}(value)"
+
+    def item(self, field: fields.Raw) -> str:
+        """name of a function outputting the list item field for an object"""
+        name = f"_i{len(self.namespace)}"
+        self.namespace[name] = None
+        lines = [f"def {name}(obj):", "    plain = _plain[type(obj)]"]
+        lines.extend("    " + line for line in self.field(0, field, "out", False))
+        lines.append("    return out")
+        self.sources.append("\n".join(lines))
+        return name
+
+
+def compile_serializer(
+    model: Any, skip_none: bool = False, ordered: bool = False
+) -> Serializer:
+    """Compiles a function marshalling data with the model
+
+    The function reads values and formats them as `marshal` does but with the
+    model's fields, nested models and defaults resolved once. Fields
+    overriding how values are output are still called, and errors formatting
+    values are left to `marshal` so they are raised with its messages.
+
+    Args:
+        model: restx model or dict of fields
+        skip_none (bool, optional): leave out None values. Defaults to False.
+        ordered (bool, optional): output OrderedDicts. Defaults to False.
+
+    Returns:
+        Callable: marshals an object or a list of objects
+    """
+    compiler = _Compiler()
+    name = compiler.model(model, skip_none, ordered)
+    source = "\n\n".join(compiler.sources)
+    exec(
+        compile(source, f"<serializer {getattr(model, 'name', name)}>", "exec"),
+        compiler.namespace,
+    )
+    compiled = compiler.namespace[name]
+
+    def serialize(data: Any) -> Any:
+        try:
+            return compiled(data)
+        except _FORMAT_ERRORS:
+            out = marshal(data, model, skip_none=skip_none, ordered=ordered)
+            # marshal didn't raise, the generated code doesn't behave as it does
+            if has_app_context():
+                current_app.logger.warning(
+                    "Compiled serializer of %s failed, marshalled instead",
+                    getattr(model, "name", name),
+                    exc_info=True,
+                )
+            return out
+
+    # kept to inspect and test the generated code
+    serialize.compiled = compiled  # type: ignore
+    serialize.source = source  # type: ignore
+    return serialize
+
+
+class compiled_marshal_with(marshal_with):
+    """`marshal_with` marshalling with a serializer compiled on first use
+
+    Responses are marshalled by `marshal` when a fields mask is requested.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.serializer: Optional[Serializer] = None
+
+    def serialize(self, data: Any, mask: Any) -> Any:
+        if mask:
+            return marshal(
+                data, self.fields, self.envelope, self.skip_none, mask, self.ordered
+            )
+        if self.serializer is None:
+            self.serializer = compile_serializer(
+                self.fields, self.skip_none, self.ordered
+            )
+        out = self.serializer(data)
+        if self.envelope:
+            return (
+                OrderedDict([(self.envelope, out)])
+                if self.ordered
+                else {self.envelope: out}
+            )
+        return out
+
+    def __call__(self, f: Callable) -> Callable:
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            resp = f(*args, **kwargs)
+            mask = self.mask
+            if has_app_context():
+                mask = (
+                    request.headers.get(current_app.config["RESTX_MASK_HEADER"]) or mask
+                )
+            if isinstance(resp, tuple):
+                data, code, headers = unpack(resp)
+                return self.serialize(data, mask), code, headers
+            return self.serialize(resp, mask)
+
+        return wrapper
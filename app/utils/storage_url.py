@@ -0,0 +1,11 @@
+from flask import current_app
+from flask_restx.fields import String
+
+
+class StorageUrl(String):
+    """Outputs a stored file's url, signed if `STORAGE_SIGNED_URLS` is set"""
+
+    def format(self, value):
+        if current_app.config["STORAGE_SIGNED_URLS"] and hasattr(value, "signed_url"):
+            return value.signed_url()
+        return super().format(getattr(value, "url", value))
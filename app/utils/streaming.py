@@ -0,0 +1,53 @@
+import mimetypes
+
+from flask import Response, request
+from werkzeug.datastructures import ContentRange
+from werkzeug.http import dump_options_header
+
+from app.exceptions import InvalidUsage
+
+from .file_handler import FileHandler
+
+
+def stream_file(file: FileHandler, filename: str) -> Response:
+    """Streams a stored file as an attachment, honoring single byte range requests
+
+    Args:
+        file (FileHandler): stored file, a `StoredFile` works too
+        filename (str): attachment's name
+
+    Returns:
+        Response: 206 with the requested range, 200 with the whole file otherwise
+    """
+    response = file.send(filename)
+    if response is not None:
+        return response
+
+    length = file.size()
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": dump_options_header(
+            "attachment", {"filename": filename}
+        ),
+    }
+    status, start, stop = 200, 0, length
+
+    byte_range = request.range
+    # multiple ranges aren't supported, the whole file is sent instead
+    if byte_range is not None and len(byte_range.ranges) == 1:
+        bounds = byte_range.range_for_length(length)
+        if bounds is None:
+            raise InvalidUsage.range_not_satisfiable(length)
+        status, (start, stop) = 206, bounds
+        headers["Content-Range"] = ContentRange(
+            "bytes", start, stop, length
+        ).to_header()
+
+    headers["Content-Length"] = str(stop - start)
+    return Response(
+        file.stream(start, stop - 1) if status == 206 else file.stream(),
+        status=status,
+        headers=headers,
+        mimetype=mimetypes.guess_type(filename)[0] or "application/octet-stream",
+        direct_passthrough=True,
+    )
@@ -0,0 +1,400 @@
+import atexit
+import os
+import queue
+import threading
+import time
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from flask import current_app, has_app_context
+from flask.app import Flask
+from sqlalchemy.sql.expression import and_, or_
+from sqlalchemy.sql.functions import func
+
+from app.database import db
+
+Args = Tuple[Any, ...]
+Kwargs = Dict[str, Any]
+
+
+class RetryPolicy(NamedTuple):
+    """How many times a failed task is retried, with exponential backoff"""
+
+    retries: int = 0
+    backoff: float = 0.5
+    max_backoff: float = 30.0
+
+    def delay(self, attempt: int) -> float:
+        """seconds to wait before running again after the attempt failed"""
+        return min(self.backoff * 2 ** (attempt - 1), self.max_backoff)
+
+    @classmethod
+    def from_config(cls, config: Dict, retries: int = None) -> "RetryPolicy":
+        return cls(
+            retries=config["TASKS_RETRIES"] if retries is None else retries,
+            backoff=config["TASKS_RETRY_BACKOFF"],
+            max_backoff=config["TASKS_RETRY_MAX_BACKOFF"],
+        )
+
+
+Job = Tuple[Callable, Args, Kwargs, RetryPolicy]
+
+
+class TaskExecutor(object):
+    """Runs an app's tasks on worker threads fed by a bounded queue
+
+    When the queue is full the caller runs the task itself, slowing down rather
+    than dropping work. Eager executors always run tasks in the caller. Tasks
+    run by the caller are never retried, so that it doesn't sleep between
+    attempts.
+    """
+
+    def __init__(
+        self,
+        app: Flask,
+        workers: int = 4,
+        maxsize: int = 1000,
+        policy: RetryPolicy = RetryPolicy(),
+        eager: bool = False,
+    ) -> None:
+        self.app = app
+        self.workers = workers
+        self.maxsize = maxsize
+        self.policy = policy
+        self.eager = eager
+        self.metrics = dict(submitted=0, inline=0, succeeded=0, failed=0, retried=0)
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._pid = os.getpid()
+        self._queue: "queue.Queue[Optional[Job]]" = queue.Queue(self.maxsize)
+        self._threads: List[threading.Thread] = []
+
+    def _count(self, metric: str) -> None:
+        with self._lock:
+            self.metrics[metric] += 1
+
+    def submit(
+        self,
+        fn: Callable,
+        args: Args = (),
+        kwargs: Kwargs = None,
+        policy: RetryPolicy = None,
+    ) -> None:
+        """Runs the callable in the background
+
+        Args:
+            fn (Callable): task to run within the app's context
+            args (tuple, optional): positional arguments. Defaults to ().
+            kwargs (dict, optional): keyword arguments. Defaults to None.
+            policy (RetryPolicy, optional): Defaults to the executor's policy.
+        """
+        job = (fn, tuple(args), kwargs or {}, policy or self.policy)
+        self._count("submitted")
+        if self.eager:
+            self._execute(job, retry=False)
+            return
+        self._start()
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            self._count("inline")
+            self._execute(job, retry=False)
+
+    def run(self, fn: Callable, args: Args = (), kwargs: Kwargs = None) -> None:
+        """runs the callable in the caller once, with the same metrics"""
+        self._count("submitted")
+        self._execute((fn, tuple(args), kwargs or {}, self.policy), retry=False)
+
+    def _start(self) -> None:
+        if self._threads and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                # forked after the worker threads were started, they didn't survive
+                self._reset()
+            if self._threads:
+                return
+            for index in range(self.workers):
+                thread = threading.Thread(
+                    target=self._work, name=f"tasks-{index}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+        atexit.register(self.shutdown)
+
+    def _work(self) -> None:
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                self._execute(job)
+            finally:
+                self._queue.task_done()
+
+    def _execute(self, job: Job, retry: bool = True) -> None:
+        fn, args, kwargs, policy = job
+        in_app_context = (
+            has_app_context() and current_app._get_current_object() is self.app
+        )
+        with nullcontext() if in_app_context else self.app.app_context():
+            attempt = 0
+            while True:
+                attempt += 1
+                try:
+                    fn(*args, **kwargs)
+                except Exception:
+                    if not in_app_context:
+                        db.session.rollback()
+                    if not retry or attempt > policy.retries:
+                        self._count("failed")
+                        self.app.logger.exception(
+                            "Task %r failed after %s attempts", fn, attempt
+                        )
+                        return
+                    self._count("retried")
+                    time.sleep(policy.delay(attempt))
+                else:
+                    self._count("succeeded")
+                    return
+
+    def join(self) -> None:
+        """waits for queued tasks to be run"""
+        if self._threads and self._pid == os.getpid():
+            self._queue.join()
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """runs queued tasks and stops the worker threads"""
+        with self._lock:
+            threads, self._threads = self._threads, []
+        if not threads or self._pid != os.getpid():
+            return
+        for _ in threads:
+            try:
+                self._queue.put(None, timeout=timeout)
+            except queue.Full:
+                break
+        for thread in threads:
+            thread.join(timeout)
+        atexit.unregister(self.shutdown)
+
+    def stats(self) -> Dict[str, int]:
+        return dict(
+            self.metrics,
+            queued=self._queue.qsize(),
+            workers=len([thread for thread in self._threads if thread.is_alive()]),
+        )
+
+
+class DurableQueue(object):
+    """Tasks stored in the `queued_tasks` table, run by `tasks-worker` processes
+
+    Workers claim tasks with `FOR UPDATE SKIP LOCKED` so they never wait on each
+    other, tasks claimed by a worker that died are claimed again after
+    `lock_timeout` seconds.
+    """
+
+    def __init__(
+        self,
+        app: Flask,
+        registry: Dict[str, "Task"],
+        batch_size: int = 10,
+        lock_timeout: float = 300,
+        poll_interval: float = 1.0,
+    ) -> None:
+        self.app = app
+        self.registry = registry
+        self.batch_size = batch_size
+        self.lock_timeout = lock_timeout
+        self.poll_interval = poll_interval
+
+    def enqueue(self, task: "Task", args: Args, kwargs: Kwargs, delay: float = 0):
+        """adds the task to the session, it's queued once the session commits"""
+        from app.apis.v1.tasks.models import QueuedTask
+
+        policy = task.policy(self.app.config)
+        row = QueuedTask(
+            task.name,
+            args,
+            kwargs,
+            max_attempts=policy.retries + 1,
+            run_at=self._now() + timedelta(seconds=delay),
+        )
+        db.session.add(row)
+        return row
+
+    def _now(self) -> datetime:
+        return datetime.now(tz=self.app.config["TZ"])
+
+    def claim(self, limit: int):
+        """marks up to `limit` due tasks as running, committing the session"""
+        from app.apis.v1.tasks.models import QueuedTask
+
+        now = self._now()
+        rows = (
+            QueuedTask.query.filter(
+                or_(
+                    and_(QueuedTask.status == "queued", QueuedTask.run_at <= now),
+                    and_(
+                        QueuedTask.status == "running",
+                        QueuedTask.locked_at
+                        < now - timedelta(seconds=self.lock_timeout),
+                    ),
+                )
+            )
+            .order_by(QueuedTask.run_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        for row in rows:
+            row.status = "running"
+            row.locked_at = now
+            row.attempts += 1
+        db.session.commit()
+        return rows
+
+    def execute(self, row) -> bool:
+        """runs a claimed task, returns whether it succeeded"""
+        task = self.registry.get(row.name)
+        try:
+            if task is None:
+                raise LookupError(f"Unknown task '{row.name}'")
+            task.fn(*row.arguments["args"], **row.arguments["kwargs"])
+        except Exception as e:
+            db.session.rollback()
+            self.app.logger.exception("Queued task %s failed", row.name)
+            row.last_error = repr(e)
+            row.locked_at = None
+            if task is None or row.attempts >= row.max_attempts:
+                row.status = "failed"
+            else:
+                row.status = "queued"
+                delay = task.policy(self.app.config).delay(row.attempts)
+                row.run_at = self._now() + timedelta(seconds=delay)
+            db.session.commit()
+            return False
+        db.session.delete(row)
+        db.session.commit()
+        return True
+
+    def work(self, once: bool = False, batch_size: int = None) -> int:
+        """Runs queued tasks until stopped
+
+        Args:
+            once (bool, optional): return once no task is due. Defaults to False.
+            batch_size (int, optional): tasks claimed at a time.
+                Defaults to `TASKS_BATCH_SIZE` configuration.
+
+        Returns:
+            int: number of tasks run
+        """
+        processed = 0
+        while True:
+            rows = self.claim(batch_size or self.batch_size)
+            for row in rows:
+                self.execute(row)
+                processed += 1
+            if not rows:
+                if once:
+                    return processed
+                time.sleep(self.poll_interval)
+
+    def stats(self) -> Dict[str, int]:
+        """number of stored tasks by status"""
+        from app.apis.v1.tasks.models import QueuedTask
+
+        counts = dict(
+            db.session.query(QueuedTask.status, func.count())
+            .group_by(QueuedTask.status)
+            .all()
+        )
+        return dict((status, counts.get(status, 0)) for status in TASK_STATUSES)
+
+
+TASK_STATUSES = ("queued", "running", "failed")
+
+
+class Task(object):
+    """A registered function that can run in the background"""
+
+    def __init__(self, fn: Callable, name: str, retries: int = None) -> None:
+        self.fn = fn
+        self.name = name
+        self.retries = retries
+
+    def __call__(self, *args, **kwargs) -> Any:
+        return self.fn(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        return f"<Task {self.name}>"
+
+    def policy(self, config: Dict) -> RetryPolicy:
+        return RetryPolicy.from_config(config, self.retries)
+
+    def delay(self, *args, **kwargs) -> None:
+        """runs the task on the current app's thread pool"""
+        tasks.executor.submit(
+            self.fn, args, kwargs, policy=self.policy(current_app.config)
+        )
+
+    def enqueue(self, *args, **kwargs):
+        """stores the task in the durable queue, once the session commits"""
+        return tasks.durable.enqueue(self, args, kwargs)
+
+
+class Tasks(object):
+    """Registry of background tasks and the app's executors"""
+
+    def __init__(self) -> None:
+        self.registry: Dict[str, Task] = {}
+
+    def init_app(self, app: Flask) -> None:
+        app.extensions["tasks"] = TaskExecutor(
+            app,
+            workers=app.config["TASKS_WORKERS"],
+            maxsize=app.config["TASKS_QUEUE_SIZE"],
+            policy=RetryPolicy.from_config(app.config),
+            eager=app.config["TASKS_EAGER"],
+        )
+        app.extensions["durable_tasks"] = DurableQueue(
+            app,
+            self.registry,
+            batch_size=app.config["TASKS_BATCH_SIZE"],
+            lock_timeout=app.config["TASKS_LOCK_TIMEOUT"],
+            poll_interval=app.config["TASKS_POLL_INTERVAL"],
+        )
+
+    @property
+    def executor(self) -> TaskExecutor:
+        return current_app.extensions["tasks"]
+
+    @property
+    def durable(self) -> DurableQueue:
+        return current_app.extensions["durable_tasks"]
+
+    def task(self, name: str = None, retries: int = None) -> Callable[..., Task]:
+        """Registers a function as a task
+
+        Args:
+            name (str, optional): name stored in the durable queue.
+                Defaults to the function's module and name.
+            retries (int, optional): Defaults to `TASKS_RETRIES` configuration.
+        """
+
+        def decorator(fn: Callable) -> Task:
+            task = Task(fn, name or f"{fn.__module__}.{fn.__name__}", retries)
+            self.registry[task.name] = task
+            return task
+
+        return decorator
+
+    def submit(self, fn: Callable, *args, **kwargs) -> None:
+        """runs any callable on the current app's thread pool"""
+        self.executor.submit(fn, args, kwargs)
+
+
+tasks = Tasks()
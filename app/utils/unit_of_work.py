@@ -0,0 +1,93 @@
+from typing import TYPE_CHECKING, Any, Callable, List, Tuple
+
+from flask import current_app
+from flask.app import Flask
+from sqlalchemy import event
+from sqlalchemy.orm import Session, SessionTransaction
+
+from app.database import db
+from app.utils.tasks import tasks
+
+if TYPE_CHECKING:
+    from app.utils.file_handler import FileHandler  # NOQA
+
+Operation = Tuple[Flask, Callable, Tuple[Any, ...]]
+
+COMMIT_KEY = "unit_of_work_commit"
+ROLLBACK_KEY = "unit_of_work_rollback"
+
+
+def _run(operations: List[Operation]) -> None:
+    for app, operation, args in operations:
+        executor = app.extensions["tasks"]
+        if app.config["STORAGE_ASYNC"]:
+            executor.submit(operation, args)
+        else:
+            executor.run(operation, args)
+
+
+def _after_commit(session: Session) -> None:
+    if session.in_nested_transaction():
+        # a released savepoint, the outermost transaction may still roll back
+        return
+    session.info.pop(ROLLBACK_KEY, None)
+    _run(session.info.pop(COMMIT_KEY, []))
+
+
+def _after_transaction_end(session: Session, transaction: SessionTransaction):
+    if transaction.parent is not None:
+        return
+    # still queued when the outermost transaction ends: it didn't commit
+    session.info.pop(COMMIT_KEY, None)
+    _run(session.info.pop(ROLLBACK_KEY, []))
+
+
+class UnitOfWork(object):
+    """Ties storage side effects to the outcome of the current transaction
+
+    Operations queued while a transaction is open run once it commits and are
+    discarded otherwise, compensations only run if it ends without committing.
+    With `STORAGE_ASYNC` they run on the task executor so responses don't wait
+    on the storage provider.
+    """
+
+    def init_app(self, app: Flask) -> None:
+        if not event.contains(db.session, "after_commit", _after_commit):
+            event.listen(db.session, "after_commit", _after_commit)
+            event.listen(db.session, "after_transaction_end", _after_transaction_end)
+
+    def _queue(self, key: str, operation: Callable, args: Tuple[Any, ...]) -> None:
+        app = current_app._get_current_object()
+        db.session().info.setdefault(key, []).append((app, operation, args))
+
+    def after_commit(self, operation: Callable, *args) -> None:
+        """runs the operation once the current transaction commits"""
+        self._queue(COMMIT_KEY, operation, args)
+
+    def on_rollback(self, operation: Callable, *args) -> None:
+        """runs the operation if the current transaction ends without committing"""
+        self._queue(ROLLBACK_KEY, operation, args)
+
+    def save(self, handler: "FileHandler") -> None:
+        """uploads the file once the current transaction commits"""
+        if current_app.config["STORAGE_ASYNC"]:
+            handler.detach()
+        self.after_commit(handler.save)
+
+    def delete(self, url: str) -> None:
+        """deletes the stored file once the current transaction commits"""
+        if current_app.config["TASKS_DURABLE"]:
+            # stored with the transaction, deleted even if this process dies
+            delete_file.enqueue(url)
+        else:
+            self.after_commit(delete_file, url)
+
+
+@tasks.task(name="storage.delete")
+def delete_file(url: str) -> None:
+    from app.utils.file_handler import FileHandler
+
+    FileHandler(url=url).delete()
+
+
+unit_of_work = UnitOfWork()
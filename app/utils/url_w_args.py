@@ -24,7 +24,10 @@ class UrlWArgs(Url):
         return key
 
     def output(self, key, obj, **kwargs):
-        o = urlparse(super().output(key, obj, **kwargs))
+        return self.add_query(super().output(key, obj, **kwargs), obj)
+
+    def add_query(self, url: str, obj) -> str:
+        o = urlparse(url)
 
         return urlunparse(
             (
@@ -0,0 +1,60 @@
+from flask import Flask
+
+from app.apis.v1.users.models import Session, User
+from app.database import db
+from app.utils.helpers import get_user_entity_permissions
+from app.utils.identity_loader import load_identity
+from tests.helpers import ExtendedClient, UserDict, count_statements
+
+
+def legacy_identity_load(jti: str, user_id: int):
+    """Lookups done by the user loader before the single statement loader"""
+    session = Session.get(token=jti, user_id=user_id)
+    user = User.get(id=user_id)
+    roles = [role.name for role in user.roles]
+    permissions = get_user_entity_permissions(user_id)
+    organization = user.affiliation.organization if user.affiliation else None
+
+    return session, roles, permissions, organization
+
+
+def test_identity_statements(
+    test_app: Flask, client: ExtendedClient, admin_user: UserDict
+):
+    """Counts statements needed to load the identity of an authenticated request"""
+    user_client = client("admin")
+
+    with test_app.app_context():
+        user = User.get(username=admin_user["username"])
+        session = Session.query.filter(Session.user_id == user.id).first()
+        jti, user_id = session.token, user.id
+
+        db.session.expunge_all()
+        with count_statements() as before:
+            legacy_identity_load(jti, user_id)
+
+        db.session.expunge_all()
+        with count_statements() as after:
+            loaded = load_identity(jti, user_id)
+
+        identity_cache = test_app.extensions["identity_cache"]
+        test_app.extensions["identity_cache"] = None
+        with count_statements() as uncached_request:
+            rv = user_client.get(f"/v1/users/{user_id}")
+        assert rv.status_code == 200
+
+        test_app.extensions["identity_cache"] = identity_cache
+        user_client.get(f"/v1/users/{user_id}")
+        with count_statements() as cached_request:
+            rv = user_client.get(f"/v1/users/{user_id}")
+        assert rv.status_code == 200
+
+    print(
+        "\nidentity statements: legacy={} single={} | request: uncached={} cached={}".format(
+            len(before), len(after), len(uncached_request), len(cached_request)
+        )
+    )
+    assert loaded.record.roles == tuple(admin_user["roles"])
+    assert len(after) == 1
+    assert len(after) < len(before)
+    assert len(cached_request) < len(uncached_request)
@@ -0,0 +1,94 @@
+import json
+import time
+from typing import Any, Dict
+
+import pytest
+from flask import Flask
+from flask_jwt_extended import create_access_token, get_jti, verify_jwt_in_request
+from flask_restx import marshal
+
+from app import create_app
+from app.apis.v1.projects.api_models import project_model
+from app.apis.v1.projects.models import Project
+from app.apis.v1.users.api_models import session_model, user_model
+from app.apis.v1.users.models import Session, User
+from app.database import db
+from app.settings import TestConfig
+from app.utils.json_encoding import PROVIDERS, json_provider
+from tests.helpers import ExtendedClient, UserDict, add_affiliated_users, add_projects
+
+
+def provider_app(name: str) -> Flask:
+    """app dumping responses with the named provider"""
+
+    class ProviderConfig(TestConfig):
+        JSON_PROVIDER = name
+
+    return create_app(ProviderConfig)
+
+
+def dumps_time(app: Flask, payload: Any, rounds: int = 20) -> float:
+    """fastest seconds the app's provider takes to dump the payload"""
+    times = []
+    with app.app_context():
+        for _ in range(rounds):
+            start = time.perf_counter()
+            json_provider.dumps(payload)
+            times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def test_json_encoding(test_app: Flask, client: ExtendedClient, admin_user: UserDict):
+    """Providers dump pages of the list endpoints to the same JSON, reports the
+    time each one takes"""
+    pytest.importorskip("orjson")
+    client("admin")
+
+    with test_app.test_request_context():
+        admin = User.get(username=admin_user["username"])
+        add_affiliated_users(100, admin)
+        tokens = [create_access_token(admin) for _ in range(100)]
+        for token in tokens:
+            Session(admin, get_jti(token), "127.0.0.1", "Linux", "Firefox").save()
+        db.session.commit()
+        add_projects(50, User.query.limit(10).all(), [])
+
+    with test_app.test_request_context(
+        "/v1/users/", headers={"Authorization": f"Bearer {tokens[0]}"}
+    ):
+        verify_jwt_in_request()
+        sessions = Session.query.all()
+        payloads: Dict[str, Any] = {
+            "users": marshal(User.query.all(), user_model),
+            "sessions": marshal(sessions, session_model),
+            "projects": marshal(Project.prefetch(Project.query.all()), project_model),
+            # rows holding dates and uuids instead of their marshalled strings
+            "raw sessions": [
+                dict(
+                    id=session.id,
+                    slug=session.slug,
+                    created_at=session.created_at,
+                    expires_at=session.expires_at,
+                )
+                for session in sessions
+            ],
+        }
+
+    orjson, stdlib = PROVIDERS["orjson"](), PROVIDERS["json"]()
+    for payload in payloads.values():
+        assert json.loads(orjson.dumps(payload)) == json.loads(stdlib.dumps(payload))
+
+    stdlib_app, orjson_app = provider_app("json"), provider_app("orjson")
+    print("\npayload      | KiB   | json ms | orjson ms | speedup")
+    for name, payload in payloads.items():
+        stdlib_time = dumps_time(stdlib_app, payload)
+        orjson_time = dumps_time(orjson_app, payload)
+        print(
+            "{:12} | {:5.0f} | {:7.2f} | {:9.2f} | {:5.1f}".format(
+                name,
+                len(stdlib.dumps(payload)) / 1024,
+                stdlib_time * 1000,
+                orjson_time * 1000,
+                stdlib_time / orjson_time,
+            )
+        )
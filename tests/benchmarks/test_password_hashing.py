@@ -0,0 +1,92 @@
+import time
+from typing import Dict
+
+from flask import Flask
+
+from app.apis.v1.users.models import User
+from app.database import db
+from app.settings import Config
+from app.utils.password_hashers import HASHERS, password_hashers
+from tests.helpers import ExtendedClient, UserDict
+
+# cost settings to size login capacity with, from cheapest to strongest
+SETTINGS = [
+    ("werkzeug", {"PASSWORD_WERKZEUG_METHOD": "pbkdf2:sha256:260000"}),
+    ("bcrypt", {"PASSWORD_BCRYPT_ROUNDS": 10}),
+    ("bcrypt", {"PASSWORD_BCRYPT_ROUNDS": Config.PASSWORD_BCRYPT_ROUNDS}),
+    (
+        "argon2",
+        {
+            "PASSWORD_ARGON2_TIME_COST": 2,
+            "PASSWORD_ARGON2_MEMORY_COST": 19456,
+            "PASSWORD_ARGON2_PARALLELISM": 1,
+        },
+    ),
+    (
+        "argon2",
+        {
+            "PASSWORD_ARGON2_TIME_COST": Config.PASSWORD_ARGON2_TIME_COST,
+            "PASSWORD_ARGON2_MEMORY_COST": Config.PASSWORD_ARGON2_MEMORY_COST,
+            "PASSWORD_ARGON2_PARALLELISM": Config.PASSWORD_ARGON2_PARALLELISM,
+        },
+    ),
+]
+
+
+def verify_time(name: str, config: Dict, rounds: int = 3) -> float:
+    """average seconds a login spends verifying a password"""
+    hasher = HASHERS[name](config)
+    hashed = hasher.hash("correct horse battery staple")
+    start = time.perf_counter()
+    for _ in range(rounds):
+        assert hasher.verify(hashed, "correct horse battery staple")
+    return (time.perf_counter() - start) / rounds
+
+
+def test_login_throughput(test_app: Flask):
+    """Reports logins per second a worker can verify at each cost setting"""
+
+    print("\nhasher   | settings | ms/login | logins/s per worker thread")
+    for name, settings in SETTINGS:
+        seconds = verify_time(name, dict(test_app.config, **settings))
+        print(
+            "{:8} | {} | {:8.1f} | {:8.1f}".format(
+                name,
+                ", ".join(f"{key[9:].lower()}={val}" for key, val in settings.items()),
+                seconds * 1000,
+                1 / seconds,
+            )
+        )
+
+
+def test_login_rehash(test_app: Flask, client: ExtendedClient, site_user: UserDict):
+    """Logins upgrade hashes of other hashers or costs once, at the test costs"""
+
+    login_client = client()
+    credentials = dict(username=site_user["username"], password=site_user["password"])
+    # every other hasher, and the default one at another cost
+    hashes = [
+        hasher(test_app.config).hash(site_user["password"])
+        for name, hasher in HASHERS.items()
+        if name != test_app.config["PASSWORD_HASHER"]
+    ] + [
+        HASHERS["argon2"](dict(test_app.config, PASSWORD_ARGON2_TIME_COST=2)).hash(
+            site_user["password"]
+        )
+    ]
+
+    for legacy_hash in hashes:
+        with test_app.app_context():
+            User.get(username=site_user["username"])._password = legacy_hash
+            db.session.commit()
+
+        assert login_client.post("/v1/users/login", data=credentials).status_code == 200
+        with test_app.app_context():
+            upgraded = User.get(username=site_user["username"])._password
+            assert upgraded != legacy_hash
+            assert not password_hashers.needs_rehash(upgraded)
+
+        # the upgraded hash is kept by the next login
+        assert login_client.post("/v1/users/login", data=credentials).status_code == 200
+        with test_app.app_context():
+            assert User.get(username=site_user["username"])._password == upgraded
@@ -0,0 +1,48 @@
+import io
+
+from flask import Flask
+from flask_restx import marshal
+from werkzeug.datastructures import FileStorage
+
+from app.apis.v1.asset_storage.models import AssetStorage
+from app.apis.v1.projects.api_models import project_model
+from app.apis.v1.projects.models import Project
+from app.apis.v1.users.models import User
+from app.database import db
+from tests.helpers import ExtendedClient, UserDict, add_projects, count_statements
+
+
+def test_project_listing_statements(
+    test_app: Flask, client: ExtendedClient, admin_user: UserDict, tmp_path
+):
+    """Marshalling a page of projects takes as many statements whatever its size"""
+    client("admin")
+    test_app.config.update(STORAGE_TARGET="local", LOCAL_STORAGE_PATH=str(tmp_path))
+
+    with test_app.test_request_context():
+        users = User.query.all()
+        assets = [
+            AssetStorage.store(
+                FileStorage(io.BytesIO(content), filename="logo.png"),
+                added_by_id=users[0].id,
+            )
+            for content in (b"first logo", b"second logo")
+        ]
+        add_projects(20, users, assets)
+        names = [user.name for user in users]
+        urls = [asset.url for asset in assets]
+
+        counts = {}
+        for size in (5, 20):
+            db.session.expunge_all()
+            with count_statements() as statements:
+                projects = Project.prefetch(
+                    Project.query.order_by(Project.id).limit(size).all()
+                )
+                marshalled = marshal(projects, project_model)
+            counts[size] = len(statements)
+
+    print(f"\nproject listing statements: {counts}")
+    assert counts[5] == counts[20] == 3
+    assert [user["name"] for user in marshalled[-1]["users"]] == names
+    assert [asset["url"] for asset in marshalled[-1]["assets"]] == urls
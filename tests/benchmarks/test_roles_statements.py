@@ -0,0 +1,46 @@
+from flask import Flask
+
+from app.apis.v1.entities.models import Entity
+from app.apis.v1.roles.models import Role, RoleEntityPermission
+from app.apis.v1.users.models import User, UserRoles
+from app.database import db
+from tests.helpers import ExtendedClient, UserDict, count_statements
+
+
+def test_roles_statements(
+    test_app: Flask, client: ExtendedClient, admin_user: UserDict
+):
+    """Listing roles loads their users and entities in a fixed number of queries"""
+    admin_client = client("admin")
+
+    with test_app.app_context():
+        admin = User.get(username=admin_user["username"])
+        entities = [Entity(f"entity_{index}", "Entity") for index in range(5)]
+        db.session.add_all(entities)
+
+        counts, added = {}, 0
+        for total in (5, 30):
+            roles = [Role(f"role_{index}", "Role") for index in range(added, total)]
+            added = total
+            db.session.add_all(roles)
+            db.session.flush()
+            for role in roles:
+                db.session.add(UserRoles(user_id=admin.id, role=role))
+                for entity in entities:
+                    db.session.add(RoleEntityPermission(entity, role, can_edit=True))
+            db.session.commit()
+
+            # caches the identity and role names the request authorizes with
+            admin_client.get("/v1/roles/")
+            with count_statements() as statements:
+                rv = admin_client.get("/v1/roles/")
+            counts[total] = len(statements)
+
+    assert counts[5] == counts[30] == 3
+    listed = dict((role["name"], role) for role in rv.get_json()["data"])
+    assert [(user["id"], user["username"]) for user in listed["role_0"]["users"]] == [
+        (admin.id, admin_user["username"])
+    ]
+    assert [entity["name"] for entity in listed["role_29"]["entities"]] == [
+        f"entity_{index}" for index in range(5)
+    ]
@@ -0,0 +1,45 @@
+import io
+import time
+
+import boto3
+from flask import Flask
+
+from app.utils.file_handler import FileHandler
+
+
+def legacy_resource(app: Flask):
+    """Resource built by FileHandlerS3 before resources were pooled"""
+    return boto3.resource(
+        "s3",
+        endpoint_url="http://" + app.config["AWS_ENDPOINT"],
+        aws_access_key_id=app.config["AWS_ACCESS_KEY_ID"],
+        aws_secret_access_key=app.config["AWS_SECRET_ACCESS_KEY"],
+    )
+
+
+def test_s3_pool_overhead(s3_app: Flask):
+    """Reports handler overhead with and without pooled resources"""
+    rounds = 20
+
+    with s3_app.app_context():
+        start = time.perf_counter()
+        for _ in range(rounds):
+            legacy_resource(s3_app).Object(s3_app.config["S3_BUCKET_NAME"], "key")
+        legacy = (time.perf_counter() - start) / rounds
+
+        FileHandler(url="http://example.com/warmup")
+        start = time.perf_counter()
+        for _ in range(rounds):
+            FileHandler(url="http://example.com/key")
+        pooled = (time.perf_counter() - start) / rounds
+
+        handler = FileHandler(data=io.BytesIO(b"content"), title="file.txt")
+        handler.save()
+        stored = FileHandler(url=handler.url).get_data().read()
+
+    print(
+        "\ns3 handler overhead: legacy={:.2f}ms pooled={:.2f}ms".format(
+            legacy * 1000, pooled * 1000
+        )
+    )
+    assert stored == b"content"
@@ -0,0 +1,59 @@
+import time
+from typing import Any, Callable, List
+
+from flask import Flask
+from flask_jwt_extended import create_access_token, get_jti, verify_jwt_in_request
+from flask_restx import marshal
+
+from app.apis.v1.users.api_models import session_model, user_model
+from app.apis.v1.users.models import Session, User
+from app.database import db
+from app.utils.eager_loading import get_relations, loader_options
+from app.utils.serializer_compiler import compile_serializer
+from tests.helpers import ExtendedClient, UserDict, add_affiliated_users
+
+
+def best_time(serialize: Callable[[Any], Any], rows: List, rounds: int = 20) -> float:
+    """fastest seconds taken to serialize the rows, to leave out noise"""
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        serialize(rows)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def test_serializer_speed(
+    test_app: Flask, client: ExtendedClient, admin_user: UserDict
+):
+    """Reports how much faster compiled serializers output pages of users and
+    sessions than marshal"""
+    client("admin")
+
+    with test_app.test_request_context():
+        admin = User.get(username=admin_user["username"])
+        add_affiliated_users(100, admin)
+        tokens = [create_access_token(admin) for _ in range(100)]
+        for token in tokens:
+            Session(admin, get_jti(token), "127.0.0.1", "Linux", "Firefox").save()
+        db.session.commit()
+
+    with test_app.test_request_context(
+        "/v1/users/", headers={"Authorization": f"Bearer {tokens[0]}"}
+    ):
+        verify_jwt_in_request()
+        # relationships are loaded as by the users list, so only marshalling is timed
+        users = User.query.options(
+            *loader_options(get_relations(user_model, User), User)
+        ).all()
+        sessions = Session.query.all()
+
+        speedups = {}
+        for model, rows in ((user_model, users), (session_model, sessions)):
+            serializer = compile_serializer(model)
+            assert serializer(rows) == marshal(rows, model)
+            speedups[model.name] = best_time(
+                lambda rows: marshal(rows, model), rows
+            ) / best_time(serializer, rows)
+
+    print(f"\ncompiled serializers speedup: {speedups}")
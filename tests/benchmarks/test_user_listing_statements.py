@@ -0,0 +1,36 @@
+from flask import Flask
+
+from app.apis.v1.users.models import User
+from tests.helpers import (
+    ExtendedClient,
+    UserDict,
+    add_affiliated_users,
+    count_statements,
+)
+
+
+def test_user_listing_statements(
+    test_app: Flask, client: ExtendedClient, admin_user: UserDict
+):
+    """Listing users loads their roles and affiliations along with the page"""
+    admin_client = client("admin")
+
+    with test_app.app_context():
+        add_affiliated_users(50, User.get(username=admin_user["username"]))
+
+        # caches the identity and role names the request authorizes with
+        admin_client.get("/v1/users/")
+        counts = {}
+        for size in (10, 50):
+            with count_statements() as statements:
+                rv = admin_client.get(f"/v1/users/?limit={size}")
+            counts[size] = len(statements)
+
+    assert counts[10] == counts[50] == 3
+    users = [
+        user for user in rv.get_json()["data"] if user["username"].startswith("user_")
+    ]
+    assert len(users) == 48
+    assert all(user["organization"] == "Acme" for user in users)
+    assert all(user["department"]["name"] == "Sales" for user in users)
+    assert all(user["roles"] == ["staff"] for user in users)
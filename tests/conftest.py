@@ -60,6 +60,32 @@ def test_app(db_uri: str):
     return app
 
 
+@pytest.fixture()
+def s3_app(test_app: Flask):
+    """test app storing files in a local S3 stub"""
+    moto = pytest.importorskip("moto")
+    import boto3
+
+    from app.utils.file_handler import s3_pool
+
+    test_app.config.update(
+        AWS_ENDPOINT="s3.amazonaws.com",
+        AWS_REGION="us-east-1",
+        AWS_ACCESS_KEY_ID="testing",
+        AWS_SECRET_ACCESS_KEY="testing",
+        S3_BUCKET_NAME="test-bucket",
+    )
+    with moto.mock_s3():
+        boto3.resource(
+            "s3",
+            region_name="us-east-1",
+            aws_access_key_id="testing",
+            aws_secret_access_key="testing",
+        ).create_bucket(Bucket="test-bucket")
+        s3_pool.clear()
+        yield test_app
+
+
 @pytest.fixture()
 def client(admin_user: UserDict, site_user: UserDict, test_app: Flask):
     users = {"admin": admin_user, "user": site_user}
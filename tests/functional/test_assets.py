@@ -0,0 +1,132 @@
+import hashlib
+import io
+import os
+
+from flask import Flask
+from werkzeug.datastructures import FileStorage
+
+from app.apis.v1.asset_storage.models import AssetStorage, StoredObject
+from app.apis.v1.users.models import User
+from tests.helpers import ExtendedClient, UserDict
+
+
+def test_asset_download(s3_app: Flask, client: ExtendedClient, admin_user: UserDict):
+    """Assets are streamed whole or by byte range"""
+
+    admin_client = client("admin")
+    content = b"0123456789" * 10_000
+    with s3_app.app_context():
+        user = User.get(username=admin_user["username"])
+        asset_id = AssetStorage.store(
+            FileStorage(io.BytesIO(content), filename="data.bin"),
+            persist=True,
+            added_by_id=user.id,
+        ).id
+
+    rv = admin_client.get(f"/v1/assets/{asset_id}/download")
+    assert rv.status_code == 200 and rv.data == content
+    assert rv.headers["Content-Length"] == str(len(content))
+
+    rv = admin_client.get(
+        f"/v1/assets/{asset_id}/download", headers={"Range": "bytes=5-14"}
+    )
+    assert rv.status_code == 206 and rv.data == content[5:15]
+    assert rv.headers["Content-Range"] == f"bytes 5-14/{len(content)}"
+
+    rv = admin_client.get(
+        f"/v1/assets/{asset_id}/download", headers={"Range": "bytes=200000-"}
+    )
+    assert rv.status_code == 416
+    assert rv.headers["Content-Range"] == f"bytes */{len(content)}"
+
+    assert admin_client.get("/v1/assets/0/download").status_code == 404
+
+
+class UnseekableStream(io.BytesIO):
+    def seekable(self) -> bool:
+        return False
+
+
+def test_asset_deduplication(
+    test_app: Flask, client: ExtendedClient, admin_user: UserDict, tmp_path
+):
+    """Identical uploads share a stored object, removed with its last asset"""
+
+    client("admin")
+    test_app.config.update(STORAGE_TARGET="local", LOCAL_STORAGE_PATH=str(tmp_path))
+    content = b"project logo"
+    with test_app.app_context():
+        user_id = User.get(username=admin_user["username"]).id
+
+        def upload(stream: io.BytesIO, title: str) -> AssetStorage:
+            return AssetStorage.store(
+                FileStorage(stream, filename=title), persist=True, added_by_id=user_id
+            )
+
+        assets = [
+            upload(io.BytesIO(content), "logo.png"),
+            upload(io.BytesIO(content), "copy.png"),
+            # unseekable uploads are hashed while being stored
+            upload(UnseekableStream(content), "logo.png"),
+        ]
+        other = upload(UnseekableStream(b"other logo"), "other.png")
+
+        assert AssetStorage.query.count() == 4
+        assert [asset.title for asset in assets] == ["logo.png", "copy.png", "logo.png"]
+        assert StoredObject.query.count() == 2
+        stored_object = assets[0].stored_object
+        assert {asset.object_id for asset in assets} == {stored_object.id}
+        assert stored_object.ref_count == 3 and other.stored_object.ref_count == 1
+        assert stored_object.content_hash == hashlib.sha256(content).hexdigest()
+
+        for asset, expected_refs in zip(assets, (2, 1)):
+            asset.delete(persist=True)
+            assert AssetStorage.get(id=asset.id) is None
+            assert StoredObject.get(id=stored_object.id).ref_count == expected_refs
+        assert b"".join(assets[2].handler.stream()) == content
+
+        path = assets[2].handler.handler.path
+        assets[2].delete(persist=True)
+        assert StoredObject.get(id=stored_object.id) is None
+        assert not os.path.exists(path)
+
+
+def test_asset_owners(
+    test_app: Flask,
+    client: ExtendedClient,
+    admin_user: UserDict,
+    site_user: UserDict,
+    tmp_path,
+):
+    """Users uploading identical content each own an asset they can download"""
+
+    client("admin")
+    test_app.config.update(STORAGE_TARGET="local", LOCAL_STORAGE_PATH=str(tmp_path))
+    content = b"shared report"
+    with test_app.app_context():
+        for user_info, title in ((admin_user, "report.pdf"), (site_user, "mine.pdf")):
+            AssetStorage.store(
+                FileStorage(io.BytesIO(content), filename=title),
+                persist=True,
+                added_by_id=User.get(username=user_info["username"]).id,
+            )
+        admin = User.get(username=admin_user["username"])
+        user = User.get(username=site_user["username"])
+        assert [asset.title for asset in admin.assets] == ["report.pdf"]
+        assert [asset.title for asset in user.assets] == ["mine.pdf"]
+        assert admin.assets[0].object_id == user.assets[0].object_id
+        asset_ids = {"admin": admin.assets[0].id, "user": user.assets[0].id}
+
+    with test_app.test_client() as user_client:
+        rv = user_client.post(
+            "/v1/users/login",
+            data=dict(username=site_user["username"], password=site_user["password"]),
+        )
+        user_client.__class__ = ExtendedClient
+        user_client.csrf = rv.get_json()["token"]
+
+        rv = user_client.get(f"/v1/assets/{asset_ids['user']}/download")
+        assert rv.status_code == 200 and rv.data == content
+        assert "mine.pdf" in rv.headers["Content-Disposition"]
+        rv = user_client.get(f"/v1/assets/{asset_ids['admin']}/download")
+        assert rv.status_code == 401
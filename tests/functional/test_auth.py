@@ -1,3 +1,4 @@
+import pytest
 from flask import Flask, Response
 from flask.testing import FlaskClient
 
@@ -31,3 +32,77 @@ def test_logout(test_app: Flask, client: ExtendedClient, site_user: UserDict):
         rv: Response = user_client.get("/v1/logout")
 
         assert rv.status_code != 200
+
+
+def test_login_identifiers(
+    test_app: Flask, client: ExtendedClient, site_user: UserDict
+):
+    """Logins match the email or the username whatever their case"""
+    from app.apis.v1.users.models import User
+    from app.utils.helpers import unique_value_converter
+
+    client()
+    with test_app.app_context():
+        user = User.get(username=site_user["username"])
+        for identifier in (site_user["email"].upper(), site_user["username"].upper()):
+            assert User.find_by_login(identifier) == user
+        assert User.find_by_login("nobody@example.com") is None
+
+        converter = unique_value_converter(User, "email", str, normalize=True)
+        with pytest.raises(TypeError):
+            converter(site_user["email"].upper())
+        assert converter("nobody@example.com") == "nobody@example.com"
+
+
+def test_prune_sessions(test_app: Flask, client: ExtendedClient, admin_user: UserDict):
+    """Sessions expire with their token and are deleted in batches"""
+    from datetime import timedelta
+
+    from app.apis.v1.users.models import Session, User
+    from app.database import db
+
+    client("admin")
+    with test_app.app_context():
+        session = Session.query.one()
+        assert (
+            session.expires_at - session.created_at
+            == test_app.config["JWT_ACCESS_TOKEN_EXPIRES"]
+        )
+        token, user = session.token, User.get(session.user_id)
+        for days in range(5):
+            expired = Session(user, f"token-{days}", None, None, None)
+            expired.expires_at = expired.created_at - timedelta(days=days)
+            db.session.add(expired)
+        db.session.commit()
+
+    result = test_app.test_cli_runner().invoke(
+        args=["prune-sessions", "--batch-size", "2"]
+    )
+
+    assert result.exit_code == 0
+    assert "5 expired sessions deleted" in result.output
+    with test_app.app_context():
+        assert Session.query.one().token == token
+
+
+def test_revoked_session(test_app: Flask, client: ExtendedClient):
+    """Sessions logged out or deleted are revoked once committed"""
+    from app.apis.v1.users.models import Session
+    from app.database import db
+    from app.utils.revocation_list import revocation_list
+
+    admin_client = client("admin")
+    with test_app.app_context():
+        session = Session.query.one()
+        user_id, token = session.user_id, session.token
+
+    assert admin_client.get(f"/v1/users/{user_id}").status_code == 200
+
+    with test_app.app_context():
+        session = Session.query.one()
+        session.active = False
+        assert not revocation_list.is_revoked(token)
+        db.session.commit()
+        assert revocation_list.is_revoked(token)
+
+    assert admin_client.get(f"/v1/users/{user_id}").status_code != 200
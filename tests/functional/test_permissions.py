@@ -0,0 +1,102 @@
+from typing import Dict, Tuple
+
+from flask import Flask
+from flask_jwt_extended import jwt_required
+
+from app.apis.v1.entities.models import Entity
+from app.apis.v1.roles.models import Role, RoleEntityPermission
+from app.apis.v1.users.models import User
+from app.database import db
+from app.utils.decorators import has_permission
+from app.utils.helpers import get_user_entity_permissions
+from tests.helpers import ExtendedClient, UserDict
+
+
+def effective_permissions(username: str) -> Dict[str, Tuple[bool, bool]]:
+    """entity names mapped to the user's effective create and edit flags"""
+    user = User.get(username=username)
+    return {
+        permission.entity_name: (permission.create, permission.edit)
+        for permission in get_user_entity_permissions(user.id)
+    }
+
+
+def test_permissions_follow_grants(
+    test_app: Flask, client: ExtendedClient, admin_user: UserDict, site_user: UserDict
+):
+    """Effective permissions and endpoints authorization follow role and user grants"""
+
+    @test_app.route("/reports", methods=["POST"])
+    @jwt_required()
+    @has_permission("reports")
+    def create_report():
+        return {"created": True}
+
+    with test_app.app_context():
+        db.session.add_all(
+            [Entity("reports", "Reports"), Entity("invoices", "Invoices")]
+        )
+        db.session.commit()
+    admin_client = client("admin")
+
+    def can_create_reports() -> bool:
+        return admin_client.post("/reports").status_code == 200
+
+    with test_app.app_context():
+        admin = User.get(username=admin_user["username"])
+        reports = Entity.get(name="reports")
+        invoices = Entity.get(name="invoices")
+        editor = Role("editor", "Editor Role")
+        db.session.add(editor)
+        db.session.flush()
+        editor.add_entity(reports, can_edit=True)
+        editor_id, reports_id, invoices_id = editor.id, reports.id, invoices.id
+        # the role has no members yet
+        assert effective_permissions(admin_user["username"]) == {}
+
+        admin.add_roles(editor)
+        db.session.commit()
+        assert effective_permissions(admin_user["username"]) == {
+            "reports": (False, True)
+        }
+    assert not can_create_reports()
+
+    rv = admin_client.put(
+        f"/v1/roles/{editor_id}/entity",
+        json={"entityId": reports_id, "canCreate": True},
+    )
+    assert rv.status_code == 200
+    with test_app.app_context():
+        assert effective_permissions(admin_user["username"]) == {
+            "reports": (True, True)
+        }
+        assert effective_permissions(site_user["username"]) == {}
+    assert can_create_reports()
+
+    with test_app.app_context():
+        User.get(username=admin_user["username"]).add_entity(
+            Entity.get(id=invoices_id), can_create=True
+        )
+        assert effective_permissions(admin_user["username"]) == {
+            "reports": (True, True),
+            "invoices": (True, False),
+        }
+
+        # grants written without refreshing are picked up by the rebuild
+        db.session.execute(
+            RoleEntityPermission.__table__.update()
+            .where(RoleEntityPermission.role_id == editor_id)
+            .values(can_create=False)
+        )
+        db.session.commit()
+        assert effective_permissions(admin_user["username"])["reports"] == (True, True)
+    assert can_create_reports()
+
+    result = test_app.test_cli_runner().invoke(args=["rebuild-permissions"])
+    assert "rebuilt successfully" in result.output
+    with test_app.app_context():
+        assert effective_permissions(admin_user["username"]) == {
+            "reports": (False, True),
+            "invoices": (True, False),
+        }
+    assert not can_create_reports()
@@ -1,10 +1,17 @@
-from typing import Any, List, TypedDict
+from contextlib import contextmanager
+from datetime import date
+from typing import Any, Iterator, List, TypedDict
 
 from flask.testing import FlaskClient
+from sqlalchemy import event
 
+from app.apis.v1.asset_storage.models import AssetStorage
+from app.apis.v1.organization.models import Organization, OrganizationDepartment
+from app.apis.v1.projects.models import Project, ProjectAsset, ProjectUser
 from app.apis.v1.roles.models import Role
-from app.apis.v1.users.models import User
+from app.apis.v1.users.models import User, UserAffiliation
 from app.database import db
+from app.utils.extended_objects import IndexedAttribute
 
 
 class UserDict(TypedDict):
@@ -53,3 +60,81 @@ class ExtendedClient(FlaskClient):
     def open(self, *args, **kw):
         kw["headers"] = {**kw.get("headers", {}), **{"X-CSRF-TOKEN": self.csrf}}
         return super(ExtendedClient, self).open(*args, **kw)
+
+
+@contextmanager
+def count_statements() -> Iterator[List[str]]:
+    """Collects sql statements executed inside the context"""
+    statements: List[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+
+
+@contextmanager
+def assert_max_statements(count: int) -> Iterator[List[str]]:
+    """Fails if more than `count` sql statements are executed inside the context"""
+    with count_statements() as statements:
+        yield statements
+    assert len(statements) <= count, "\n".join(
+        [f"{len(statements)} statements executed, expected at most {count}:"]
+        + statements
+    )
+
+
+def add_affiliated_users(count: int, admin: User) -> None:
+    """Adds `count` users with a role, affiliated to an organization's department"""
+    organization = Organization(
+        "Acme",
+        addr_line1="Main street",
+        country="US",
+        city="Springfield",
+        email="contact@example.com",
+        phone="555",
+        contact_user_id=admin.id,
+    )
+    organization.slug = str(organization.slug)
+    db.session.add(organization)
+    db.session.flush()
+    department = OrganizationDepartment(name="Sales", org=organization)
+    role = Role("staff", "Staff role")
+    db.session.add_all([department, role])
+    db.session.flush()
+    for index in range(count):
+        user = User(
+            username=f"user_{index}",
+            password="123456",
+            password_check="123456",
+            email=f"user_{index}@example.com",
+            first_name="User",
+            last_name=str(index),
+        )
+        db.session.add(user)
+        db.session.flush()
+        user.add_roles([role])
+        db.session.add(
+            UserAffiliation(
+                user, organization, IndexedAttribute("Employee", 3), department
+            )
+        )
+    db.session.commit()
+
+
+def add_projects(count: int, users: List[User], assets: List[AssetStorage]) -> None:
+    """Adds `count` projects, each viewed by the users and holding the assets"""
+    for index in range(count):
+        project = Project(f"Project {index}", "", date(2026, 1, 1), time_frame=30)
+        project.slug = str(project.slug)
+        db.session.add(project)
+        db.session.flush()
+        db.session.add_all(
+            [ProjectUser(project, user, "viewer") for user in users]
+            + [ProjectAsset(project, asset) for asset in assets]
+        )
+    db.session.commit()
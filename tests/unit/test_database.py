@@ -0,0 +1,50 @@
+import pytest
+from flask import Flask
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.pool import NullPool
+
+from app.database import InstrumentedQueuePool, db, pool_options
+from tests.helpers import ExtendedClient
+
+
+@pytest.fixture()
+def queue_pool_app(test_app: Flask) -> Flask:
+    test_app.config["DB_POOL_MODE"] = "queue"
+    return test_app
+
+
+def test_pool_options(test_app: Flask):
+    """Pool options follow the configured pool mode"""
+
+    config = dict(test_app.config, DB_POOL_SIZE=3, DB_MAX_OVERFLOW=1)
+
+    assert pool_options(config, make_url("sqlite://")) == {"poolclass": NullPool}
+
+    config["DB_POOL_MODE"] = "queue"
+    options = pool_options(config, make_url("postgresql+psycopg2://db/app"))
+    assert options["poolclass"] is InstrumentedQueuePool
+    assert (options["pool_size"], options["max_overflow"]) == (3, 1)
+
+    config["DB_POOL_MODE"] = "pgbouncer"
+    options = pool_options(config, make_url("postgresql+psycopg://db/app"))
+    assert options["connect_args"] == {"prepare_threshold": None}
+
+    config["DB_POOL_MODE"] = "other"
+    with pytest.raises(ValueError):
+        pool_options(config, make_url("sqlite://"))
+
+
+def test_pool_metrics(queue_pool_app: Flask, client: ExtendedClient):
+    """Connections are reused and checkouts are reported"""
+
+    admin_client = client("admin")
+    admin_client.get("/v1/users/")
+    rv = admin_client.get("/v1/instrumentation/pool")
+
+    assert rv.status_code == 200
+    metrics = rv.get_json()
+    assert metrics["pool"] == InstrumentedQueuePool.__name__
+    assert metrics["checkouts"] > 0
+    assert metrics["checked_out"] == 0
+    with queue_pool_app.app_context():
+        assert db.engine.pool.checkedin() == 1
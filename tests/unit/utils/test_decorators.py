@@ -2,9 +2,13 @@ import pytest
 from flask import Flask
 from flask_principal import Identity, Permission, RoleNeed
 
+from app.apis.v1.entities.models import Entity
+from app.apis.v1.roles.models import Role
+from app.database import db
 from app.exceptions import InvalidUsage
 from app.utils import g
-from app.utils.decorators import check_roles, has_roles
+from app.utils.decorators import check_roles, has_permission, has_roles
+from app.utils.permission_bits import PermissionBits
 
 
 @pytest.fixture(scope="module")
@@ -72,3 +76,39 @@ def test_has_roles(test_app: Flask, admin_role: RoleNeed):
             assert isinstance(e, InvalidUsage)
             assert e.status_code == 401
             assert e.errors[0] == "Unauthorized access"
+
+
+@has_permission("project", ["create", "edit"])
+def add3(a: int, b: int) -> int:
+
+    return a + b
+
+
+def test_permission_bits(test_app: Flask):
+    """Given an identity with permission bitsets check roles and entity permissions"""
+    with test_app.app_context():
+        db.create_all()
+        admin_role = Role("admin", "Admin Role")
+        project = Entity("project", "Projects")
+        db.session.add_all([admin_role, project])
+        db.session.commit()
+
+        test_identity = Identity(1)
+        test_identity.permission_bits = PermissionBits(
+            roles=1 << admin_role.id, create=1 << project.id, edit=0
+        )
+        g.identity = test_identity
+
+        assert add1(1, 2) == 3
+
+        with pytest.raises(InvalidUsage):
+            add2(1, 2)
+
+        with pytest.raises(InvalidUsage):
+            add3(1, 2)
+
+        test_identity.permission_bits = test_identity.permission_bits._replace(
+            edit=1 << project.id
+        )
+
+        assert add3(1, 2) == 3
@@ -0,0 +1,20 @@
+from flask import Flask
+
+from app.utils.eager_loading import Relation, get_relations
+
+
+def test_user_model_relations(test_app: Flask):
+    """Nested models and dotted attributes are followed, other fields ignored"""
+    from app.apis.v1.users.api_models import session_model, user_model
+    from app.apis.v1.users.models import Session, User
+
+    with test_app.app_context():
+        assert get_relations(user_model, User) == (
+            Relation("roles", True),
+            Relation(
+                "affiliation",
+                False,
+                (Relation("organization", False), Relation("department", False)),
+            ),
+        )
+        assert get_relations(session_model, Session) == ()
@@ -0,0 +1,84 @@
+from datetime import datetime, timezone
+
+from flask import Flask, g
+
+from app.apis.v1.app_logging.models import ErrorLog
+from app.apis.v1.users.models import Session, User
+from app.database import db
+from app.handlers import normalize_errors
+from app.utils.error_log_writer import ErrorLogPipeline
+from tests.helpers import UserDict, count_statements, create_user
+
+
+def error_row(message: str) -> dict:
+    return dict(
+        code="500",
+        message=message,
+        stack_trace=f"trace of {message}",
+        occurrences=1,
+        last_occurred_at=None,
+        date_added=datetime.now(timezone.utc),
+        user_id=None,
+        added_by_id=None,
+        session_id=None,
+    )
+
+
+def test_batched_writes(test_app: Flask):
+    """Identical errors are merged and written by the worker once stopped"""
+
+    with test_app.app_context():
+        db.create_all()
+
+    pipeline = ErrorLogPipeline(test_app, flush_interval=60)
+    for message in ["a", "a", "b", "a"]:
+        pipeline.submit(error_row(message))
+    pipeline.stop()
+
+    with test_app.app_context():
+        occurrences = dict(
+            ErrorLog.query.with_entities(ErrorLog.message, ErrorLog.occurrences)
+        )
+    assert occurrences == {"a": 3, "b": 1}
+    assert pipeline.stats() == dict(
+        logged=4, merged=2, dropped=0, written=2, batches=1, failed_batches=0, pending=0
+    )
+
+
+def test_drop_policy(test_app: Flask):
+    """Distinct errors beyond the queue size are dropped"""
+
+    with test_app.app_context():
+        db.create_all()
+
+    pipeline = ErrorLogPipeline(test_app, maxsize=1, drop_policy="oldest")
+    pipeline.submit(error_row("a"))
+    pipeline.submit(error_row("b"))
+    pipeline.stop()
+
+    with test_app.app_context():
+        assert [log.message for log in ErrorLog.query] == ["b"]
+    assert pipeline.stats()["dropped"] == 1
+
+
+def test_synchronous_handler(test_app: Flask, admin_user: UserDict):
+    """Errors are written on the request thread when the pipeline is synchronous"""
+
+    with test_app.test_request_context():
+        db.create_all()
+        create_user(admin_user)
+        user = User.get(username=admin_user["username"])
+        g.session = Session(user, "jti", "127.0.0.1", "Linux", "Firefox")
+        g.session.save(True)
+        session_id = g.session.id
+        try:
+            raise ValueError("unexpected")
+        except ValueError as e:
+            with count_statements() as statements:
+                normalize_errors(e)
+
+        # the rolled back session and user aren't loaded again
+        assert not [sql for sql in statements if sql.startswith("SELECT")]
+        log = ErrorLog.query.one()
+    assert (log.message, log.occurrences) == ("unexpected", 1)
+    assert log.session_id == session_id
@@ -0,0 +1,32 @@
+from flask import Flask
+
+from app.database import db
+from app.utils.helpers import get_seq_scan_stats, get_unindexed_foreign_keys
+
+
+def test_unindexed_foreign_keys(test_app: Flask):
+    """Foreign keys leading an index aren't proposed"""
+
+    with test_app.app_context():
+        db.create_all()
+        suggestions = dict(
+            ((suggestion.table, suggestion.columns), suggestion)
+            for suggestion in get_unindexed_foreign_keys()
+        )
+
+        assert ("sessions", ("user_id",)) not in suggestions
+        assert ("user_roles", ("user_id",)) not in suggestions
+        assert ("asset_storage", ("added_by_id",)) not in suggestions
+        assert suggestions[("user_roles", ("role_id",))].ddl == (
+            "CREATE INDEX CONCURRENTLY ix_user_roles_role_id ON user_roles (role_id);"
+        )
+        assert get_seq_scan_stats() == []
+
+
+def test_index_advisor_command(test_app: Flask):
+    with test_app.app_context():
+        db.create_all()
+    result = test_app.test_cli_runner().invoke(args=["index-advisor"])
+
+    assert result.exit_code == 0
+    assert "ix_user_roles_role_id" in result.output
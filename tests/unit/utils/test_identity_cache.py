@@ -0,0 +1,54 @@
+import time
+
+from app.utils.identity_cache import (
+    LocalIdentityBackend,
+    LocalSharedStore,
+    SharedIdentityBackend,
+)
+
+
+def test_local_backend_lru():
+    """Least recently used entries are evicted while markers are kept"""
+
+    backend = LocalIdentityBackend(maxsize=2)
+    backend.set("user:1", 1.0, 60, evictable=False)
+    backend.set("a", 1, 60)
+    backend.set("b", 2, 60)
+
+    assert backend.get_many(["a"]) == [1]
+
+    backend.set("c", 3, 60)
+
+    assert backend.get_many(["a", "b", "c", "user:1"]) == [1, None, 3, 1.0]
+
+
+def test_local_backend_ttl():
+    """Expired entries are not returned"""
+
+    backend = LocalIdentityBackend()
+    backend.set("a", 1, -1)
+    backend.set("b", 2, 60)
+
+    assert backend.get_many(["a", "b"]) == [None, 2]
+
+    backend.delete("b")
+
+    assert backend.get_many(["b"]) == [None]
+
+
+def test_shared_backend():
+    """Values go through pickling and are shared between backend instances"""
+
+    store = LocalSharedStore()
+    worker_1 = SharedIdentityBackend(store)
+    worker_2 = SharedIdentityBackend(store)
+
+    value = {"loaded_at": time.time()}
+    worker_1.set("a", value, 60)
+
+    assert worker_2.get_many(["a", "b"]) == [value, None]
+    assert worker_2.get_many(["a"])[0] is not value
+
+    worker_2.delete("a")
+
+    assert worker_1.get_many(["a"]) == [None]
@@ -0,0 +1,87 @@
+import json
+import uuid
+from datetime import date, datetime, timezone
+
+import pytest
+from flask import Flask, jsonify
+
+from app import create_app
+from app.settings import TestConfig
+from app.utils.extended_objects import IndexedAttribute
+from app.utils.json_encoding import (
+    PROVIDERS,
+    StdlibProvider,
+    json_provider,
+    output_json,
+)
+from tests.helpers import ExtendedClient
+
+SLUG = uuid.UUID("3f2b8c1e-7d4a-4e4b-9a56-0c1d2e3f4a5b")
+
+PAYLOAD = {
+    "createdAt": datetime(2026, 1, 1, 10, 30, 5, 120),
+    "updatedAt": datetime(2026, 1, 1, 10, tzinfo=timezone.utc),
+    "startDate": date(2026, 1, 2),
+    "slug": SLUG,
+    "position": IndexedAttribute("Employee", 3),
+    "data": [{"id": 1, "name": "é"}, None, True, 1.5],
+}
+
+EXPECTED = {
+    "createdAt": "2026-01-01T10:30:05.000120",
+    "updatedAt": "2026-01-01T10:00:00+00:00",
+    "startDate": "2026-01-02",
+    "slug": str(SLUG),
+    "position": "Employee",
+    "data": [{"id": 1, "name": "é"}, None, True, 1.5],
+}
+
+
+@pytest.mark.parametrize("name", list(PROVIDERS))
+def test_providers(name: str):
+    """Providers encode dates, uuids and indexed attributes the same way"""
+    if name == "orjson":
+        pytest.importorskip("orjson")
+    provider = PROVIDERS[name]()
+
+    assert json.loads(provider.dumps(PAYLOAD)) == EXPECTED
+    assert json.loads(provider.dumps(PAYLOAD, sort_keys=True, indent=2)) == EXPECTED
+    assert json.loads(provider.dumps({1: "a"})) == {"1": "a"}
+    with pytest.raises(TypeError):
+        provider.dumps({"value": object()})
+
+
+def test_orjson_fallback():
+    """Values and arguments orjson can't handle are encoded by the standard library"""
+    pytest.importorskip("orjson")
+    provider = PROVIDERS["orjson"]()
+
+    assert provider.dumps({"big": 2 ** 70}) == b'{"big": 1180591620717411303424}'
+    assert provider.dumps([1], indent=4) == StdlibProvider().dumps([1], indent=4)
+
+
+@pytest.fixture()
+def stdlib_app() -> Flask:
+    """test app configured to encode responses with the standard library"""
+
+    class StdlibConfig(TestConfig):
+        JSON_PROVIDER = "json"
+
+    return create_app(StdlibConfig)
+
+
+def test_responses(test_app: Flask, client: ExtendedClient, stdlib_app: Flask):
+    """Api and jsonify responses are encoded by the app's provider"""
+    admin_client = client("admin")
+
+    rv = admin_client.get("/v1/users/")
+    assert rv.content_type == "application/json"
+    assert rv.get_json()["count"] == 2
+
+    with test_app.test_request_context():
+        assert json.loads(jsonify(PAYLOAD).get_data()) == EXPECTED
+
+    with stdlib_app.test_request_context():
+        assert isinstance(json_provider.provider, StdlibProvider)
+        assert json.loads(jsonify(PAYLOAD).get_data()) == EXPECTED
+        assert json.loads(output_json(PAYLOAD, 200).get_data()) == EXPECTED
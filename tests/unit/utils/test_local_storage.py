@@ -0,0 +1,119 @@
+import io
+import os
+
+import pytest
+from flask import Flask
+from werkzeug.datastructures import FileStorage
+
+from app.apis.v1.asset_storage.models import AssetStorage
+from app.apis.v1.users.models import User
+from app.database import db
+from app.utils.file_handler import FileHandler
+from tests.helpers import ExtendedClient, UserDict
+
+
+@pytest.fixture()
+def local_app(test_app: Flask, tmp_path) -> Flask:
+    test_app.config.update(STORAGE_TARGET="local", LOCAL_STORAGE_PATH=str(tmp_path))
+    return test_app
+
+
+def test_local_handler(local_app: Flask):
+    """Files are stored under their content's hash once saved"""
+
+    content = b"local content" * 1000
+    with local_app.app_context():
+        handler = FileHandler(data=io.BytesIO(content), title="Report.PDF")
+        other = FileHandler(data=io.BytesIO(content), title="b.pdf")
+        assert handler.url != other.url
+        assert handler.handler.key[:67] == other.handler.key[:67]
+        del other
+        assert handler.url.endswith(".pdf")
+        assert not os.path.exists(handler.handler.path)
+
+        handler.save()
+        stored = FileHandler(url=handler.url)
+        assert stored.get_data().read() == content
+        assert stored.size() == len(content)
+        assert b"".join(stored.stream(10, 19)) == content[10:20]
+        assert b"".join(stored.stream()) == content
+
+        stored.update(io.BytesIO(b"new"))
+        assert b"".join(FileHandler(url=handler.url).stream()) == b"new"
+
+        stored.delete()
+        assert not os.path.exists(handler.handler.path)
+        tmp_dir = os.path.join(local_app.config["LOCAL_STORAGE_PATH"], ".tmp")
+        unsaved = FileHandler(data=io.BytesIO(b"unsaved"), title="a.txt")
+        assert len(os.listdir(tmp_dir)) == 1
+        del unsaved
+        assert not os.listdir(tmp_dir)
+
+        with pytest.raises(ValueError):
+            FileHandler(url="/storage/../../etc/passwd")
+
+
+def test_local_shared_content(
+    local_app: Flask, client: ExtendedClient, admin_user: UserDict, site_user: UserDict
+):
+    """Records storing identical files keep them when another record goes"""
+
+    client("admin")
+    content = b"same photo" * 1000
+    with local_app.app_context():
+        users = [
+            User.get(username=user["username"]) for user in (admin_user, site_user)
+        ]
+        for user in users:
+            user.photo = FileHandler(data=io.BytesIO(content), title="photo.png")
+            user.photo.handler.save()
+        db.session.commit()
+        admin_path, user_path = [user.photo.handler.handler.path for user in users]
+        # a single copy of the content is stored
+        assert os.path.samefile(admin_path, user_path)
+
+        users[1].delete(persist=True)
+        assert not os.path.exists(user_path)
+        admin = User.get(username=admin_user["username"])
+        assert b"".join(admin.photo.handler.stream()) == content
+
+        other = FileHandler(data=io.BytesIO(content), title="photo.png")
+        other.save()
+        other.update(io.BytesIO(b"updated"))
+        assert b"".join(admin.photo.handler.stream()) == content
+        assert b"".join(FileHandler(url=other.url).stream()) == b"updated"
+
+        admin.photo.handler.delete()
+        objects = os.path.join(local_app.config["LOCAL_STORAGE_PATH"], ".objects")
+        assert not [files for _, _, files in os.walk(objects) if files]
+
+
+def test_local_download(local_app: Flask, client: ExtendedClient, admin_user: UserDict):
+    """Local assets are sent by the web server or with sendfile"""
+
+    admin_client = client("admin")
+    content = b"0123456789" * 100
+    with local_app.app_context():
+        user = User.get(username=admin_user["username"])
+        asset = AssetStorage.store(
+            FileStorage(io.BytesIO(content), filename="data.bin"),
+            persist=True,
+            added_by_id=user.id,
+        )
+        asset_id, key = asset.id, asset.handler.handler.key
+
+    rv = admin_client.get(
+        f"/v1/assets/{asset_id}/download", headers={"Range": "bytes=5-14"}
+    )
+    assert rv.status_code == 206 and rv.data == content[5:15]
+
+    rv = admin_client.get(
+        f"/v1/assets/{asset_id}/download", headers={"Range": "bytes=2000-"}
+    )
+    assert rv.status_code == 416
+    assert rv.headers["Content-Range"] == f"bytes */{len(content)}"
+
+    local_app.config["LOCAL_STORAGE_SENDFILE"] = "x-accel-redirect"
+    rv = admin_client.get(f"/v1/assets/{asset_id}/download")
+    assert rv.data == b""
+    assert rv.headers["X-Accel-Redirect"] == "/protected-storage/" + key
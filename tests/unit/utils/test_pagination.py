@@ -0,0 +1,65 @@
+import pytest
+from flask import Flask
+
+from app.apis.v1.users.models import User
+from app.exceptions import InvalidUsage
+from app.utils.pagination import COUNT_MODES, encode_cursor, paginate
+from tests.helpers import ExtendedClient
+
+
+@pytest.mark.parametrize("count_mode", COUNT_MODES)
+def test_paginate(test_app: Flask, client: ExtendedClient, count_mode: str):
+    """Counts rows matching the query's filters whatever the count mode"""
+
+    client("admin")
+    with test_app.app_context():
+        admins = User.query.filter(User.username == "admin_user")
+
+        assert paginate(User.query, User, 0, 1, count_mode).count == 2
+        page = paginate(admins, User, 0, 10, count_mode)
+        assert [user.username for user in page.data] == ["admin_user"]
+        assert page.count == 1
+        assert paginate(admins, User, 5, 10, count_mode)[:2] == ([], 1)
+
+
+@pytest.mark.parametrize("count_mode", ["exact", "window"])
+def test_cursor_pagination(test_app: Flask, client: ExtendedClient, count_mode: str):
+    """Cursors walk pages ordered by id in both directions"""
+
+    client("admin")
+    with test_app.app_context():
+        first_id, last_id = [user.id for user in User.query.order_by(User.id)]
+
+        first = paginate(User.query, User, 0, 1, count_mode)
+        assert [user.id for user in first.data] == [first_id]
+        assert first.prev is None and first.next == encode_cursor(first_id)
+
+        second = paginate(User.query, User, 0, 1, count_mode, after=first.next)
+        assert [user.id for user in second.data] == [last_id]
+        assert second.count == 2 and second.next is None
+
+        back = paginate(User.query, User, 0, 1, count_mode, before=second.prev)
+        assert [user.id for user in back.data] == [first_id]
+        assert back.prev is None and back.next == first.next
+
+        with pytest.raises(InvalidUsage):
+            paginate(User.query, User, 0, 1, count_mode, after="not a cursor")
+
+
+def test_filtered_list_count(client: ExtendedClient):
+    """List endpoints count the rows of the filtered query"""
+
+    admin_client = client("admin")
+
+    res_json = admin_client.get("/v1/users/?active=0&limit=1").get_json()
+    assert (res_json["count"], res_json["data"]) == (0, [])
+
+    res_json = admin_client.get("/v1/users/?limit=1").get_json()
+    assert (res_json["count"], len(res_json["data"]), res_json["limit"]) == (2, 1, 1)
+
+    res_json = admin_client.get(
+        f"/v1/users/?limit=1&after={res_json['next']}"
+    ).get_json()
+    assert len(res_json["data"]) == 1 and res_json["next"] is None
+
+    assert admin_client.get("/v1/users/?after=invalid").status_code == 400
@@ -0,0 +1,26 @@
+from datetime import date
+
+from app.utils.partitions import (
+    add_months,
+    default_partition,
+    monthly_partitions,
+    parse_partition_name,
+)
+
+
+def test_monthly_partitions():
+    partitions = monthly_partitions("sessions", date(2026, 11, 18), date(2027, 1, 2))
+
+    assert [partition.name for partition in partitions] == [
+        "sessions_y2026m11",
+        "sessions_y2026m12",
+        "sessions_y2027m01",
+    ]
+    assert partitions[1].ddl == (
+        "CREATE TABLE IF NOT EXISTS sessions_y2026m12 PARTITION OF sessions "
+        "FOR VALUES FROM ('2026-12-01 00:00:00+00') TO ('2027-01-01 00:00:00+00');"
+    )
+    assert add_months(date(2026, 1, 31), -1) == date(2025, 12, 1)
+    assert parse_partition_name("sessions", "sessions_y2027m01") == partitions[2]
+    assert parse_partition_name("sessions", "sessions_unpartitioned") is None
+    assert parse_partition_name("sessions", default_partition("sessions")) is None
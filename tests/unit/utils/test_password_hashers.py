@@ -0,0 +1,42 @@
+from flask import Flask
+from werkzeug.security import generate_password_hash
+
+from app.apis.v1.users.models import User
+from app.utils.password_hashers import HASHERS, password_hashers
+
+
+def test_hashers(test_app: Flask):
+    """Every hasher verifies its own hashes only"""
+
+    hashers = dict((name, cls(test_app.config)) for name, cls in HASHERS.items())
+    hashes = dict((name, hasher.hash("secret")) for name, hasher in hashers.items())
+
+    for name, hasher in hashers.items():
+        assert [other for other in hashes if hasher.identifies(hashes[other])] == [name]
+        assert hasher.verify(hashes[name], "secret")
+        assert not hasher.verify(hashes[name], "Secret")
+        assert not hasher.needs_rehash(hashes[name])
+
+
+def test_rehash_on_login(test_app: Flask):
+    """Hashes of other hashers or costs are upgraded once the password is checked"""
+
+    with test_app.app_context():
+        user = User("hasher", "secret", "secret", first_name="hasher")
+        assert user._password.startswith("$argon2")
+
+        for legacy_hash in (
+            generate_password_hash("secret"),
+            HASHERS["bcrypt"](test_app.config).hash("secret"),
+            HASHERS["argon2"](dict(test_app.config, PASSWORD_ARGON2_TIME_COST=2)).hash(
+                "secret"
+            ),
+        ):
+            user._password = legacy_hash
+            assert user.password == "secret"
+            assert not user.check_password("wrong")
+            assert user._password == legacy_hash
+
+            assert user.check_password("secret")
+            assert not password_hashers.needs_rehash(user._password)
+            assert user.password == "secret"
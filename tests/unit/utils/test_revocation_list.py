@@ -0,0 +1,51 @@
+import time
+
+from app.utils.revocation_list import (
+    BloomFilter,
+    LocalRevocationBackend,
+    RevocationList,
+    SQLiteRevocationBackend,
+)
+
+
+def test_bloom_filter():
+    """Added items are always found, others rarely"""
+
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    for index in range(1000):
+        bloom.add(f"revoked-{index}")
+
+    assert all(f"revoked-{index}" in bloom for index in range(1000))
+    assert sum(f"valid-{index}" in bloom for index in range(10000)) < 300
+
+
+def test_revocations_expire():
+    revocations = RevocationList(LocalRevocationBackend(), capacity=2)
+    revocations.revoke("expired", time.time() - 1)
+    revocations.revoke("a", time.time() + 60)
+    revocations.revoke("b", time.time() + 60)
+    revocations.revoke("c", time.time() + 60)
+
+    assert not revocations.is_revoked("expired")
+    assert revocations.is_revoked("a") and revocations.is_revoked("b")
+    assert revocations.is_revoked("c") and not revocations.is_revoked("d")
+    # the filter grew past its capacity, expired revocations aren't kept
+    assert revocations.stats()["revoked"] == 3
+    assert revocations.capacity == 4
+
+
+def test_sqlite_backend_shared(tmp_path):
+    """Workers see revocations made by each other once synced"""
+
+    path = str(tmp_path / "revocations.sqlite")
+    worker_1 = RevocationList(SQLiteRevocationBackend(path), sync_interval=60)
+    worker_2 = RevocationList(SQLiteRevocationBackend(path), sync_interval=60)
+
+    assert not worker_2.is_revoked("a")
+
+    worker_1.revoke("a", time.time() + 60)
+
+    assert worker_1.is_revoked("a")
+    assert not worker_2.is_revoked("a")
+    worker_2.sync(force=True)
+    assert worker_2.is_revoked("a")
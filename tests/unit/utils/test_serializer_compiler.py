@@ -0,0 +1,198 @@
+import io
+from collections import OrderedDict
+from datetime import date, datetime
+
+import pytest
+from flask import Flask
+from flask_jwt_extended import create_access_token, get_jti, verify_jwt_in_request
+from flask_restx import fields, marshal
+from werkzeug.datastructures import FileStorage
+
+from app.apis.v1.asset_storage.models import AssetStorage
+from app.apis.v1.entities.models import Entity
+from app.apis.v1.entities.resources import api as entities_api
+from app.apis.v1.organization.api_models import api as organization_api
+from app.apis.v1.organization.models import Organization, OrganizationDepartment
+from app.apis.v1.projects.api_models import api as projects_api
+from app.apis.v1.projects.models import Project, ProjectAsset, ProjectUser
+from app.apis.v1.roles.models import Role, RoleEntityPermission
+from app.apis.v1.roles.resources import api as roles_api
+from app.apis.v1.users.api_models import api as users_api
+from app.apis.v1.users.models import Session, User, UserAffiliation
+from app.database import db
+from app.utils.extended_objects import IndexedAttribute, Nested
+from app.utils.serializer_compiler import compile_serializer
+from tests.helpers import ExtendedClient, UserDict
+
+NAMESPACES = [users_api, projects_api, roles_api, entities_api, organization_api]
+
+
+def add_samples(admin: User, asset: AssetStorage) -> str:
+    """adds a row of each listed model, returns a token of the admin"""
+    organization = Organization(
+        "Acme",
+        addr_line1="Main street",
+        country="US",
+        city="Springfield",
+        email="contact@example.com",
+        phone="555",
+        contact_user_id=admin.id,
+    )
+    organization.slug = str(organization.slug)
+    db.session.add(organization)
+    db.session.flush()
+    department = OrganizationDepartment(name="Sales", org=organization)
+    entity = Entity("projects", "Projects")
+    project = Project("Project", "A project", date(2026, 1, 1), time_frame=30)
+    project.slug = str(project.slug)
+    db.session.add_all([department, entity, project])
+    db.session.flush()
+    role = Role.query.first()
+    db.session.add_all(
+        [
+            UserAffiliation(
+                admin, organization, IndexedAttribute("Employee", 3), department
+            ),
+            RoleEntityPermission(entity, role, can_edit=True),
+            ProjectUser(project, admin, "viewer"),
+            ProjectAsset(project, asset),
+        ]
+    )
+    token = create_access_token(admin)
+    Session(admin, get_jti(token), "127.0.0.1", "Linux", "Firefox").save(True)
+    return token
+
+
+def get_samples():
+    users = User.query.order_by(User.id).all()
+    roles = Role.prefetch_users(Role.query.all())
+    projects = Project.prefetch(Project.query.all())
+    return (
+        users
+        + roles
+        + projects
+        + [users, None, {}, [], (users[0], None)]
+        + Organization.query.all()
+        + OrganizationDepartment.query.all()
+        + ProjectAsset.query.all()
+        + RoleEntityPermission.query.all()
+        + Entity.query.all()
+        + Session.query.all()
+        + [
+            {
+                "id": "7",
+                "name": "dict",
+                "active": "false",
+                "roles": [{"name": "admin"}, "user", None],
+                "department": {"name": "Sales"},
+                "users": [{"id": 1, "name": None}],
+                "createdAt": "2026-01-01T10:00:00",
+                "created_at": datetime(2026, 1, 1, 10),
+            }
+        ]
+    )
+
+
+def assert_conforms(model, samples, skip_none=False, ordered=False):
+    serializer = compile_serializer(model, skip_none, ordered)
+    for sample in samples:
+        try:
+            expected = marshal(sample, model, skip_none=skip_none, ordered=ordered)
+        except Exception as error:
+            with pytest.raises(type(error)):
+                serializer(sample)
+            continue
+        # the generated code itself, without falling back to marshal
+        assert repr(serializer.compiled(sample)) == repr(expected)
+
+
+def test_namespaces_models(
+    test_app: Flask, client: ExtendedClient, admin_user: UserDict, tmp_path
+):
+    """Every model outputs what marshal does for rows of every listed model"""
+    client("admin")
+    test_app.config.update(STORAGE_TARGET="local", LOCAL_STORAGE_PATH=str(tmp_path))
+
+    with test_app.test_request_context():
+        admin = User.get(username=admin_user["username"])
+        asset = AssetStorage.store(
+            FileStorage(io.BytesIO(b"logo"), filename="logo.png"),
+            added_by_id=admin.id,
+        )
+        token = add_samples(admin, asset)
+
+    with test_app.test_request_context(
+        "/v1/users/", headers={"Authorization": f"Bearer {token}"}
+    ):
+        verify_jwt_in_request()
+        samples = get_samples()
+        models = [model for api in NAMESPACES for model in api.models.values()]
+        assert len(models) > 10
+        for model in models:
+            assert_conforms(model, samples)
+            assert_conforms(model, samples, skip_none=True, ordered=True)
+
+
+def test_fields_semantics(test_app: Flask):
+    """Defaults, lists, nested models and custom fields behave as in marshal"""
+
+    class Upper(fields.Raw):
+        def output(self, key, obj, **kwargs):
+            return str(fields.get_value(key, obj)).upper()
+
+    nested = {"name": fields.String, "rank": fields.Integer(default=0)}
+    model = {
+        "name": fields.String(default="N/A"),
+        "count": fields.Integer(default=lambda: 3),
+        "flag": fields.Boolean(attribute="flags.0"),
+        "when": fields.DateTime(dt_format="rfc822"),
+        "day": fields.Date,
+        "upper": Upper(attribute="name"),
+        "raw": fields.Raw(default=OrderedDict()),
+        "tags": fields.List(fields.String),
+        "items": fields.List(fields.Nested(nested, allow_null=True)),
+        "names": fields.List(fields.String(attribute="name"), default=[]),
+        "first": fields.Nested(nested, attribute="items.0", skip_none=True),
+        "missing": fields.Nested(nested, default={"name": "none"}),
+        "only": Nested(nested, attribute="items.1", only=["rank"]),
+        "inline": {"day": fields.Date(attribute="day")},
+    }
+    samples = [
+        None,
+        {},
+        {
+            "name": "first",
+            "flags": ["true"],
+            "when": datetime(2026, 1, 1, 10),
+            "day": "2026-01-02",
+            "tags": ("a", 1, None),
+            "items": [{"name": "a", "rank": "2"}, None, {"rank": 1}],
+            "names": [{"name": "b"}, "c", None],
+        },
+        {"flags": [0], "day": datetime(2026, 1, 1), "tags": {"a"}, "items": "ab"},
+        {"flags": [], "when": "2026-01-01", "tags": "abc", "names": {"name": "d"}},
+        [{"name": "listed"}],
+        {"count": "x"},
+    ]
+
+    with test_app.app_context():
+        for skip_none in (False, True):
+            for ordered in (False, True):
+                assert_conforms(model, samples, skip_none, ordered)
+
+
+def test_fields_mask(client: ExtendedClient):
+    """Lists marshalled by compiled serializers still apply requested masks"""
+    admin_client = client("admin")
+
+    listed = admin_client.get("/v1/users/").get_json()
+    masked = admin_client.get(
+        "/v1/users/", headers={"X-Fields": "count,data{id,username}"}
+    ).get_json()
+
+    assert masked == {
+        "count": listed["count"],
+        "data": [
+            {"id": user["id"], "username": user["username"]} for user in listed["data"]
+        ],
+    }
@@ -0,0 +1,58 @@
+from flask import Flask
+
+from app.apis.v1.users.models import User
+from app.database import db
+from app.utils.file_handler import FileHandlerS3, StoredFile
+from app.utils.storage_url import StorageUrl
+from tests.helpers import ExtendedClient
+
+
+def test_photo_url_without_handler(
+    test_app: Flask, client: ExtendedClient, monkeypatch
+):
+    """Listing users serializes stored urls without building storage handlers"""
+
+    admin_client = client("admin")
+    photo_url = "http://s3-region.example.com/bucket/abc123photo.png"
+    with test_app.app_context():
+        for user in User.query:
+            user._photo = photo_url
+        db.session.commit()
+
+    def no_handler(*args, **kwargs):
+        raise AssertionError("storage handler built")
+
+    monkeypatch.setattr(FileHandlerS3, "__init__", no_handler)
+    res_json = admin_client.get("/v1/users/").get_json()
+
+    assert [user["photo"] for user in res_json["data"]] == [photo_url] * 2
+
+
+def test_signed_url(test_app: Flask):
+    """Signed urls are computed locally from the stored url"""
+
+    test_app.config.update(
+        AWS_ENDPOINT="s3.example.com",
+        AWS_ACCESS_KEY_ID="key",
+        AWS_SECRET_ACCESS_KEY="secret",
+        S3_BUCKET_NAME="bucket",
+    )
+    with test_app.app_context():
+        signed = StoredFile("http://s3.example.com/bucket/abc.png").signed_url(60)
+
+    assert signed.startswith("http://s3.example.com/bucket/abc.png?")
+    assert "Expires=" in signed and "Signature=" in signed
+
+
+def test_local_signed_url(test_app: Flask, tmp_path):
+    """Local files urls are output unsigned when signed urls are enabled"""
+
+    test_app.config.update(
+        STORAGE_TARGET="local",
+        LOCAL_STORAGE_PATH=str(tmp_path),
+        STORAGE_SIGNED_URLS=True,
+    )
+    url = "http://localhost:5000/files/ab/abc.png"
+    with test_app.app_context():
+        assert StoredFile(url).signed_url(60) == url
+        assert StorageUrl().format(StoredFile(url)) == url
@@ -0,0 +1,85 @@
+import threading
+
+from flask import Flask
+
+from app.apis.v1.tasks.models import QueuedTask
+from app.database import db
+from app.utils.tasks import RetryPolicy, TaskExecutor, tasks
+
+calls = []
+
+
+@tasks.task(name="tests.flaky", retries=2)
+def flaky(key: str, failures: int = 0) -> None:
+    calls.append(key)
+    if calls.count(key) <= failures:
+        raise RuntimeError(f"{key} failed")
+
+
+def test_executor_retries(test_app: Flask):
+    """Failed tasks are retried by workers, callers run tasks once the queue is
+    full"""
+
+    executor = TaskExecutor(
+        test_app, workers=1, maxsize=1, policy=RetryPolicy(retries=2, backoff=0)
+    )
+    started, release = threading.Event(), threading.Event()
+    threads = []
+
+    def block():
+        started.set()
+        release.wait()
+
+    executor.submit(block)
+    started.wait()
+    executor.submit(flaky, ("retried",), {"failures": 2})
+    executor.submit(lambda: threads.append(threading.current_thread()))
+    assert threads == [threading.current_thread()]
+    release.set()
+    executor.join()
+    executor.submit(flaky, ("failed",), {"failures": 5})
+    executor.join()
+    executor.shutdown()
+    # tasks run by the caller aren't retried
+    executor.run(flaky, ("once",), {"failures": 1})
+
+    assert calls.count("retried") == 3 and calls.count("failed") == 3
+    assert calls.count("once") == 1
+    stats = executor.stats()
+    assert stats["submitted"] == 5 and stats["inline"] == 1
+    assert stats["succeeded"] == 3 and stats["failed"] == 2
+    assert stats["retried"] == 4 and stats["workers"] == 0
+
+
+def test_eager_tasks(test_app: Flask):
+    """Tasks run in the caller in test mode"""
+
+    with test_app.app_context():
+        flaky.delay("eager")
+        assert calls[-1] == "eager"
+        assert tasks.executor.stats()["succeeded"] == 1
+
+
+def test_durable_queue(test_app: Flask):
+    """Stored tasks are run by the worker command until out of attempts"""
+
+    test_app.config["TASKS_RETRY_BACKOFF"] = 0
+    with test_app.app_context():
+        db.create_all()
+        flaky.enqueue("durable", failures=1)
+        flaky.enqueue("dead", failures=5)
+        QueuedTask.query.session.add(QueuedTask("tests.missing", (), {}, 1))
+        db.session.commit()
+
+    result = test_app.test_cli_runner().invoke(args=["tasks-worker", "--once"])
+    assert result.output.strip() == "6 tasks run"
+    assert calls.count("durable") == 2 and calls.count("dead") == 3
+
+    with test_app.app_context():
+        failed = QueuedTask.query.order_by(QueuedTask.id).all()
+        assert [(task.name, task.attempts) for task in failed] == [
+            ("tests.flaky", 3),
+            ("tests.missing", 1),
+        ]
+        assert failed[0].last_error == "RuntimeError('dead failed')"
+        assert tasks.durable.stats() == {"queued": 0, "running": 0, "failed": 2}
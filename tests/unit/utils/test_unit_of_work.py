@@ -0,0 +1,63 @@
+import io
+import os
+import threading
+
+from flask import Flask
+
+from app.apis.v1.entities.models import Entity
+from app.database import db
+from app.utils.file_handler import FileHandler
+from app.utils.tasks import TaskExecutor
+from app.utils.unit_of_work import unit_of_work
+
+
+def test_operations_follow_transaction(test_app: Flask):
+    """Operations run after commit, compensations after rollback"""
+
+    calls = []
+    with test_app.app_context():
+        db.create_all()
+
+        unit_of_work.after_commit(calls.append, "committed")
+        unit_of_work.on_rollback(calls.append, "compensated")
+        db.session.add(Entity(name="uow", description=""))
+        db.session.flush()
+        assert calls == []
+        db.session.commit()
+        assert calls == ["committed"]
+
+        unit_of_work.after_commit(calls.append, "discarded")
+        unit_of_work.on_rollback(calls.append, "rolled back")
+        with db.session.begin_nested():
+            unit_of_work.after_commit(calls.append, "nested")
+        db.session.rollback()
+        assert calls == ["committed", "rolled back"]
+
+
+def test_background_upload(test_app: Flask, tmp_path):
+    """Uploads run on the pool once committed, from data outliving the request"""
+
+    test_app.config.update(
+        STORAGE_TARGET="local", LOCAL_STORAGE_PATH=str(tmp_path), STORAGE_ASYNC=True
+    )
+    executor = TaskExecutor(test_app, workers=1)
+    test_app.extensions["tasks"] = executor
+    threads = []
+
+    with test_app.app_context():
+        db.create_all()
+        stream = io.BytesIO(b"photo")
+        handler = FileHandler(data=stream, title="photo.png")
+        unit_of_work.save(handler)
+        unit_of_work.after_commit(
+            lambda: threads.append(threading.current_thread().name)
+        )
+        stream.close()
+        db.session.add(Entity(name="uow", description=""))
+        db.session.commit()
+
+    executor.shutdown()
+    assert threads[0].startswith("tasks")
+    with open(handler.handler.path, "rb") as stored:
+        assert stored.read() == b"photo"
+    assert not os.listdir(tmp_path / ".tmp")